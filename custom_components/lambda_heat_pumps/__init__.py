@@ -20,10 +20,10 @@ from .const import (
     LAMBDA_WP_CONFIG_TEMPLATE,  # Import template from const
 )
 
+from .aggregates import async_update_site_sensor_owner
 from .coordinator import LambdaDataUpdateCoordinator
 from .services import async_setup_services, async_unload_services
 from .utils import generate_base_addresses
-from .automations import setup_cycling_automations, cleanup_cycling_automations
 # from .migration import async_migrate_entry as migrate_entry
 
 from .module_auto_detect import auto_detect_modules, update_entry_with_detected_modules
@@ -43,6 +43,9 @@ _reload_lock = asyncio.Lock()
 PLATFORMS = [
     Platform.SENSOR,
     Platform.CLIMATE,
+    Platform.NUMBER,
+    Platform.SELECT,
+    Platform.BINARY_SENSOR,
 ]
 
 # Config schema - only config entries are supported
@@ -121,7 +124,11 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             client = getattr(coordinator, "client", None)
             slave_id = getattr(coordinator, "slave_id", 1)
             if client is not None:
-                detected_counts = await auto_detect_modules(client, slave_id)
+                # Über den Coordinator lesen: bei gemeinsamer Verbindung
+                # läuft das durch die Warteschlange der slave_id
+                detected_counts = await auto_detect_modules(
+                    client, slave_id, read=coordinator.async_read_registers
+                )
                 updated = await update_entry_with_detected_modules(
                     hass, entry, detected_counts
                 )
@@ -239,9 +246,6 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         if len(hass.data[DOMAIN]) == 1:
             await async_setup_services(hass)
 
-        # Set up cycling automations
-        setup_cycling_automations(hass, entry.entry_id)
-
         # Add update listener
         entry.async_on_unload(entry.add_update_listener(async_reload_entry))
 
@@ -274,9 +278,6 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     unload_ok = True
 
     try:
-        # Clean up cycling automations first
-        cleanup_cycling_automations(hass, entry.entry_id)
-
         # Try to unload platforms - handle gracefully if they weren't loaded
         try:
             platforms_unloaded = await hass.config_entries.async_unload_platforms(
@@ -311,6 +312,10 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             finally:
                 hass.data[DOMAIN].pop(entry.entry_id, None)
 
+        # Deaktiviert -> Standortsensoren ggf. an einen anderen Eintrag abgeben
+        if hass.data.get(DOMAIN):
+            async_update_site_sensor_owner(hass)
+
         # If this was the last entry, unload services
         if DOMAIN in hass.data and not hass.data[DOMAIN]:
             try:
@@ -377,3 +382,9 @@ async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
         except Exception as ex:
             _LOGGER.error("Critical error during reload: %s", ex, exc_info=True)
             raise
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Hand the site sensors to the remaining entries after a removal."""
+    if hass.data.get(DOMAIN):
+        async_update_site_sensor_owner(hass, removed_entry_id=entry.entry_id)
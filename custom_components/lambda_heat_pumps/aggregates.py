@@ -0,0 +1,202 @@
+"""System totals over the heat pumps of an entry and over all entries."""
+
+from __future__ import annotations
+
+import logging
+import math
+from typing import Any, Callable, Iterable, Mapping, MutableMapping
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN, SITE_AGGREGATOR_KEY, SYSTEM_SUM_SENSORS
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def system_cop(values: Mapping[str, Any]) -> float | None:
+    """Return heat output (kW) / electrical power (W) as COP, None if idle."""
+    heat = values.get("system_heat_output")
+    power = values.get("system_electrical_power")
+    if heat is None or not power or power <= 0:
+        return None
+    return heat * 1000 / power
+
+
+class SystemAggregator:
+    """Totals over the heat pumps of one entry.
+
+    The sums in SYSTEM_SUM_SENSORS are recomputed only if one of their
+    input keys is in the change set of the cycle; the cycling totals are
+    passed in by the coordinator. Results are "system_*" keys of
+    coordinator.data.
+    """
+
+    def __init__(self, num_hps: int, key_func: Callable[[str], str] = str) -> None:
+        indices = range(1, num_hps + 1)
+        self._sums = {
+            key: tuple(key_func(f"hp{idx}_{sensor_id}") for idx in indices)
+            for key, sensor_id in SYSTEM_SUM_SENSORS.items()
+        }
+        self.values: dict[str, Any] = {}
+
+    def update(
+        self,
+        data: MutableMapping[str, Any],
+        changed: frozenset[str] | None,
+        cycles: Mapping[str, int],
+    ) -> set[str]:
+        """Write the totals into ``data``; returns the keys that changed.
+
+        ``changed`` is the change set of the polled keys, None = all.
+        """
+        previous = dict(self.values)
+        for key, inputs in self._sums.items():
+            if (
+                changed is not None
+                and key in self.values
+                and changed.isdisjoint(inputs)
+            ):
+                continue
+            parts = [data[name] for name in inputs if data.get(name) is not None]
+            if parts:
+                self.values[key] = math.fsum(parts)
+            else:
+                self.values.pop(key, None)
+        self.values["system_cop"] = system_cop(self.values)
+        for mode, total in cycles.items():
+            self.values[f"system_{mode}_cycling_total"] = total
+        for key, value in self.values.items():
+            if value is None:
+                data.pop(key, None)
+            else:
+                data[key] = value
+        return {
+            key
+            for key in self.values.keys() | previous.keys()
+            if self.values.get(key) != previous.get(key)
+        }
+
+
+class SiteAggregator:
+    """Totals over the system values of all Lambda entries.
+
+    Each coordinator reports its "system_*" values after an update; the
+    site values are the sums (and the COP of the sums). Listeners are
+    called when a site value changed.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[str, dict[str, Any]] = {}
+        self.values: dict[str, Any] = {}
+        self._listeners: list[Callable[[], None]] = []
+
+    @property
+    def entry_ids(self) -> list[str]:
+        return list(self._entries)
+
+    def update(self, entry_id: str, values: Mapping[str, Any]) -> None:
+        self._entries[entry_id] = dict(values)
+        self._recompute()
+
+    def remove(self, entry_id: str) -> None:
+        if self._entries.pop(entry_id, None) is not None:
+            self._recompute()
+
+    def _recompute(self) -> None:
+        totals: dict[str, list] = {}
+        for values in self._entries.values():
+            for key, value in values.items():
+                if value is not None and key != "system_cop":
+                    totals.setdefault(key, []).append(value)
+        values = {key: math.fsum(parts) for key, parts in totals.items()}
+        values["system_cop"] = system_cop(values)
+        if values == self.values:
+            return
+        self.values = values
+        for listener in list(self._listeners):
+            listener()
+
+    @callback
+    def async_add_listener(self, listener: Callable[[], None]) -> Callable[[], None]:
+        """Call ``listener`` on changes; returns the function to remove it."""
+        self._listeners.append(listener)
+
+        @callback
+        def remove() -> None:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+        return remove
+
+    def is_empty(self) -> bool:
+        return not self._entries and not self._listeners
+
+
+def get_site_aggregator(hass: HomeAssistant) -> SiteAggregator:
+    """Return the site aggregator shared by all entries."""
+    site = hass.data.get(SITE_AGGREGATOR_KEY)
+    if site is None:
+        site = hass.data[SITE_AGGREGATOR_KEY] = SiteAggregator()
+    return site
+
+
+def release_site_aggregator(hass: HomeAssistant, entry_id: str) -> None:
+    """Drop an entry from the site totals; removes an unused aggregator."""
+    site = hass.data.get(SITE_AGGREGATOR_KEY)
+    if site is None:
+        return
+    site.remove(entry_id)
+    if site.is_empty():
+        hass.data.pop(SITE_AGGREGATOR_KEY, None)
+
+
+def site_sensor_owner(entry_ids: Iterable[str]) -> str | None:
+    """Return the entry that creates the site sensors (needs two entries)."""
+    entry_ids = list(entry_ids)
+    return entry_ids[0] if len(entry_ids) > 1 else None
+
+
+def _current_site_owner(hass: HomeAssistant, removed: str | None) -> str | None:
+    """Owner among the enabled entries, ``removed`` is left out."""
+    return site_sensor_owner(
+        config_entry.entry_id
+        for config_entry in hass.config_entries.async_entries(DOMAIN)
+        if config_entry.disabled_by is None and config_entry.entry_id != removed
+    )
+
+
+@callback
+def async_update_site_sensor_owner(
+    hass: HomeAssistant, removed_entry_id: str | None = None
+) -> None:
+    """Reload loaded entries whose site sensor decision is out of date.
+
+    Called after an entry was added, unloaded or removed: the new owner gets
+    the site sensors, a former owner left alone drops them.
+    """
+    owner = _current_site_owner(hass, removed_entry_id)
+    for entry_id, entry_data in hass.data.get(DOMAIN, {}).items():
+        site_sensors = entry_data.get("site_sensors")
+        if entry_id == removed_entry_id or site_sensors is None:
+            continue
+        if site_sensors != (entry_id == owner):
+            _LOGGER.info("Lambda site sensor owner changed, reloading %s", entry_id)
+            # Nur einmal auslösen, das Neuladen setzt den Wert wieder
+            entry_data["site_sensors"] = None
+            hass.config_entries.async_schedule_reload(entry_id)
+
+
+@callback
+def async_claim_site_sensors(hass: HomeAssistant, entry_id: str) -> bool:
+    """Return True if ``entry_id`` creates the site sensors.
+
+    The decision is kept in hass.data[DOMAIN][entry_id]["site_sensors"]. If
+    the owner was set up without site sensors (it was the only entry then),
+    it is reloaded, so they appear when a second controller is added.
+    """
+    owner = _current_site_owner(hass, None)
+    entries = hass.data.get(DOMAIN, {})
+    if entry_id in entries:
+        entries[entry_id]["site_sensors"] = owner == entry_id
+    async_update_site_sensor_owner(hass)
+    return owner == entry_id
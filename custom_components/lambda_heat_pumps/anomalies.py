@@ -0,0 +1,147 @@
+"""Stuck-register and implausible-jump detection with O(1) state per register."""
+
+from __future__ import annotations
+
+import math
+from typing import Any, Callable, Mapping, NamedTuple
+
+ANOMALY_KINDS = ("stuck", "jump")
+
+
+class AnomalyThresholds(NamedTuple):
+    """Thresholds of a monitored register (the "anomaly" template field)."""
+
+    # Sekunden ohne Wertänderung bis "stuck", None = nicht prüfen
+    stuck_after: float | None = None
+    # Maximale Änderung pro Minute, None = nicht prüfen
+    max_rate: float | None = None
+    # data Key, der > 0 sein muss, damit "stuck" geprüft wird (z.B. Kompressor)
+    active_when: str | None = None
+
+    @classmethod
+    def from_template(
+        cls, field: Mapping, key_func: Callable[[str], str] = str
+    ) -> AnomalyThresholds:
+        """Build from a template field; ``key_func`` maps active_when to a key."""
+        active_when = field.get("active_when")
+        return cls(
+            stuck_after=field.get("stuck_after"),
+            max_rate=field.get("max_rate"),
+            active_when=key_func(active_when) if active_when else None,
+        )
+
+
+class RegisterMonitor:
+    """Incremental statistics and anomaly flags of one register.
+
+    Keeps the running mean/variance (Welford), the time of the last value
+    change and the last sample. "stuck" is set while the value did not
+    change for ``stuck_after`` seconds of activity; "jump" is set for ``jump_hold``
+    seconds after the value moved faster than ``max_rate`` per minute.
+    """
+
+    __slots__ = (
+        "thresholds",
+        "count",
+        "mean",
+        "_m2",
+        "_last_value",
+        "_last_time",
+        "_changed_at",
+        "_quiet_since",
+        "_jump_until",
+        "_jump_hold",
+        "stuck",
+        "jump",
+    )
+
+    def __init__(self, thresholds: AnomalyThresholds, jump_hold: float) -> None:
+        self.thresholds = thresholds
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self._last_value: float | None = None
+        self._last_time: float | None = None
+        self._changed_at: float | None = None
+        self._quiet_since: float | None = None
+        self._jump_until = -math.inf
+        self._jump_hold = jump_hold
+        self.stuck = False
+        self.jump = False
+
+    @property
+    def std(self) -> float | None:
+        if self.count < 2:
+            return None
+        return math.sqrt(self._m2 / (self.count - 1))
+
+    def seconds_since_change(self, now: float) -> float | None:
+        return None if self._changed_at is None else now - self._changed_at
+
+    def update(self, value: float, now: float, active: bool = True) -> None:
+        """Add a sample (monotonic seconds) and update the flags."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+        thresholds = self.thresholds
+        last_value, last_time = self._last_value, self._last_time
+        if last_value is None or value != last_value:
+            self._changed_at = self._quiet_since = now
+        if thresholds.max_rate is not None and last_value is not None:
+            if now > last_time:
+                rate = abs(value - last_value) * 60 / (now - last_time)
+                if rate > thresholds.max_rate:
+                    self._jump_until = now + self._jump_hold
+        self._last_value, self._last_time = value, now
+
+        self.jump = now < self._jump_until
+        if not active:
+            # Außer Betrieb ist ein konstanter Wert normal
+            self._quiet_since = now
+        self.stuck = (
+            thresholds.stuck_after is not None
+            and now - self._quiet_since >= thresholds.stuck_after
+        )
+
+    def attributes(self, now: float) -> dict[str, Any]:
+        std = self.std
+        since = self.seconds_since_change(now)
+        return {
+            "stuck": self.stuck,
+            "jump": self.jump,
+            "seconds_since_change": round(since) if since is not None else None,
+            "mean": round(self.mean, 2) if self.count else None,
+            "std": round(std, 2) if std is not None else None,
+        }
+
+
+class AnomalyDetector:
+    """Register monitors of an entry, keyed by coordinator.data key."""
+
+    def __init__(
+        self, monitored: Mapping[str, AnomalyThresholds], jump_hold: float
+    ) -> None:
+        self.monitors = {
+            key: RegisterMonitor(thresholds, jump_hold)
+            for key, thresholds in monitored.items()
+        }
+
+    def update(self, data: Mapping[str, Any], now: float) -> list[tuple[str, str]]:
+        """Feed one poll; return the (key, kind) anomalies that just started."""
+        started = []
+        for key, monitor in self.monitors.items():
+            value = data.get(key)
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                continue
+            before = (monitor.stuck, monitor.jump)
+            active_when = monitor.thresholds.active_when
+            active = active_when is None or (data.get(active_when) or 0) > 0
+            monitor.update(value, now, active)
+            for kind, was, active_now in zip(
+                ANOMALY_KINDS, before, (monitor.stuck, monitor.jump)
+            ):
+                if active_now and not was:
+                    started.append((key, kind))
+        return started
@@ -0,0 +1,103 @@
+"""Binary sensor platform for register anomalies (see anomalies.py)."""
+
+from __future__ import annotations
+
+import logging
+import time
+
+from homeassistant.components.binary_sensor import (
+    BinarySensorDeviceClass,
+    BinarySensorEntity,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN
+from .coordinator import LambdaDataUpdateCoordinator
+from .descriptions import sensor_names
+from .utils import build_device_info
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
+) -> None:
+    """Set up one anomaly binary sensor per monitored register."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    use_legacy_modbus_names = entry.data.get("use_legacy_modbus_names", True)
+    name_prefix = entry.data.get("name", "").lower().replace(" ", "")
+
+    entities = []
+    for key, (device_prefix, sensor_id, name) in coordinator.anomaly_registers.items():
+        naming = sensor_names(
+            device_prefix, name, sensor_id, name_prefix, use_legacy_modbus_names
+        )
+        entities.append(LambdaAnomalyBinarySensor(coordinator, entry, key, naming))
+    _LOGGER.debug("Adding %d Lambda anomaly binary sensors", len(entities))
+    async_add_entities(entities)
+
+
+class LambdaAnomalyBinarySensor(
+    CoordinatorEntity[LambdaDataUpdateCoordinator], BinarySensorEntity
+):
+    """On while a register looks stuck or jumped implausibly."""
+
+    _attr_should_poll = False
+    _attr_device_class = BinarySensorDeviceClass.PROBLEM
+    # Statistiken ändern sich mit jeder Abfrage
+    _unrecorded_attributes = frozenset({"seconds_since_change", "mean", "std"})
+
+    def __init__(
+        self,
+        coordinator: LambdaDataUpdateCoordinator,
+        entry: ConfigEntry,
+        data_key: str,
+        naming: dict,
+    ) -> None:
+        super().__init__(coordinator)
+        self._entry = entry
+        self._data_key = data_key
+        self._last_state = None
+        self._attr_name = f"{naming['name']} Anomaly"
+        self._attr_unique_id = f"{naming['unique_id']}_anomaly"
+        self.entity_id = (
+            f"binary_sensor.{naming['entity_id'].split('.', 1)[1]}_anomaly"
+        )
+
+    @property
+    def device_info(self):
+        return build_device_info(self._entry)
+
+    @property
+    def _monitor(self):
+        return self.coordinator.anomalies.monitors.get(self._data_key)
+
+    @property
+    def is_on(self) -> bool | None:
+        monitor = self._monitor
+        if monitor is None or not monitor.count:
+            return None
+        return monitor.stuck or monitor.jump
+
+    @property
+    def extra_state_attributes(self) -> dict | None:
+        monitor = self._monitor
+        if monitor is None:
+            return None
+        return monitor.attributes(time.monotonic())
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only if the flags or the availability changed."""
+        monitor = self._monitor
+        state = (
+            self.available,
+            (monitor.stuck, monitor.jump) if monitor is not None else None,
+        )
+        if state == self._last_state:
+            return
+        self._last_state = state
+        self.async_write_ha_state()
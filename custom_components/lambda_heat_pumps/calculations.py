@@ -0,0 +1,74 @@
+"""Dependency-ordered evaluation of calculated values in one pass."""
+
+from __future__ import annotations
+
+from graphlib import TopologicalSorter
+from typing import Any, Callable, Iterable, Mapping, MutableMapping
+
+
+class CalculationGraph:
+    """Calculated coordinator.data values and the keys they depend on.
+
+    Inputs may be polled keys or other calculated keys. compile() orders
+    the calculations so every value is computed after its inputs;
+    evaluate() then writes all results into the data dict of the cycle.
+    A calculation whose input values did not change keeps its last result.
+    """
+
+    def __init__(self) -> None:
+        self._calculations: dict[str, tuple[tuple[str, ...], Callable]] = {}
+        self._order: list[str] = []
+        # key -> (Eingangswerte, Ergebnis) der letzten Auswertung
+        self._cache: dict[str, tuple[tuple, Any]] = {}
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._calculations
+
+    def __len__(self) -> int:
+        return len(self._calculations)
+
+    def add(
+        self, key: str, inputs: Iterable[str], func: Callable[[Mapping], Any]
+    ) -> None:
+        """Add ``func(data)`` as the value of ``key``; call compile() after."""
+        self._calculations[key] = (tuple(sorted(inputs)), func)
+        self._order = []
+
+    def compile(self) -> list[str]:
+        """Order the calculations by their dependencies.
+
+        Raises:
+            graphlib.CycleError: If calculations depend on each other
+        """
+        sorter = TopologicalSorter(
+            {
+                key: [name for name in inputs if name in self._calculations]
+                for key, (inputs, _func) in self._calculations.items()
+            }
+        )
+        self._order = list(sorter.static_order())
+        self._cache.clear()
+        return self._order
+
+    @property
+    def order(self) -> list[str]:
+        return self._order
+
+    def evaluate(self, data: MutableMapping[str, Any]) -> int:
+        """Compute all values into ``data``; returns the number evaluated."""
+        evaluated = 0
+        for key in self._order:
+            inputs, func = self._calculations[key]
+            values = tuple(data.get(name) for name in inputs)
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] == values:
+                result = cached[1]
+            else:
+                result = func(data)
+                self._cache[key] = (values, result)
+                evaluated += 1
+            if result is None:
+                data.pop(key, None)
+            else:
+                data[key] = result
+        return evaluated
@@ -21,14 +21,15 @@ from .const import (
     DEFAULT_HEATING_CIRCUIT_MIN_TEMP,
     DEFAULT_HEATING_CIRCUIT_MAX_TEMP,
 )
+from .descriptions import climate_descriptions, entry_module_counts
 from .utils import (
-    generate_base_addresses,
     build_device_info,
     generate_sensor_names,
     get_firmware_version_int,
-    get_compatible_sensors,
+    to_register_values,
+    to_signed_16bit,
 )
-from .modbus_utils import async_write_registers
+from .modbus_utils import ModbusWriteError
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -39,7 +40,9 @@ class LambdaClimateEntity(CoordinatorEntity, ClimateEntity):
     _attr_should_poll = False
     _attr_supported_features = ClimateEntityFeature.TARGET_TEMPERATURE
 
-    def __init__(self, coordinator, entry, climate_type, idx, base_address):
+    def __init__(
+        self, coordinator, entry, climate_type, idx, base_address, names=None
+    ):
         super().__init__(coordinator)
         self._entry = entry
         self._climate_type = climate_type  # "hot_water" oder "heating_circuit"
@@ -47,23 +50,19 @@ class LambdaClimateEntity(CoordinatorEntity, ClimateEntity):
         self._base_address = base_address
         self._template = CLIMATE_TEMPLATES[climate_type]
 
-        # Hole den Legacy-Modbus-Namen-Switch aus der Config
-        use_legacy_modbus_names = entry.data.get("use_legacy_modbus_names", True)
-        name_prefix = entry.data.get("name", "").lower().replace(" ", "")
-
-        # Verwende die Werte aus der CLIMATE_TEMPLATES Konfiguration
-        device_type = self._template["device_type"]  # "boil" oder "hc"
-        sensor_id = climate_type  # "hot_water" oder "heating_circuit"
-
-        # Verwende die zentrale Namensgenerierung
-        device_prefix = f"{device_type}{idx}"
-        names = generate_sensor_names(
-            device_prefix,
-            self._template["name"],
-            sensor_id,
-            name_prefix,
-            use_legacy_modbus_names,
-        )
+        if names is None:
+            # Ohne Beschreibung aus descriptions.py: Namen selbst erzeugen
+            use_legacy_modbus_names = entry.data.get("use_legacy_modbus_names", True)
+            name_prefix = entry.data.get("name", "").lower().replace(" ", "")
+            # Verwende die Werte aus der CLIMATE_TEMPLATES Konfiguration
+            device_type = self._template["device_type"]  # "boil" oder "hc"
+            names = generate_sensor_names(
+                f"{device_type}{idx}",
+                self._template["name"],
+                climate_type,
+                name_prefix,
+                use_legacy_modbus_names,
+            )
 
         # Setze die Namen und IDs
         self._attr_name = names["name"]
@@ -135,22 +134,22 @@ class LambdaClimateEntity(CoordinatorEntity, ClimateEntity):
             raw_value,
             temperature,
         )
-        result = await async_write_registers(
-            self.coordinator.client,
-            reg_addr,
-            [raw_value],
-            self._entry.data.get("slave_id", 1),
-        )
-        if hasattr(result, "isError") and result.isError():
-            _LOGGER.error("Failed to write target temperature: %s", result)
+        try:
+            confirmed = await self.coordinator.async_write_and_verify(
+                reg_addr, to_register_values(raw_value, "int16")
+            )
+        except ModbusWriteError as ex:
+            _LOGGER.error("Failed to write target temperature: %s", ex)
             return
-        key = (
+        key = self.coordinator.get_data_key(
             f"boil{self._idx}_target_high_temperature"
             if self._climate_type == "hot_water"
             else f"hc{self._idx}_target_room_temperature"
         )
-        self.coordinator.data[key] = temperature
-        await self.coordinator.async_refresh()
+        # Bestätigten Wert übernehmen statt kompletten Refresh
+        self.coordinator.async_set_data_value(
+            key, to_signed_16bit(confirmed[0]) * scale
+        )
         self.async_write_ha_state()
 
 
@@ -161,48 +160,32 @@ async def async_setup_entry(
     _LOGGER.debug("Setting up Lambda climate entities for entry %s", entry.entry_id)
 
     coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
-    num_boil = entry.data.get("num_boil", 1)
-    num_hc = entry.data.get("num_hc", 1)
-    
+    use_legacy_modbus_names = entry.data.get("use_legacy_modbus_names", True)
+    name_prefix = entry.data.get("name", "").lower().replace(" ", "")
+
     # Get firmware version and filter compatible climate templates
     fw_version = get_firmware_version_int(entry)
     _LOGGER.debug(
         "Filtering climate entities for firmware version (numeric: %d)",
         fw_version,
     )
-    
-    # Filter compatible climate templates
-    compatible_climates = get_compatible_sensors(CLIMATE_TEMPLATES, fw_version)
-    
-    entities = []
-
-    # Boiler
-    boil_addresses = generate_base_addresses("boil", num_boil)
-    for idx in range(1, num_boil + 1):
-        # Check if hot_water climate is compatible
-        if "hot_water" in compatible_climates:
-            entities.append(
-                LambdaClimateEntity(
-                    coordinator,
-                    entry,
-                    "hot_water",  # climate_type aus CLIMATE_TEMPLATES
-                    idx,
-                    boil_addresses[idx],
-                )
-            )
 
-    # Heating Circuits
-    hc_addresses = generate_base_addresses("hc", num_hc)
-    for idx in range(1, num_hc + 1):
-        # Check if heating_circuit climate is compatible
-        if "heating_circuit" not in compatible_climates:
-            continue
-        entity_key = f"room_temperature_entity_{idx}"
-        if not entry.options.get(entity_key):
+    # Boiler und Heizkreise; Namen und Adressen sind pro Firmware/
+    # Modulanzahl/Namensmodus gecacht (descriptions.py)
+    entities = []
+    for description in climate_descriptions(
+        fw_version,
+        entry_module_counts(entry.data),
+        use_legacy_modbus_names,
+        name_prefix,
+    ):
+        if description.climate_type == "heating_circuit" and not entry.options.get(
+            f"room_temperature_entity_{description.index}"
+        ):
             _LOGGER.debug(
                 "No room temperature entity configured for heating circuit %s "
                 "in entry %s, skipping entity creation.",
-                idx,
+                description.index,
                 entry.entry_id,
             )
             continue
@@ -210,9 +193,14 @@ async def async_setup_entry(
             LambdaClimateEntity(
                 coordinator,
                 entry,
-                "heating_circuit",  # climate_type aus CLIMATE_TEMPLATES
-                idx,
-                hc_addresses[idx],
+                description.climate_type,
+                description.index,
+                description.base_address,
+                names={
+                    "name": description.name,
+                    "entity_id": description.entity_id,
+                    "unique_id": description.unique_id,
+                },
             )
         )
 
@@ -38,6 +38,7 @@ from .const import (
     DEFAULT_HEATING_CIRCUIT_MIN_TEMP,
     DEFAULT_HEATING_CIRCUIT_MAX_TEMP,
     DEFAULT_HEATING_CIRCUIT_TEMP_STEP,
+    DEFAULT_SHORT_CYCLE_MIN_RUNTIME,
     DEFAULT_UPDATE_INTERVAL,
     CONF_SLAVE_ID,
     FIRMWARE_VERSION,
@@ -51,6 +52,7 @@ from .const import (
     PV_SURPLUS_MODE_OPTIONS,
     DEFAULT_PV_SURPLUS_MODE,
 )
+from .modbus_transport import TRANSPORTS_KEY
 from .modbus_utils import async_read_holding_registers
 
 _LOGGER = logging.getLogger(__name__)
@@ -58,6 +60,24 @@ _LOGGER = logging.getLogger(__name__)
 
 async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> None:
     """Validate the user input allows us to connect."""
+    # Bereits verbundenes Gateway: über die bestehende Verbindung testen,
+    # viele Gateways lehnen parallele Verbindungen ab
+    transport = hass.data.get(TRANSPORTS_KEY, {}).get(
+        (data[CONF_HOST], data[CONF_PORT])
+    )
+    if transport is not None:
+        slave_id = data[CONF_SLAVE_ID]
+        try:
+            result = await transport.async_execute(
+                slave_id, async_read_holding_registers, 0, 1, slave_id
+            )
+        except Exception as ex:
+            _LOGGER.error("Connection test failed: %s", ex)
+            raise CannotConnectError("Failed to connect to device") from ex
+        if hasattr(result, "isError") and result.isError():
+            raise CannotConnectError("Failed to read from device")
+        return
+
     try:
         from pymodbus.client import AsyncModbusTcpClient
 
@@ -828,6 +848,19 @@ class LambdaOptionsFlow(OptionsFlow):
                     mode=selector.NumberSelectorMode.BOX,
                 )
             ),
+            vol.Optional(
+                "short_cycle_min_runtime",
+                default=self._options.get(
+                    "short_cycle_min_runtime", DEFAULT_SHORT_CYCLE_MIN_RUNTIME
+                ),
+            ): selector.NumberSelector(
+                selector.NumberSelectorConfig(
+                    min=1,
+                    max=60,
+                    step=1,
+                    mode=selector.NumberSelectorMode.BOX,
+                )
+            ),
         }
 
         return self.async_show_form(
@@ -136,6 +136,7 @@ HP_SENSOR_TEMPLATES = {
         "device_type": "Hp",
         "writeable": False,
         "state_class": "measurement",
+        "anomaly": {"stuck_after": 21600, "max_rate": 10},
     },
     "return_line_temperature": {
         "relative_address": 5,
@@ -148,6 +149,7 @@ HP_SENSOR_TEMPLATES = {
         "device_type": "Hp",
         "writeable": False,
         "state_class": "measurement",
+        "anomaly": {"stuck_after": 21600, "max_rate": 10},
     },
     "volume_flow_heat_sink": {
         "relative_address": 6,
@@ -160,6 +162,10 @@ HP_SENSOR_TEMPLATES = {
         "device_type": "Hp",
         "writeable": False,
         "state_class": "total",
+        "anomaly": {
+            "stuck_after": 1800,
+            "active_when": "compressor_unit_rating",
+        },
     },
     "energy_source_inlet_temperature": {
         "relative_address": 7,
@@ -172,6 +178,7 @@ HP_SENSOR_TEMPLATES = {
         "device_type": "Hp",
         "writeable": False,
         "state_class": "measurement",
+        "anomaly": {"stuck_after": 21600, "max_rate": 10},
     },
     "energy_source_outlet_temperature": {
         "relative_address": 8,
@@ -184,6 +191,7 @@ HP_SENSOR_TEMPLATES = {
         "device_type": "Hp",
         "writeable": False,
         "state_class": "measurement",
+        "anomaly": {"stuck_after": 21600, "max_rate": 10},
     },
     "volume_flow_energy_source": {
         "relative_address": 9,
@@ -267,6 +275,8 @@ HP_SENSOR_TEMPLATES = {
         "firmware_version": 1,
         "device_type": "Hp",
         "writeable": True,
+        "min_value": 0.0,
+        "max_value": 70.0,
         "state_class": "measurement",
     },
     "requested_return_line_temperature": {
@@ -279,6 +289,8 @@ HP_SENSOR_TEMPLATES = {
         "firmware_version": 1,
         "device_type": "Hp",
         "writeable": True,
+        "min_value": 0.0,
+        "max_value": 65.0,
         "state_class": "measurement",
     },
     "requested_flow_to_return_line_temperature_difference": {
@@ -291,6 +303,8 @@ HP_SENSOR_TEMPLATES = {
         "firmware_version": 1,
         "device_type": "Hp",
         "writeable": True,
+        "min_value": 0.0,
+        "max_value": 35.0,
         "state_class": "measurement",
     },
     "relais_state_2nd_heating_stage": {
@@ -624,6 +638,7 @@ BOIL_SENSOR_TEMPLATES = {
         "device_type": "boil",
         "writeable": False,
         "state_class": "measurement",
+        "anomaly": {"stuck_after": 43200, "max_rate": 5},
     },
     "actual_low_temperature": {
         "relative_address": 3,
@@ -766,7 +781,7 @@ BUFF_SENSOR_TEMPLATES = {
         "data_type": "int16",
         "firmware_version": 1,
         "device_type": "buff",
-        "writeable": False,
+        "writeable": True,
         "txt_mapping": True,
     },
     "request_flow_line_temp_setpoint": {
@@ -778,7 +793,7 @@ BUFF_SENSOR_TEMPLATES = {
         "data_type": "int16",
         "firmware_version": 1,
         "device_type": "buff",
-        "writeable": False,
+        "writeable": True,
     },
     "request_return_line_temp_setpoint": {
         "relative_address": 7,
@@ -789,7 +804,7 @@ BUFF_SENSOR_TEMPLATES = {
         "data_type": "int16",
         "firmware_version": 1,
         "device_type": "buff",
-        "writeable": False,
+        "writeable": True,
     },
     "request_heat_sink_temp_diff_setpoint": {
         "relative_address": 8,
@@ -800,7 +815,7 @@ BUFF_SENSOR_TEMPLATES = {
         "data_type": "int16",
         "firmware_version": 1,
         "device_type": "buff",
-        "writeable": False,
+        "writeable": True,
     },
     "modbus_request_heating_capacity": {
         "relative_address": 9,
@@ -811,7 +826,7 @@ BUFF_SENSOR_TEMPLATES = {
         "data_type": "int16",
         "firmware_version": 1,
         "device_type": "buff",
-        "writeable": False,
+        "writeable": True,
     },
     "maximum_buffer_temp": {
         "relative_address": 50,
@@ -822,7 +837,7 @@ BUFF_SENSOR_TEMPLATES = {
         "data_type": "int16",
         "firmware_version": 1,
         "device_type": "buff",
-        "writeable": False,
+        "writeable": True,
     },
 }
 
@@ -980,7 +995,7 @@ HC_SENSOR_TEMPLATES = {
         "data_type": "int16",
         "firmware_version": 1,
         "device_type": "hc",
-        "writeable": False,
+        "writeable": True,
         "txt_mapping": True,
     },
     "set_flow_line_offset_temperature": {
@@ -992,7 +1007,9 @@ HC_SENSOR_TEMPLATES = {
         "data_type": "int16",
         "firmware_version": 1,
         "device_type": "hc",
-        "writeable": False,
+        "writeable": True,
+        "min_value": -10.0,
+        "max_value": 10.0,
         "state_class": "measurement",
     },
     "target_room_temperature": {
@@ -1016,7 +1033,7 @@ HC_SENSOR_TEMPLATES = {
         "data_type": "int16",
         "firmware_version": 1,
         "device_type": "hc",
-        "writeable": False,
+        "writeable": True,
         "state_class": "measurement",
     },
     "target_temp_flow_line": {
@@ -1073,6 +1090,7 @@ SENSOR_TYPES = {
         "device_type": "main",
         "writeable": False,
         "state_class": "measurement",
+        "anomaly": {"stuck_after": 21600, "max_rate": 2},
     },
     "ambient_temperature_1h": {
         "address": 3,
@@ -1214,6 +1232,97 @@ DEFAULT_HEATING_CIRCUIT_MIN_TEMP = 15
 DEFAULT_HEATING_CIRCUIT_MAX_TEMP = 35
 DEFAULT_HEATING_CIRCUIT_TEMP_STEP = 0.5
 
+# Collection window for number/select writes (in seconds). Writes to
+# neighbouring registers within this window go out as one request.
+DEFAULT_WRITE_BATCH_DELAY = 0.5
+
+# Timeout for the work of one config entry in a service call (in seconds).
+# Services fan out to all entries in parallel, a slow controller only
+# affects its own result.
+DEFAULT_SERVICE_ENTRY_TIMEOUT = 15
+
+# Adaptive Modbus request timeouts (in seconds), derived from the measured
+# latency of the connection and clamped to this range
+MODBUS_TIMEOUT_MIN = 0.5
+MODBUS_TIMEOUT_MAX = 10
+
+# Circuit breaker: open after this many consecutive failed requests and send
+# a single probe request after the reset timeout (in seconds)
+CIRCUIT_BREAKER_FAILURE_THRESHOLD = 3
+CIRCUIT_BREAKER_RESET_TIMEOUT = 30
+
+# Persistence of cycling/energy counters (Home Assistant Store). Changes are
+# collected and written at most once per COUNTER_SAVE_DELAY seconds.
+COUNTER_STORE_VERSION = 1
+COUNTER_SAVE_DELAY = 60
+
+# Laufzeit-Zähler: längere Lücken zwischen zwei Abfragen (z.B. Controller
+# nicht erreichbar) werden keinem Modus zugerechnet (in Sekunden).
+RUNTIME_MAX_GAP = 300
+
+# HP-Register, die der Coordinator für die Zähler immer liest (Modus,
+# Energie-Akkumulatoren), auch wenn ihre Entities deaktiviert sind.
+HP_COUNTER_SENSORS = (
+    "operating_state",
+    "compressor_power_consumption_accumulated",
+    "compressor_thermal_energy_output_accumulated",
+    # Run-Sessions (siehe sessions.py)
+    "flow_line_temperature",
+    "return_line_temperature",
+    "energy_source_inlet_temperature",
+    "compressor_unit_rating",
+    # Abgeleitete Größen (siehe derived.py)
+    "volume_flow_heat_sink",
+    "energy_source_outlet_temperature",
+    "volume_flow_energy_source",
+    # Systemsummen (siehe aggregates.py)
+    "inverter_power_consumption",
+    "actual_heating_capacity",
+    # Heizkurve (siehe heating_curve.py)
+    "requested_flow_line_temperature",
+)
+
+# Anzahl der gespeicherten Kompressor-Sessions (Ringpuffer, alle Wärmepumpen
+# eines Entries zusammen; ein Eintrag belegt 32 Byte)
+SESSION_LOG_SIZE = 5000
+# Eigener Store des Session-Logs (geschrieben nach Abschluss einer Session)
+SESSION_STORE_VERSION = 1
+
+# Plausibilitätsgrenze der Energie-Akkumulatoren einer Wärmepumpe (W): ein
+# größerer Anstieg pro Zeit gilt als Lesefehler (siehe AccumulatorTracker)
+ACCUMULATOR_MAX_POWER = 50_000
+
+# Flankenerkennung der Betriebszustände (siehe transitions.py).
+# "count": (Option mit der Anzahl der Module, Default),
+# "modes": gezählte Modi -> operating_state Wert (Modusnamen eindeutig halten,
+# sie sind die Schlüssel der Cycling-Zähler).
+OPERATING_STATE_TRANSITIONS = {
+    "hp": {
+        "sensor": "operating_state",
+        "count": ("num_hps", 1),
+        "modes": {
+            "heating": 1,  # CH
+            "hot_water": 2,  # DHW
+            "cooling": 3,  # CC
+            "defrost": 5,  # DEFROST
+        },
+    },
+    "boil": {"sensor": "operating_state", "count": ("num_boil", 1), "modes": {}},
+    "buff": {"sensor": "operating_state", "count": ("num_buff", 0), "modes": {}},
+    "sol": {"sensor": "operating_state", "count": ("num_sol", 0), "modes": {}},
+    "hc": {"sensor": "operating_state", "count": ("num_hc", 1), "modes": {}},
+}
+
+# Fallback limits for number entities of writeable registers, by unit.
+# Templates may override them with "min_value" / "max_value".
+NUMBER_DEFAULT_LIMITS = {
+    "°C": (0.0, 80.0),
+    "K": (0.0, 35.0),
+    "kW": (0.0, 50.0),
+    "W": (-32768.0, 32767.0),
+    "%": (0.0, 100.0),
+}
+
 # Base addresses for all device types
 BASE_ADDRESSES = {
     "hp": 1000,  # Heat pumps start at 1000
@@ -1225,7 +1334,7 @@ BASE_ADDRESSES = {
 
 # Calculated Sensor Templates
 CALCULATED_SENSOR_TEMPLATES = {
-    # Beispiel für einen berechneten Sensor: COP
+    # COP aus den Akkumulator-Registern (nativ, siehe efficiency.py)
     "cop_calc": {
         "name": "COP Calculated",
         "unit": None,
@@ -1236,11 +1345,6 @@ CALCULATED_SENSOR_TEMPLATES = {
         "writeable": False,
         "state_class": "measurement",
         "device_class": None,
-        "template": (
-            "{{% set thermal = states('sensor.{full_entity_prefix}_compressor_thermal_energy_output_accumulated') | float(0) %}}"
-            "{{% set power = states('sensor.{full_entity_prefix}_compressor_power_consumption_accumulated') | float(1) %}}"
-            "{{{{ (thermal / power) | round(2) if power > 0 else 0 }}}}"
-        ),
     },
     # Statuswechsel-Sensoren (Flankenerkennung) - TOTAL
     # Diese Sensoren werden dynamisch für jede HP (und ggf. andere Geräte) erzeugt
@@ -1299,127 +1403,216 @@ CALCULATED_SENSOR_TEMPLATES = {
         "mode_value": 5,  # DEFROST
         "description": "Zählt, wie oft in den Modus Abtauen (DEFROST) gewechselt wurde.",
     },
-    # Yesterday Cycling Sensoren (echte Entities für Daily-Berechnung)
-    "heating_cycling_yesterday": {
-        "name": "Heating Cycling Yesterday",
-        "unit": "cycles",
-        "precision": 0,
-        "data_type": "calculated",
-        "firmware_version": 1,
-        "device_type": "hp",
-        "writeable": False,
-        "state_class": "total",
-        "device_class": None,
-        "description": "Speichert den Total-Wert von gestern für Daily-Berechnung.",
-    },
-    "hot_water_cycling_yesterday": {
-        "name": "Hot Water Cycling Yesterday",
+    # Weitere Modi können nach Bedarf ergänzt werden (siehe Statusmapping unten)
+}
+
+# Native Zähler pro Wärmepumpe und Modus (Werte hält der Coordinator, keine
+# Templates). Perioden-Sensoren entstehen aus rollups.py ohne Yesterday-Sensor.
+COUNTER_SENSOR_KINDS = {
+    "cycling": {
+        "name": "Cycling",
         "unit": "cycles",
         "precision": 0,
-        "data_type": "calculated",
-        "firmware_version": 1,
-        "device_type": "hp",
-        "writeable": False,
-        "state_class": "total",
         "device_class": None,
-        "description": "Speichert den Total-Wert von gestern für Daily-Berechnung.",
     },
-    "cooling_cycling_yesterday": {
-        "name": "Cooling Cycling Yesterday",
-        "unit": "cycles",
-        "precision": 0,
-        "data_type": "calculated",
-        "firmware_version": 1,
-        "device_type": "hp",
-        "writeable": False,
-        "state_class": "total",
-        "device_class": None,
-        "description": "Speichert den Total-Wert von gestern für Daily-Berechnung.",
+    "energy": {
+        "name": "Thermal Energy",
+        "unit": "kWh",
+        "precision": 2,
+        "device_class": "energy",
     },
-    "defrost_cycling_yesterday": {
-        "name": "Defrost Cycling Yesterday",
-        "unit": "cycles",
-        "precision": 0,
-        "data_type": "calculated",
-        "firmware_version": 1,
-        "device_type": "hp",
-        "writeable": False,
-        "state_class": "total",
-        "device_class": None,
-        "description": "Speichert den Total-Wert von gestern für Daily-Berechnung.",
+    "electrical_energy": {
+        "name": "Electrical Energy",
+        "unit": "kWh",
+        "precision": 2,
+        "device_class": "energy",
     },
-    # Daily Cycling Sensoren - Template-basiert
-    # Diese Sensoren berechnen die täglichen Cycling-Werte basierend auf den Total-Sensoren
-    "heating_cycling_daily": {
-        "name": "Heating Cycling Daily",
-        "unit": "cycles",
-        "precision": 0,
-        "data_type": "calculated",
-        "firmware_version": 1,
-        "device_type": "hp",
-        "writeable": False,
-        "state_class": "total",
-        "device_class": None,
-        "template": (
-            "{{% set total = states('sensor.{full_entity_prefix}_heating_cycling_total') | float(0) %}}"
-            "{{% set yesterday = states('sensor.{full_entity_prefix}_heating_cycling_yesterday') | float(0) %}}"
-            "{{{{ ((total - yesterday) | round(0)) | int }}}}"
-        ),
-        "description": "Tägliche Cycling-Zähler für Heizen, berechnet aus Total minus gestrigem Wert.",
-    },
-    "hot_water_cycling_daily": {
-        "name": "Hot Water Cycling Daily",
-        "unit": "cycles",
-        "precision": 0,
-        "data_type": "calculated",
-        "firmware_version": 1,
-        "device_type": "hp",
-        "writeable": False,
-        "state_class": "total",
-        "device_class": None,
-        "template": (
-            "{{% set total = states('sensor.{full_entity_prefix}_hot_water_cycling_total') | float(0) %}}"
-            "{{% set yesterday = states('sensor.{full_entity_prefix}_hot_water_cycling_yesterday') | float(0) %}}"
-            "{{{{ ((total - yesterday) | round(0)) | int }}}}"
-        ),
-        "description": "Tägliche Cycling-Zähler für Warmwasser, berechnet aus Total minus gestrigem Wert.",
-    },
-    "cooling_cycling_daily": {
-        "name": "Cooling Cycling Daily",
-        "unit": "cycles",
-        "precision": 0,
-        "data_type": "calculated",
-        "firmware_version": 1,
-        "device_type": "hp",
-        "writeable": False,
-        "state_class": "total",
-        "device_class": None,
-        "template": (
-            "{{% set total = states('sensor.{full_entity_prefix}_cooling_cycling_total') | float(0) %}}"
-            "{{% set yesterday = states('sensor.{full_entity_prefix}_cooling_cycling_yesterday') | float(0) %}}"
-            "{{{{ ((total - yesterday) | round(0)) | int }}}}"
-        ),
-        "description": "Tägliche Cycling-Zähler für Kühlen, berechnet aus Total minus gestrigem Wert.",
-    },
-    "defrost_cycling_daily": {
-        "name": "Defrost Cycling Daily",
-        "unit": "cycles",
-        "precision": 0,
-        "data_type": "calculated",
-        "firmware_version": 1,
-        "device_type": "hp",
-        "writeable": False,
-        "state_class": "total",
-        "device_class": None,
-        "template": (
-            "{{% set total = states('sensor.{full_entity_prefix}_defrost_cycling_total') | float(0) %}}"
-            "{{% set yesterday = states('sensor.{full_entity_prefix}_defrost_cycling_yesterday') | float(0) %}}"
-            "{{{{ ((total - yesterday) | round(0)) | int }}}}"
-        ),
-        "description": "Tägliche Cycling-Zähler für Abtauen, berechnet aus Total minus gestrigem Wert.",
+    "runtime": {
+        "name": "Runtime",
+        "unit": "h",
+        "precision": 2,
+        "device_class": "duration",
     },
-    # Weitere Modi können nach Bedarf ergänzt werden (siehe Statusmapping unten)
 }
+COUNTER_SENSOR_PERIODS = ("total", "daily", "monthly", "yearly")
+
+for _mode in OPERATING_STATE_TRANSITIONS["hp"]["modes"]:
+    for _kind, _info in COUNTER_SENSOR_KINDS.items():
+        for _period in COUNTER_SENSOR_PERIODS:
+            _sensor_id = f"{_mode}_{_kind}_{_period}"
+            if _sensor_id in CALCULATED_SENSOR_TEMPLATES:
+                continue
+            CALCULATED_SENSOR_TEMPLATES[_sensor_id] = {
+                "name": f"{_mode.replace('_', ' ').title()} {_info['name']} "
+                f"{_period.title()}",
+                "unit": _info["unit"],
+                "precision": _info["precision"],
+                "data_type": "calculated",
+                "firmware_version": 1,
+                "device_type": "hp",
+                "writeable": False,
+                "state_class": "total_increasing" if _period == "total" else "total",
+                "device_class": _info["device_class"],
+            }
+del _mode, _kind, _info, _period, _sensor_id
+
+# Rollierende COP-Fenster: Name -> (Fenster, Bucket-Größe) in Sekunden.
+# Dazu Jahresarbeitszahl (JAZ) aus den Jahres-Baselines der Kompressor-Energie.
+COP_WINDOWS = {
+    "1h": (3600, 60),
+    "24h": (86400, 900),
+    "7d": (604800, 3600),
+}
+# Kennzahl -> (sensor_id, Name); "calc" = Lebensdauer-COP der Akkumulatoren
+EFFICIENCY_METRICS = {
+    "calc": ("cop_calc", "COP Calculated"),
+    **{window: (f"cop_{window}", f"COP {window}") for window in COP_WINDOWS},
+    "jaz": ("jaz", "JAZ"),
+}
+
+for _sensor_id, _name in EFFICIENCY_METRICS.values():
+    for _device_type, _prefix in (("hp", ""), ("main", "System ")):
+        _id = f"{_prefix.strip().lower()}_{_sensor_id}" if _prefix else _sensor_id
+        CALCULATED_SENSOR_TEMPLATES.setdefault(
+            _id,
+            {
+                "name": f"{_prefix}{_name}",
+                "unit": None,
+                "precision": 2,
+                "data_type": "calculated",
+                "firmware_version": 1,
+                "device_type": _device_type,
+                "writeable": False,
+                "state_class": "measurement",
+                "device_class": None,
+            },
+        )
+del _sensor_id, _name, _device_type, _prefix, _id
+
+# Taktungs-Erkennung: Kompressorläufe kürzer als die Mindestlaufzeit
+# (Option "short_cycle_min_runtime", Minuten) innerhalb von
+# SHORT_CYCLE_WINDOW Sekunden. Jeder kurze Lauf löst EVENT_SHORT_CYCLE aus.
+DEFAULT_SHORT_CYCLE_MIN_RUNTIME = 10
+SHORT_CYCLE_WINDOW = 86400
+EVENT_SHORT_CYCLE = f"{DOMAIN}_short_cycle"
+
+CALCULATED_SENSOR_TEMPLATES["short_cycles"] = {
+    "name": "Short Cycles 24h",
+    "unit": "cycles",
+    "precision": 0,
+    "data_type": "calculated",
+    "firmware_version": 1,
+    "device_type": "hp",
+    "writeable": False,
+    "state_class": "measurement",
+    "device_class": None,
+}
+
+# Berechnete Sensoren mit "expression" (siehe expressions.py): Namen sind
+# coordinator.data Keys, "{prefix}" wird durch das Gerät (z.B. "hp1")
+# ersetzt. Jinja ("template") bleibt für eigene Formeln möglich.
+CALCULATED_SENSOR_TEMPLATES.update(
+    {
+        "superheat": {
+            "name": "Superheat",
+            "unit": "K",
+            "precision": 1,
+            "data_type": "calculated",
+            "firmware_version": 1,
+            "device_type": "hp",
+            "writeable": False,
+            "state_class": "measurement",
+            "device_class": None,
+            "expression": (
+                "{prefix}_suction_gas_temperature - {prefix}_evaporation_temperature"
+            ),
+        },
+        "flow_line_deviation": {
+            "name": "Flow Line Deviation",
+            "unit": "K",
+            "precision": 1,
+            "data_type": "calculated",
+            "firmware_version": 1,
+            "device_type": "hc",
+            "writeable": False,
+            "state_class": "measurement",
+            "device_class": None,
+            "expression": (
+                "{prefix}_flow_line_temperature - {prefix}_target_temp_flow_line"
+            ),
+        },
+    }
+)
+
+# Physikalisch abgeleitete Werte der Wärmepumpen (siehe derived.py), je
+# Wärmepumpe in lambda_wp_config.yaml (derived_sensors) konfigurierbar.
+# Reihenfolge entspricht der Berechnung in DerivedQuantities.evaluate().
+DERIVED_QUANTITIES = (
+    "thermal_power",
+    "source_power",
+    "flow_return_spread",
+    "source_spread",
+)
+# Spezifische Wärmekapazität von Wasser in Wh/(l*K)
+DERIVED_SPECIFIC_HEAT = 1.163
+
+CALCULATED_SENSOR_TEMPLATES.update(
+    {
+        "thermal_power": {
+            "name": "Thermal Power",
+            "unit": "W",
+            "precision": 0,
+            "data_type": "calculated",
+            "firmware_version": 1,
+            "device_type": "hp",
+            "writeable": False,
+            "state_class": "measurement",
+            "device_class": "power",
+            "derived": True,
+        },
+        "source_power": {
+            "name": "Source Power",
+            "unit": "W",
+            "precision": 0,
+            "data_type": "calculated",
+            "firmware_version": 1,
+            "device_type": "hp",
+            "writeable": False,
+            "state_class": "measurement",
+            "device_class": "power",
+            "derived": True,
+        },
+        "flow_return_spread": {
+            "name": "Flow Return Spread",
+            "unit": "K",
+            "precision": 1,
+            "data_type": "calculated",
+            "firmware_version": 1,
+            "device_type": "hp",
+            "writeable": False,
+            "state_class": "measurement",
+            "device_class": None,
+            "derived": True,
+        },
+        "source_spread": {
+            "name": "Source Spread",
+            "unit": "K",
+            "precision": 1,
+            "data_type": "calculated",
+            "firmware_version": 1,
+            "device_type": "hp",
+            "writeable": False,
+            "state_class": "measurement",
+            "device_class": None,
+            "derived": True,
+        },
+    }
+)
+
+# Modulations-Histogramme (Sekunden pro compressor_unit_rating-Bereich)
+# pro Wärmepumpe und Modus, Perzentile als Attribute der Tageslaufzeit
+MODULATION_BIN_WIDTH = 10  # %
+MODULATION_PERCENTILES = (10, 50, 90)
 
 # Statusmapping für operating_state (nur zur Referenz, nicht direkt im Template genutzt)
 OPERATING_STATE_MAP = {
@@ -1498,4 +1691,140 @@ cycling_offsets:
     hot_water_cycling_total: 0
     cooling_cycling_total: 0
     defrost_cycling_total: 0
+
+# Derived sensors (thermal power, source power, spreads) per heat pump.
+# Without this section all values are calculated with the specific heat of
+# water (1.163 Wh/(l*K)). Use source_specific_heat for brine, e.g. 1.07 for
+# 30 % glycol, or enabled: false to switch a heat pump off.
+#derived_sensors:
+#  hp1:
+#    quantities: [thermal_power, source_power, flow_return_spread, source_spread]
+#    sink_specific_heat: 1.163
+#    source_specific_heat: 1.07
+#  hp2:
+#    enabled: false
 """
+
+
+# Systemsummen über alle Wärmepumpen eines Entries (siehe aggregates.py):
+# data Key -> summierter Wärmepumpen-Sensor
+SYSTEM_SUM_SENSORS = {
+    "system_electrical_power": "inverter_power_consumption",  # W
+    "system_heat_output": "actual_heating_capacity",  # kW
+}
+# hass.data Key des gemeinsamen Aggregators aller Entries (Anlage)
+SITE_AGGREGATOR_KEY = f"{DOMAIN}_site"
+
+_SYSTEM_SENSOR_BASE = {
+    "data_type": "calculated",
+    "firmware_version": 1,
+    "device_type": "main",
+    "writeable": False,
+}
+SYSTEM_SENSOR_TEMPLATES = {
+    "system_electrical_power": {
+        **_SYSTEM_SENSOR_BASE,
+        "name": "System Electrical Power",
+        "unit": "W",
+        "precision": 0,
+        "state_class": "measurement",
+        "device_class": "power",
+    },
+    "system_heat_output": {
+        **_SYSTEM_SENSOR_BASE,
+        "name": "System Heat Output",
+        "unit": "kW",
+        "precision": 1,
+        "state_class": "measurement",
+        "device_class": "power",
+    },
+    "system_cop": {
+        **_SYSTEM_SENSOR_BASE,
+        "name": "System COP",
+        "unit": None,
+        "precision": 2,
+        "state_class": "measurement",
+        "device_class": None,
+    },
+    **{
+        f"system_{mode}_cycling_total": {
+            **_SYSTEM_SENSOR_BASE,
+            "name": f"System {mode.replace('_', ' ').title()} Cycling Total",
+            "unit": "cycles",
+            "precision": 0,
+            "state_class": "total_increasing",
+            "device_class": None,
+        }
+        for mode in OPERATING_STATE_TRANSITIONS["hp"]["modes"]
+    },
+}
+
+# Gleitende Statistiken (siehe rolling.py) als Attribute dieser Sensoren:
+# Gerätetyp -> sensor_ids ("main" = allgemeine Sensoren ohne Präfix)
+ROLLING_STATISTICS_SENSORS = {
+    "hp": (
+        "flow_line_temperature",
+        "return_line_temperature",
+        "inverter_power_consumption",
+    ),
+    "boil": ("actual_high_temperature",),
+    "main": ("ambient_temperature",),
+}
+# Fenster -> (Sekunden, Anzahl Buckets)
+ROLLING_STATISTICS_WINDOWS = {
+    "1h": (3600, 60),
+    "24h": (86400, 96),
+}
+ROLLING_STATISTICS_ATTRIBUTES = frozenset(
+    f"{name}_{label}"
+    for name in ("min", "max", "mean", "std")
+    for label in ROLLING_STATISTICS_WINDOWS
+)
+
+# Gelernte Heizkurve (siehe heating_curve.py): Vorlauf über Außentemperatur
+# je Heizkreis und Wärmepumpe. Gelernt wird nur im Heizbetrieb, frühere
+# Werte verlieren mit der Halbwertszeit an Gewicht.
+HEATING_CURVE_AMBIENT = "ambient_temperature_calculated"
+HEATING_CURVE_HALF_LIFE = 14 * 86400  # s
+HEATING_CURVE_MIN_WEIGHT = 120  # Samples (gewichtet)
+HEATING_CURVE_MIN_SPREAD = 2.0  # K Standardabweichung der Außentemperatur
+# Gerätetyp -> (Betriebszustand-Werte "Heizen", Sensor der Vorlauf-Vorgabe)
+HEATING_CURVE_DEVICES = {
+    "hc": ((0,), "target_temp_flow_line"),  # HEATING
+    "hp": ((1,), "requested_flow_line_temperature"),  # CH
+}
+_HEATING_CURVE_SENSOR_BASE = {
+    "data_type": "calculated",
+    "firmware_version": 1,
+    "writeable": False,
+    "state_class": "measurement",
+}
+HEATING_CURVE_SENSOR_TEMPLATES = {
+    "heating_curve_slope": {
+        **_HEATING_CURVE_SENSOR_BASE,
+        "name": "Heating Curve Slope",
+        "unit": "K/K",
+        "precision": 2,
+        "device_class": None,
+    },
+    "heating_curve_flow_at_0c": {
+        **_HEATING_CURVE_SENSOR_BASE,
+        "name": "Heating Curve Flow At 0°C",
+        "unit": "°C",
+        "precision": 1,
+        "device_class": "temperature",
+    },
+    "heating_curve_deviation": {
+        **_HEATING_CURVE_SENSOR_BASE,
+        "name": "Heating Curve Deviation",
+        "unit": "K",
+        "precision": 1,
+        "device_class": None,
+    },
+}
+
+# Anomalie-Erkennung (siehe anomalies.py): Schwellen stehen im Feld
+# "anomaly" der Sensor-Templates (stuck_after s, max_rate je Minute,
+# active_when sensor_id des Moduls)
+ANOMALY_JUMP_HOLD = 600  # s, so lange bleibt "jump" nach einem Sprung aktiv
+EVENT_ANOMALY = f"{DOMAIN}_anomaly"
@@ -1,12 +1,16 @@
 """Data update coordinator for Lambda."""
 
 from __future__ import annotations
-from datetime import timedelta
+from datetime import date, datetime, timedelta
+from graphlib import CycleError
+import asyncio
 import logging
 import os
 import yaml
 import json
+import zlib
 from pathlib import Path
+from typing import Callable
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers.update_coordinator import (
@@ -15,7 +19,9 @@ from homeassistant.helpers.update_coordinator import (
 )
 from homeassistant.helpers.entity_registry import async_get as async_get_entity_registry
 from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.storage import Store
 from homeassistant.util import Throttle
+import homeassistant.util.dt as dt_util
 from .const import (
     SENSOR_TYPES,
     HP_SENSOR_TEMPLATES,
@@ -24,19 +30,81 @@ from .const import (
     SOL_SENSOR_TEMPLATES,
     HC_SENSOR_TEMPLATES,
     DEFAULT_UPDATE_INTERVAL,
+    DEFAULT_WRITE_BATCH_DELAY,
+    MODBUS_TIMEOUT_MIN,
+    MODBUS_TIMEOUT_MAX,
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+    CIRCUIT_BREAKER_RESET_TIMEOUT,
+    COUNTER_STORE_VERSION,
+    SESSION_STORE_VERSION,
+    COUNTER_SAVE_DELAY,
+    COP_WINDOWS,
+    HP_COUNTER_SENSORS,
+    SESSION_LOG_SIZE,
+    DEFAULT_SHORT_CYCLE_MIN_RUNTIME,
+    SHORT_CYCLE_WINDOW,
+    EVENT_SHORT_CYCLE,
+    MODULATION_BIN_WIDTH,
+    MODULATION_PERCENTILES,
+    OPERATING_STATE_TRANSITIONS,
     CALCULATED_SENSOR_TEMPLATES,
+    ROLLING_STATISTICS_SENSORS,
+    HEATING_CURVE_AMBIENT,
+    HEATING_CURVE_DEVICES,
+    HEATING_CURVE_HALF_LIFE,
+    HEATING_CURVE_MIN_SPREAD,
+    HEATING_CURVE_MIN_WEIGHT,
+    ANOMALY_JUMP_HOLD,
+    EVENT_ANOMALY,
+    ROLLING_STATISTICS_WINDOWS,
+    RUNTIME_MAX_GAP,
+    ACCUMULATOR_MAX_POWER,
+    DOMAIN,
 )
 from .utils import (
     load_disabled_registers,
     is_register_disabled,
+    AccumulatorTracker,
+    changed_keys,
     generate_base_addresses,
     to_signed_16bit,
     to_signed_32bit,
-    increment_cycling_counter,
     get_firmware_version_int,
     get_compatible_sensors,
 )
-from .modbus_utils import async_read_holding_registers
+from .calculations import CalculationGraph
+from .derived import DerivedQuantities, parse_derived_config
+from .rolling import RollingStatistics
+from .heating_curve import CurveSeries, HeatingCurves
+from .anomalies import AnomalyDetector, AnomalyThresholds
+from .aggregates import (
+    SystemAggregator,
+    get_site_aggregator,
+    release_site_aggregator,
+)
+from .efficiency import EfficiencyTracker
+from .expressions import Expression
+from .modulation import ModulationHistograms
+from .rollups import PeriodRollups
+from .sessions import SessionLog, SessionTracker
+from .short_cycles import ShortCycleDetector
+from .transitions import StateTransition, TransitionEngine
+from .modbus_transport import (
+    async_get_shared_transport,
+    async_release_shared_transport,
+)
+from .modbus_utils import (
+    async_read_holding_registers,
+    async_read_write_registers,
+    async_write_registers,
+    ModbusWriteBatcher,
+    ModbusWriteError,
+    ILLEGAL_FUNCTION,
+    LatencyTracker,
+    CircuitBreaker,
+    CircuitOpenError,
+    CIRCUIT_CLOSED,
+)
 import time
 import json
 
@@ -76,16 +144,83 @@ class LambdaDataUpdateCoordinator(DataUpdateCoordinator):
         self._config_path = os.path.join(self._config_dir, "lambda_heat_pumps")
         self.hass = hass
         self.entry = entry
-        self._last_operating_state = {}
-        self._heating_cycles = {}
-        self._heating_energy = {}
-        self._last_energy_update = {}
+        self._transitions = TransitionEngine(OPERATING_STATE_TRANSITIONS)
+        self._transition_listeners = []
+        # Zähler pro Modus und Wärmepumpe: {mode: {hp_idx: value}}
+        self._mode_cycles = {}
+        # Energie in kWh aus den Akkumulator-Registern der Wärmepumpe
+        self._mode_energy = {}  # thermisch
+        self._mode_electrical = {}
+        # Kompressor-Energie aller Modi: {"electrical"|"thermal": {hp_idx: kWh}}
+        self._compressor_energy = {}
+        # Rollierende COP-Fenster (nur im Speicher)
+        self._efficiency = EfficiencyTracker(COP_WINDOWS)
+        # Laufzeit in Sekunden: {mode: {hp_idx: seconds}}
+        self._mode_runtime = {}
+        # Letzte Abfrage pro Wärmepumpe: (time.monotonic(), aktiver Modus)
+        self._runtime_last = {}
+        # Perioden-Baselines (Tag/Monat/Jahr) aller Zähler
+        self._rollups = PeriodRollups()
+        # Akkumulatoren pro Wärmepumpe: (elektrisch, thermisch) und der
+        # Modus der letzten Abfrage
+        self._energy_accumulators = {}
+        self._last_energy_mode = {}
+        # Kompressor-Sessions (Ein-/Austritt eines gezählten HP-Modus)
+        self._sessions = SessionTracker(
+            SessionLog(
+                SESSION_LOG_SIZE,
+                tuple(OPERATING_STATE_TRANSITIONS["hp"]["modes"]),
+            )
+        )
+        # Zeit pro Modulationsbereich (heute/gestern) und letzte Abfrage
+        # pro Wärmepumpe: (time.monotonic(), aktiver Modus, Modulation)
+        self._modulation = ModulationHistograms(MODULATION_BIN_WIDTH)
+        self.heating_curves = HeatingCurves(
+            HEATING_CURVE_HALF_LIFE, HEATING_CURVE_MIN_WEIGHT, HEATING_CURVE_MIN_SPREAD
+        )
+        self._modulation_last = {}
+        # Berechnete Werte ("expression"-Templates), nach Abhängigkeiten
+        # sortiert, werden nach jedem Poll in coordinator.data geschrieben
+        self.calculations = CalculationGraph()
+        self.derived = DerivedQuantities({})
+        self.system = SystemAggregator(0)
+        self.rolling = RollingStatistics((), {})
+        self.anomalies = AnomalyDetector({}, ANOMALY_JUMP_HOLD)
+        self.anomaly_registers = {}
+        self._calculations_built = False
+        # Keys, deren Wert sich im letzten Zyklus geändert hat (None = alle)
+        self.changed_keys = None
+        # Taktungs-Erkennung pro Wärmepumpe (nur im Speicher)
+        self._short_cycles = {}
         self._cycling_offsets = {}
         self._energy_offsets = {}
+        self._derived_config = {}
         self._use_legacy_names = entry.data.get("use_legacy_modbus_names", True)
+        # Alte Persistenz-Datei, wird beim ersten Laden in den Store migriert
         self._persist_file = os.path.join(
             self._config_path, "cycle_energy_persist.json"
         )
+        self._store = Store(
+            hass,
+            COUNTER_STORE_VERSION,
+            f"{DOMAIN}.counters.{entry.entry_id}",
+            atomic_writes=True,
+        )
+        self._counters_save_pending = False
+        # Session-Log in eigenem Store: wird nur nach dem Abschluss einer
+        # Session geschrieben, nicht mit jeder Zähleränderung
+        self._sessions_store = Store(
+            hass,
+            SESSION_STORE_VERSION,
+            f"{DOMAIN}.sessions.{entry.entry_id}",
+            atomic_writes=True,
+        )
+        self._sessions_save_pending = False
+        # Cycling-Total-Entities, direkt über (hp_idx, mode) erreichbar
+        self._cycling_entities = {}
+        # (hp_idx, mode) mit Zählerstand aus dem Store (sonst Übernahme
+        # des wiederhergestellten Entity-Zustands)
+        self._cycling_loaded = set()
 
         # Entity-based polling control - simplified approach
         self._enabled_addresses = set()  # Aktuell aktivierte Register-Adressen
@@ -94,21 +229,518 @@ class LambdaDataUpdateCoordinator(DataUpdateCoordinator):
         self._entity_registry = None  # Initialize entity registry reference
         self._registry_listener = None  # Initialize registry listener reference
 
+        # Serialisiert Polling, Schreibzugriffe und Service-Aufrufe auf der
+        # Modbus-Verbindung dieses Entries
+        self.connection_lock = asyncio.Lock()
+
+        # Gemeinsame TCP-Verbindung pro (host, port), siehe modbus_transport
+        self._transport = None
+
+        # Adaptive Timeouts und Circuit Breaker für Modbus-Anfragen
+        self.latency = LatencyTracker(MODBUS_TIMEOUT_MIN, MODBUS_TIMEOUT_MAX)
+        self.circuit_breaker = CircuitBreaker(
+            CIRCUIT_BREAKER_FAILURE_THRESHOLD, CIRCUIT_BREAKER_RESET_TIMEOUT
+        )
+
+        # FC23 (Read/Write Multiple Registers) Unterstützung, je Verbindung
+        # ermittelt: None = unbekannt, True/False = getestet
+        self._fc23_supported = None
+
+        # Schreibzugriffe von number/select Entitäten werden gebündelt
+        self._write_batcher = ModbusWriteBatcher(
+            self._async_write_batch, DEFAULT_WRITE_BATCH_DELAY
+        )
+
         # self._load_offsets_and_persisted() ENTFERNT!
 
-    async def _persist_counters(self):
-        """Persist counter data to file using Home Assistant's file operations."""
-        data = {
-            "heating_cycles": self._heating_cycles,
-            "heating_energy": self._heating_energy,
+    def _counters_to_store(self) -> dict:
+        """Return the counter data for the Store (called when it writes)."""
+        self._counters_save_pending = False
+        return {
+            "cycles": self._mode_cycles,
+            "energy": self._mode_energy,
+            "electrical_energy": self._mode_electrical,
+            "compressor_energy": self._compressor_energy,
+            "runtime": self._mode_runtime,
+            "rollups": self._rollups.as_dict(),
+            "modulation": self._modulation.as_dict(),
+            "heating_curves": self.heating_curves.as_dict(),
+        }
+
+    def _mark_counters_dirty(self):
+        """Schedule a delayed save after a counter changed.
+
+        Only one save is scheduled at a time, so continuously changing
+        counters are written once per COUNTER_SAVE_DELAY instead of on
+        every poll. The Store writes to a temp file and renames it.
+        """
+        if self._counters_save_pending:
+            return
+        self._counters_save_pending = True
+        self._store.async_delay_save(self._counters_to_store, COUNTER_SAVE_DELAY)
+
+    def _sessions_to_store(self) -> dict:
+        """Return the session log for its Store (called when it writes)."""
+        self._sessions_save_pending = False
+        return {"log": self._sessions.log.dumps()}
+
+    def _mark_sessions_dirty(self):
+        """Schedule a delayed save of the session log after a session closed."""
+        if self._sessions_save_pending:
+            return
+        self._sessions_save_pending = True
+        self._sessions_store.async_delay_save(
+            self._sessions_to_store, COUNTER_SAVE_DELAY
+        )
+
+    async def _async_flush_counters(self):
+        """Write pending counter and session log changes immediately."""
+        if self._counters_save_pending:
+            await self._store.async_save(self._counters_to_store())
+        if self._sessions_save_pending:
+            await self._sessions_store.async_save(self._sessions_to_store())
+
+    @staticmethod
+    def _counters_from_json(data: dict) -> dict:
+        """Convert {mode: {"1": value}} from JSON to {mode: {1: value}}."""
+        return {
+            mode: {
+                int(hp_idx): value
+                for hp_idx, value in values.items()
+                if str(hp_idx).isdigit()
+            }
+            for mode, values in (data or {}).items()
+        }
+
+    async def _load_persisted_counters(self):
+        """Load counters from the Store, migrating the legacy JSON file."""
+        stored = await self._store.async_load()
+        if stored is None and os.path.exists(self._persist_file):
+
+            def _read_persist():
+                with open(self._persist_file) as f:
+                    return json.loads(f.read())
+
+            try:
+                legacy = await self.hass.async_add_executor_job(_read_persist)
+                stored = {
+                    "cycles": {"heating": legacy.get("heating_cycles", {})},
+                    "energy": {"heating": legacy.get("heating_energy", {})},
+                }
+                await self._store.async_save(stored)
+                await self.hass.async_add_executor_job(os.remove, self._persist_file)
+                _LOGGER.info(
+                    "Migrated %s to Home Assistant storage", self._persist_file
+                )
+            except Exception as ex:
+                _LOGGER.warning(
+                    "Could not migrate %s: %s", self._persist_file, ex
+                )
+                stored = None
+        if stored:
+            self._mode_cycles = self._counters_from_json(stored.get("cycles"))
+            self._mode_energy = self._counters_from_json(stored.get("energy"))
+            self._mode_electrical = self._counters_from_json(
+                stored.get("electrical_energy")
+            )
+            self._compressor_energy = self._counters_from_json(
+                stored.get("compressor_energy")
+            )
+            self._mode_runtime = self._counters_from_json(stored.get("runtime"))
+            self._rollups.load(stored.get("rollups"))
+            self._modulation.load(stored.get("modulation"))
+            self.heating_curves.load(stored.get("heating_curves"))
+            self._cycling_loaded = {
+                (hp_idx, mode)
+                for mode, values in self._mode_cycles.items()
+                for hp_idx in values
+            }
+
+        sessions = await self._sessions_store.async_load()
+        if sessions is None and stored and stored.get("sessions"):
+            # Früher Teil des Zähler-Stores -> in den eigenen Store übernehmen
+            sessions = {"log": stored["sessions"]}
+            self._mark_sessions_dirty()
+        if sessions:
+            try:
+                self._sessions.log.loads(sessions.get("log"))
+            except (ValueError, zlib.error) as ex:
+                _LOGGER.warning("Could not restore the session log: %s", ex)
+
+    # --- Cycling-Zähler ---
+
+    def _cycling_offset(self, hp_idx: int, mode: str) -> int:
+        """Return the configured offset of a cycling total counter."""
+        offsets = self._cycling_offsets.get(f"hp{hp_idx}") or {}
+        try:
+            return int(offsets.get(f"{mode}_cycling_total", 0))
+        except (AttributeError, TypeError, ValueError):
+            return 0
+
+    def get_cycling_total(self, hp_idx: int, mode: str) -> int:
+        """Return the cycling total (counted cycles plus offset)."""
+        raw = self._mode_cycles.get(mode, {}).get(hp_idx, 0)
+        return raw + self._cycling_offset(hp_idx, mode)
+
+    def register_cycling_entity(self, hp_idx: int, mode: str, entity) -> None:
+        """Register the entity publishing the total of (hp_idx, mode)."""
+        self._cycling_entities[(hp_idx, mode)] = entity
+
+    def unregister_cycling_entity(self, hp_idx: int, mode: str) -> None:
+        self._cycling_entities.pop((hp_idx, mode), None)
+
+    def seed_cycling_total(self, hp_idx: int, mode: str, total: int) -> None:
+        """Take over a restored entity total if no count was stored yet.
+
+        Used once after upgrading from the state based counters so the
+        total_increasing sensors do not drop back to the offset.
+        """
+        key = (hp_idx, mode)
+        if key in self._cycling_loaded:
+            return
+        self._cycling_loaded.add(key)
+        seeded = max(0, int(total) - self._cycling_offset(hp_idx, mode))
+        cycles = self._mode_cycles.setdefault(mode, {})
+        cycles[hp_idx] = cycles.get(hp_idx, 0) + seeded
+        # Übernommene Zyklen gehören zu keiner laufenden Periode
+        self._rollups.shift(f"cycling:{mode}:{hp_idx}", seeded)
+        self._mark_counters_dirty()
+
+    # --- Laufzeit-Zähler ---
+
+    def _accumulate_runtime(self, hp_idx: int, mode: str | None, now: float) -> bool:
+        """Add the time since the last poll to the mode that was active.
+
+        Uses the measured (monotonic) time between two polls instead of the
+        configured interval. Returns True if a counter changed.
+        """
+        last = self._runtime_last.get(hp_idx)
+        self._runtime_last[hp_idx] = (now, mode)
+        if last is None or last[1] is None:
+            return False
+        elapsed = now - last[0]
+        if not 0 < elapsed <= RUNTIME_MAX_GAP:
+            return False
+        runtime = self._mode_runtime.setdefault(last[1], {})
+        runtime[hp_idx] = runtime.get(hp_idx, 0.0) + elapsed
+        return True
+
+    def _accumulate_modulation(
+        self, hp_idx: int, mode: str | None, data: dict, now: float
+    ) -> bool:
+        """Add the time since the last poll to the previous modulation bin.
+
+        Time with the compressor off (rating 0) is not counted. Returns True
+        if a histogram changed.
+        """
+        rating = data.get(f"hp{hp_idx}_compressor_unit_rating")
+        last = self._modulation_last.get(hp_idx)
+        self._modulation_last[hp_idx] = (now, mode, rating)
+        if last is None or last[1] is None or last[2] is None or last[2] <= 0:
+            return False
+        elapsed = now - last[0]
+        if not 0 < elapsed <= RUNTIME_MAX_GAP:
+            return False
+        self._modulation.add(hp_idx, last[1], last[2], elapsed)
+        return True
+
+    def get_modulation_histograms(
+        self, hp_index: int | None = None, mode: str | None = None
+    ) -> dict:
+        """Return {"hp1": {mode: {"today": [...], "yesterday": [...]}}}.
+
+        The lists hold seconds per MODULATION_BIN_WIDTH % bin.
+        """
+        result = {}
+        for hp_idx, hp_mode in self._modulation.keys():
+            if hp_index is not None and hp_idx != hp_index:
+                continue
+            if mode is not None and hp_mode != mode:
+                continue
+            result.setdefault(f"hp{hp_idx}", {})[hp_mode] = {
+                day: self._modulation.get(hp_idx, hp_mode, day)
+                for day in ("today", "yesterday")
+            }
+        return result
+
+    def get_modulation_percentiles(self, hp_idx: int, mode: str) -> dict:
+        """Return the modulation percentiles (%) of today."""
+        return {
+            f"modulation_p{percent}": round(value, 1) if value is not None else None
+            for percent, value in self._modulation.percentiles(
+                hp_idx, mode, MODULATION_PERCENTILES
+            ).items()
+        }
+
+    def _attribute_energy(
+        self, hp_idx: int, mode: str | None, data: dict, now: float
+    ) -> bool:
+        """Attribute the energy accumulator deltas since the last poll.
+
+        The compressor counters (Wh, int32) of the heat pump are exact, so
+        the increase between two polls is added to the mode that was active
+        since the previous poll, independent of the poll interval. The
+        totals of all modes feed the COP windows and the JAZ. Glitches and
+        resets of the counters are filtered by AccumulatorTracker. Returns
+        True if a counter changed.
+        """
+        electrical = data.get(f"hp{hp_idx}_compressor_power_consumption_accumulated")
+        thermal = data.get(f"hp{hp_idx}_compressor_thermal_energy_output_accumulated")
+        if electrical is None or thermal is None:
+            return False
+        accumulators = self._energy_accumulators.get(hp_idx)
+        if accumulators is None:
+            accumulators = self._energy_accumulators[hp_idx] = (
+                AccumulatorTracker(ACCUMULATOR_MAX_POWER),
+                AccumulatorTracker(ACCUMULATOR_MAX_POWER),
+            )
+        last_mode = self._last_energy_mode.get(hp_idx)
+        self._last_energy_mode[hp_idx] = mode
+        deltas = {
+            "electrical": accumulators[0].update(electrical, now) / 1000,
+            "thermal": accumulators[1].update(thermal, now) / 1000,
+        }
+        if not any(deltas.values()):
+            return False
+        self._efficiency.add(hp_idx, now, deltas["electrical"], deltas["thermal"])
+        for energy_type, counters in (
+            ("electrical", self._mode_electrical),
+            ("thermal", self._mode_energy),
+        ):
+            totals = self._compressor_energy.setdefault(energy_type, {})
+            totals[hp_idx] = totals.get(hp_idx, 0.0) + deltas[energy_type]
+            if last_mode is not None:
+                values = counters.setdefault(last_mode, {})
+                values[hp_idx] = values.get(hp_idx, 0.0) + deltas[energy_type]
+        return True
+
+    # --- Taktung ---
+
+    def _short_cycle_detector(self, hp_idx: int) -> ShortCycleDetector:
+        min_runtime = 60 * self.entry.options.get(
+            "short_cycle_min_runtime", DEFAULT_SHORT_CYCLE_MIN_RUNTIME
+        )
+        detector = self._short_cycles.get(hp_idx)
+        if detector is None:
+            detector = ShortCycleDetector(min_runtime, SHORT_CYCLE_WINDOW)
+            self._short_cycles[hp_idx] = detector
+        # Optionsänderung gilt ab dem nächsten Lauf
+        detector.min_runtime = min_runtime
+        return detector
+
+    def _check_short_cycle(self, hp_idx: int, data: dict, now: float) -> None:
+        """Track the compressor on/off edge and fire EVENT_SHORT_CYCLE."""
+        rating = data.get(f"hp{hp_idx}_compressor_unit_rating")
+        if rating is None:
+            return
+        detector = self._short_cycle_detector(hp_idx)
+        runtime = detector.update(rating > 0, now)
+        if runtime is None:
+            return
+        count = detector.count(now)
+        _LOGGER.info(
+            "hp%d: short compressor run of %.0f s (%d in the last %d h)",
+            hp_idx,
+            runtime,
+            count,
+            SHORT_CYCLE_WINDOW // 3600,
+        )
+        self.hass.bus.async_fire(
+            EVENT_SHORT_CYCLE,
+            {
+                "entry_id": self.entry.entry_id,
+                "hp_index": hp_idx,
+                "runtime": round(runtime),
+                "min_runtime": round(detector.min_runtime),
+                "count": count,
+            },
+        )
+
+    def get_short_cycles(self, hp_idx: int) -> int:
+        """Return the number of short compressor runs in SHORT_CYCLE_WINDOW."""
+        detector = self._short_cycles.get(hp_idx)
+        return detector.count(time.monotonic()) if detector else 0
+
+    def get_short_cycle_attributes(self, hp_idx: int) -> dict:
+        detector = self._short_cycle_detector(hp_idx)
+        last = detector.last_runtime
+        return {
+            "min_runtime": round(detector.min_runtime),
+            "last_runtime": round(last) if last is not None else None,
+        }
+
+    # --- COP / JAZ ---
+
+    def get_efficiency(self, hp_idx: int, metric: str) -> float | None:
+        """Return a COP of COP_WINDOWS, "jaz" or "calc" (lifetime).
+
+        ``hp_idx`` 0 is the whole system. None if there is no energy yet.
+        """
+        hp_indices = (
+            [hp_idx] if hp_idx else range(1, self.entry.data.get("num_hps", 1) + 1)
+        )
+        if metric in COP_WINDOWS:
+            return self._efficiency.cop(hp_idx, metric, time.monotonic())
+        if metric == "jaz":
+            electrical = thermal = 0.0
+            for idx in hp_indices:
+                electrical += self.get_counter(
+                    "compressor_energy", idx, "electrical", "yearly"
+                )
+                thermal += self.get_counter(
+                    "compressor_energy", idx, "thermal", "yearly"
+                )
+        elif metric == "calc":
+            # Lebensdauer-COP direkt aus den Akkumulator-Registern
+            data = self.data or {}
+            electrical = sum(
+                data.get(f"hp{idx}_compressor_power_consumption_accumulated") or 0
+                for idx in hp_indices
+            )
+            thermal = sum(
+                data.get(f"hp{idx}_compressor_thermal_energy_output_accumulated") or 0
+                for idx in hp_indices
+            )
+        else:
+            raise ValueError(f"Unknown efficiency metric: {metric}")
+        if electrical <= 0:
+            return None
+        return thermal / electrical
+
+    # --- Perioden (Tag/Monat/Jahr) ---
+
+    def _counters(self) -> dict[str, dict]:
+        """All counters by kind: {kind: {mode: {hp_idx: total}}}."""
+        return {
+            "cycling": self._mode_cycles,
+            "energy": self._mode_energy,
+            "electrical_energy": self._mode_electrical,
+            "runtime": self._mode_runtime,
+            # Alle Modi zusammen, "Modus" ist hier electrical/thermal
+            "compressor_energy": self._compressor_energy,
+        }
+
+    def _counter_values(self, kind: str) -> dict:
+        return self._counters()[kind]
+
+    def _counter_totals(self) -> dict[str, float]:
+        """Return all counters as flat {"kind:mode:hp_idx": total}."""
+        return {
+            f"{kind}:{mode}:{hp_idx}": value
+            for kind, counters in self._counters().items()
+            for mode, values in counters.items()
+            for hp_idx, value in values.items()
         }
 
-        def _write_data():
-            os.makedirs(os.path.dirname(self._persist_file), exist_ok=True)
-            with open(self._persist_file, "w") as f:
-                f.write(json.dumps(data))
+    def _rollover_periods(self, today: date) -> bool:
+        """Start new periods at local day/month/year boundaries."""
+        rolled = self._rollups.rollover(today, self._counter_totals())
+        if rolled:
+            _LOGGER.debug("Counter periods rolled over: %s", rolled)
+        histograms_rolled = self._modulation.rollover(today)
+        return bool(rolled) or histograms_rolled
+
+    def get_counter(
+        self, kind: str, hp_idx: int, mode: str, period: str = "total"
+    ) -> float:
+        """Return a counter (kind of _counters()) for a period.
+
+        Runtime is in seconds, energy in kWh. Totals of cycling counters
+        include the configured offset.
+        """
+        if kind == "cycling" and period == "total":
+            return self.get_cycling_total(hp_idx, mode)
+        total = self._counter_values(kind).get(mode, {}).get(hp_idx, 0)
+        if period == "total":
+            return total
+        return self._rollups.value(period, f"{kind}:{mode}:{hp_idx}", total)
+
+    # --- Flankenerkennung ---
 
-        await self.hass.async_add_executor_job(_write_data)
+    @callback
+    def async_add_transition_listener(self, listener) -> Callable[[], None]:
+        """Call ``listener(transitions)`` for every cycle with state changes."""
+        self._transition_listeners.append(listener)
+
+        @callback
+        def remove_listener() -> None:
+            if listener in self._transition_listeners:
+                self._transition_listeners.remove(listener)
+
+        return remove_listener
+
+    def _process_transitions(self, data: dict) -> list[StateTransition]:
+        """Detect all state transitions of this cycle and count mode entries."""
+        if not self._transitions.compiled:
+            self._transitions.compile(self.entry.data, self.get_data_key)
+        transitions = self._transitions.process(data, dt_util.utcnow())
+        sessions_changed = False
+        for transition in transitions:
+            _LOGGER.debug(
+                "%s%d: operating_state %s -> %s",
+                transition.prefix,
+                transition.index,
+                transition.previous,
+                transition.state,
+            )
+            if transition.prefix == "hp":
+                timestamp = transition.timestamp.timestamp()
+                if self._sessions.finish(transition.index, timestamp, data):
+                    sessions_changed = True
+                # Beim ersten Wert läuft ein Modus evtl. schon: keine Session
+                if transition.mode is not None and transition.previous is not None:
+                    self._sessions.start(
+                        transition.index, transition.mode, timestamp, data
+                    )
+            if transition.mode is None:
+                continue
+            self._increment_cycling_counter(transition.index, transition.mode)
+            _LOGGER.info(
+                "%s%d: %s Modus aktiviert (Cycling total inkrementiert)",
+                transition.prefix,
+                transition.index,
+                transition.mode,
+            )
+        self._sessions.sample(data)
+        if sessions_changed:
+            self._mark_sessions_dirty()
+        if any(transition.mode for transition in transitions):
+            self._mark_counters_dirty()
+        if transitions:
+            for listener in list(self._transition_listeners):
+                listener(transitions)
+        return transitions
+
+    def get_sessions(
+        self,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        mode: str | None = None,
+        hp_index: int | None = None,
+    ) -> list[dict]:
+        """Return the finished compressor sessions, oldest first.
+
+        Sessions overlapping [start, end] are returned, the times as ISO
+        strings (UTC).
+        """
+        sessions = self._sessions.log.query(
+            start.timestamp() if start else None,
+            end.timestamp() if end else None,
+            mode,
+            hp_index,
+        )
+        for session in sessions:
+            for key in ("start", "end"):
+                session[key] = dt_util.utc_from_timestamp(session[key]).isoformat()
+        return sessions
+
+    def _increment_cycling_counter(self, hp_idx: int, mode: str) -> None:
+        """Count one cycle in memory and let the entity publish it."""
+        cycles = self._mode_cycles.setdefault(mode, {})
+        cycles[hp_idx] = cycles.get(hp_idx, 0) + 1
+        entity = self._cycling_entities.get((hp_idx, mode))
+        if entity is not None:
+            entity.async_write_ha_state()
 
     async def _load_offsets_and_persisted(self):
         # Lade Offsets aus lambda_wp_config.yaml
@@ -124,18 +756,10 @@ class LambdaDataUpdateCoordinator(DataUpdateCoordinator):
             config = await self.hass.async_add_executor_job(_read_config)
             self._cycling_offsets = config.get("cycling_offsets", {})
             self._energy_offsets = config.get("energy_offsets", {})
+            self._derived_config = config.get("derived_sensors") or {}
 
         # Lade persistierte Zählerstände (falls vorhanden)
-        if os.path.exists(self._persist_file):
-
-            def _read_persist():
-                with open(self._persist_file) as f:
-                    content = f.read()
-                    return json.loads(content)
-
-            data = await self.hass.async_add_executor_job(_read_persist)
-            self._heating_cycles = data.get("heating_cycles", {})
-            self._heating_energy = data.get("heating_energy", {})
+        await self._load_persisted_counters()
 
     def _generate_entity_id(self, sensor_type, idx):
         if self._use_legacy_names:
@@ -272,8 +896,8 @@ class LambdaDataUpdateCoordinator(DataUpdateCoordinator):
                     continue
 
                 _LOGGER.debug(f"Reading batch: start={start_addr}, count={count}")
-                result = await async_read_holding_registers(
-                    self.client,
+                result = await self._modbus_call(
+                    async_read_holding_registers,
                     start_addr,
                     count,
                     self.entry.data.get("slave_id", 1),
@@ -333,8 +957,8 @@ class LambdaDataUpdateCoordinator(DataUpdateCoordinator):
             _LOGGER.debug(
                 f"Address {address} polling status: enabled=True (entity-based)"
             )
-            result = await async_read_holding_registers(
-                self.client,
+            result = await self._modbus_call(
+                async_read_holding_registers,
                 address,
                 count,
                 self.entry.data.get("slave_id", 1),
@@ -388,7 +1012,11 @@ class LambdaDataUpdateCoordinator(DataUpdateCoordinator):
             sensor_mapping = {}
             for sensor_id, sensor_info in compatible_hp_sensors.items():
                 address = base_address + sensor_info["relative_address"]
-                if not self.is_address_enabled_by_entity(address):
+                # Register der Zähler werden auch ohne aktive Entity gelesen
+                if (
+                    not self.is_address_enabled_by_entity(address)
+                    and sensor_id not in HP_COUNTER_SENSORS
+                ):
                     continue
 
                 address_groups[address] = sensor_info
@@ -670,8 +1298,6 @@ class LambdaDataUpdateCoordinator(DataUpdateCoordinator):
     async def _connect(self):
         """Connect to the Modbus device."""
         try:
-            from pymodbus.client import AsyncModbusTcpClient
-
             if (
                 self.client
                 and hasattr(self.client, "connected")
@@ -679,24 +1305,373 @@ class LambdaDataUpdateCoordinator(DataUpdateCoordinator):
             ):
                 return
 
-            self.client = AsyncModbusTcpClient(
-                host=self.host, port=self.port, timeout=10
-            )
-
-            if not await self.client.connect():
-                msg = f"Failed to connect to {self.host}:{self.port}"
-                raise UpdateFailed(msg)
+            # Entries mit gleichem host/port (verschiedene slave_ids hinter
+            # einem Gateway) teilen sich eine Verbindung
+            if self._transport is None:
+                self._transport = async_get_shared_transport(
+                    self.hass, self.host, self.port, self.slave_id, self.latency
+                )
+            await self._transport.async_connect()
+            self.client = self._transport.client
+            self._fc23_supported = None
 
-            _LOGGER.debug("Connected to Lambda device at %s:%s", self.host, self.port)
+            _LOGGER.debug(
+                "Connected to Lambda device at %s:%s (slave %s)",
+                self.host,
+                self.port,
+                self.slave_id,
+            )
 
         except Exception as e:
             _LOGGER.error("Connection to %s:%s failed: %s", self.host, self.port, e)
+            self.circuit_breaker.record_failure()
             self.client = None
             msg = f"Connection failed: {e}"
             raise UpdateFailed(msg) from e
 
+    async def _modbus_call(self, func, *args):
+        """Run a modbus_utils request with adaptive timeout and circuit breaker.
+
+        ``func`` is called as ``func(self.client, *args)``. Error responses of
+        the device count as success, only exceptions and timeouts count as
+        failures.
+
+        Raises:
+            CircuitOpenError: If the circuit breaker rejects the request
+        """
+        if not self.circuit_breaker.allow_request():
+            raise CircuitOpenError(
+                f"Modbus circuit open for {self.host}:{self.port}"
+            )
+        start = time.monotonic()
+        try:
+            if self._transport is not None and self.client is self._transport.client:
+                # Über die Warteschlange der gemeinsamen Verbindung,
+                # die Latenz wird dort pro slave_id erfasst
+                result = await self._transport.async_execute(
+                    self.slave_id, func, *args, timeout=self.latency.timeout
+                )
+            else:
+                result = await asyncio.wait_for(
+                    func(self.client, *args), self.latency.timeout
+                )
+                self.latency.add_sample(time.monotonic() - start)
+        except Exception:
+            self.circuit_breaker.record_failure()
+            raise
+        self.circuit_breaker.record_success()
+        return result
+
+    def _raise_if_circuit_open(self):
+        """Abort the poll cycle if the circuit breaker opened during it."""
+        if self.circuit_breaker.state != CIRCUIT_CLOSED:
+            raise UpdateFailed(
+                f"Lambda controller {self.host}:{self.port} not responding "
+                f"(circuit breaker {self.circuit_breaker.state}, "
+                f"latency {self.latency.as_dict()})"
+            )
+
+    async def _async_write_batch(self, address: int, values: list[int]):
+        """Write one run of consecutive registers (used by the write batcher)."""
+        async with self.connection_lock:
+            if not self.client:
+                await self._connect()
+            return await self._modbus_call(
+                async_write_registers, address, values, self.slave_id
+            )
+
+    async def async_write_register_value(self, address: int, values: list[int]):
+        """Queue a register write and wait until the batch has been sent.
+
+        Raises:
+            ModbusWriteError: If the Modbus request failed
+        """
+        await self._write_batcher.async_write(address, values)
+
+    def get_data_key(self, key: str) -> str:
+        """Return the coordinator.data key for ``key`` (e.g. "hc1_operating_mode").
+
+        Boiler, buffer, solar and heating circuit values are stored under
+        their override name if one is configured.
+        """
+        if key.startswith(("boil", "buff", "sol", "hc")):
+            overrides = getattr(self, "sensor_overrides", None) or {}
+            return overrides.get(key) or key
+        return key
+
+    async def async_write_and_verify(
+        self, address: int, values: list[int]
+    ) -> list[int]:
+        """Write registers and return the values read back from the device.
+
+        Uses Read/Write Multiple Registers (FC23) if the device supports it,
+        otherwise a write followed by a read of the same registers. Support
+        is detected with the first call after each (re)connect.
+
+        Raises:
+            ModbusWriteError: If writing or reading back failed
+        """
+        async with self.connection_lock:
+            return await self._async_write_and_verify(address, values)
+
+    async def _async_write_and_verify(
+        self, address: int, values: list[int]
+    ) -> list[int]:
+        """Write and read back, caller holds connection_lock."""
+        if not self.client:
+            await self._connect()
+
+        if self._fc23_supported is not False:
+            try:
+                result = await self._modbus_call(
+                    async_read_write_registers, address, values, self.slave_id
+                )
+            except Exception as ex:
+                # Timeout/Verbindungsfehler sagen nichts über FC23 aus; das
+                # Gerät kann den Wert bereits geschrieben haben -> kein Fallback
+                raise ModbusWriteError(
+                    f"Write/verify at {address} failed: {ex}"
+                ) from ex
+            if (
+                result.isError()
+                and getattr(result, "exception_code", None) == ILLEGAL_FUNCTION
+            ):
+                _LOGGER.debug("FC23 not supported, falling back to write+read")
+                self._fc23_supported = False
+            elif result.isError():
+                raise ModbusWriteError(f"Write/verify at {address} failed: {result}")
+            else:
+                self._fc23_supported = True
+                return list(result.registers)
+
+        try:
+            result = await self._modbus_call(
+                async_write_registers, address, values, self.slave_id
+            )
+            if hasattr(result, "isError") and result.isError():
+                raise ModbusWriteError(f"Write at {address} failed: {result}")
+            result = await self._modbus_call(
+                async_read_holding_registers, address, len(values), self.slave_id
+            )
+            if result.isError():
+                raise ModbusWriteError(f"Read back at {address} failed: {result}")
+        except ModbusWriteError:
+            raise
+        except Exception as ex:
+            raise ModbusWriteError(f"Write/verify at {address} failed: {ex}") from ex
+        return list(result.registers)
+
+    async def async_read_registers(self, address: int, count: int = 1):
+        """Read holding registers outside of the regular poll."""
+        async with self.connection_lock:
+            if not self.client:
+                await self._connect()
+            return await self._modbus_call(
+                async_read_holding_registers, address, count, self.slave_id
+            )
+
     async def _async_update_data(self):
         """Fetch data from Lambda device."""
+        async with self.connection_lock:
+            data = await self._async_fetch_data()
+        if not self._calculations_built:
+            self._build_calculations()
+        # Abgeleitete Werte zuerst, Formeln dürfen sie verwenden. Alle
+        # berechneten Werte werden zusammen mit den gelesenen veröffentlicht.
+        self.derived.evaluate(data)
+        self.calculations.evaluate(data)
+        self.rolling.update(data, time.monotonic())
+        if self.heating_curves.update(data, dt_util.utcnow().timestamp()):
+            self._mark_counters_dirty()
+        self._check_anomalies(data, time.monotonic())
+        # self.data ist hier noch der vorige Zyklus
+        changed = changed_keys(self.data, data)
+        # Systemsummen nur neu, wenn sich ein Eingang geändert hat
+        system_changed = self.system.update(data, changed, self._system_cycles())
+        if changed is not None:
+            changed = frozenset(
+                key for key in changed if not key.startswith("system_")
+            ).union(system_changed)
+        self.changed_keys = changed
+        if system_changed:
+            get_site_aggregator(self.hass).update(
+                self.entry.entry_id, self.system.values
+            )
+        return data
+
+    def _check_anomalies(self, data: dict, now: float) -> None:
+        """Update the register monitors and fire EVENT_ANOMALY on new ones."""
+        for key, kind in self.anomalies.update(data, now):
+            monitor = self.anomalies.monitors[key]
+            _LOGGER.warning("%s: anomaly '%s' (value %s)", key, kind, data.get(key))
+            self.hass.bus.async_fire(
+                EVENT_ANOMALY,
+                {
+                    "entry_id": self.entry.entry_id,
+                    "key": key,
+                    "kind": kind,
+                    "value": data.get(key),
+                    **monitor.attributes(now),
+                },
+            )
+
+    def get_rolling_statistics(self, key: str) -> dict:
+        """Return the rolling statistics attributes of a data key."""
+        return self.rolling.attributes(key, time.monotonic())
+
+    def _system_cycles(self) -> dict[str, int]:
+        """Return the cycling totals of all heat pumps per mode."""
+        num_hps = self.entry.data.get("num_hps", 1)
+        return {
+            mode: sum(
+                self.get_cycling_total(hp_idx, mode)
+                for hp_idx in range(1, num_hps + 1)
+            )
+            for mode in OPERATING_STATE_TRANSITIONS["hp"]["modes"]
+        }
+
+    def _build_calculations(self) -> None:
+        """Add the expression templates of all configured modules to the graph.
+
+        Result keys are "{prefix}_{sensor_id}" (e.g. "hp1_superheat"); an
+        expression may use other calculated keys as inputs. Also sets up
+        the derived values, system totals, rolling statistics, heating
+        curves and anomaly monitors (derived.py, aggregates.py, rolling.py,
+        heating_curve.py, anomalies.py).
+        """
+        self._calculations_built = True
+        self.derived = DerivedQuantities(
+            parse_derived_config(
+                self._derived_config, self.entry.data.get("num_hps", 1)
+            ),
+            self.get_data_key,
+        )
+        self.system = SystemAggregator(
+            self.entry.data.get("num_hps", 1), self.get_data_key
+        )
+        counts = {
+            "hp": self.entry.data.get("num_hps", 1),
+            "boil": self.entry.data.get("num_boil", 1),
+            "buff": self.entry.data.get("num_buff", 0),
+            "sol": self.entry.data.get("num_sol", 0),
+            "hc": self.entry.data.get("num_hc", 1),
+        }
+        self.rolling = RollingStatistics(
+            [
+                self.get_data_key(
+                    sensor_id
+                    if device_type == "main"
+                    else f"{device_type}{idx}_{sensor_id}"
+                )
+                for device_type, sensor_ids in ROLLING_STATISTICS_SENSORS.items()
+                for idx in range(1, counts.get(device_type, 1) + 1)
+                for sensor_id in sensor_ids
+            ],
+            ROLLING_STATISTICS_WINDOWS,
+        )
+        curves = {}
+        for device_type, (heating_states, target) in HEATING_CURVE_DEVICES.items():
+            for idx in range(1, counts.get(device_type, 0) + 1):
+                prefix = f"{device_type}{idx}"
+                curves[prefix] = CurveSeries(
+                    flow=self.get_data_key(f"{prefix}_flow_line_temperature"),
+                    state=self.get_data_key(f"{prefix}_operating_state"),
+                    heating_states=frozenset(heating_states),
+                    target=self.get_data_key(f"{prefix}_{target}"),
+                )
+        self.heating_curves.configure(HEATING_CURVE_AMBIENT, curves)
+        self.anomalies = self._build_anomaly_detector(counts)
+        graph = CalculationGraph()
+        for sensor_id, sensor_info in CALCULATED_SENSOR_TEMPLATES.items():
+            source = sensor_info.get("expression")
+            if not source:
+                continue
+            device_type = sensor_info.get("device_type")
+            for idx in range(1, counts.get(device_type, 0) + 1):
+                prefix = f"{device_type}{idx}"
+                try:
+                    expression = Expression(
+                        source.format(prefix=prefix), self.get_data_key
+                    )
+                except ValueError as ex:
+                    _LOGGER.error("Calculated sensor %s_%s: %s", prefix, sensor_id, ex)
+                    continue
+                graph.add(f"{prefix}_{sensor_id}", expression.inputs, expression)
+        try:
+            graph.compile()
+        except CycleError as ex:
+            _LOGGER.error("Calculated sensors depend on each other: %s", ex.args[1])
+            graph = CalculationGraph()
+        self.calculations = graph
+
+    def _build_anomaly_detector(self, counts: dict) -> AnomalyDetector:
+        """Monitor every register whose template has an "anomaly" field.
+
+        Also fills anomaly_registers: data key -> (device_prefix, sensor_id,
+        name) for the binary sensors.
+        """
+        monitored = {}
+        self.anomaly_registers = {}
+        for device_type, templates in (
+            ("main", SENSOR_TYPES),
+            ("hp", HP_SENSOR_TEMPLATES),
+            ("boil", BOIL_SENSOR_TEMPLATES),
+            ("buff", BUFF_SENSOR_TEMPLATES),
+            ("sol", SOL_SENSOR_TEMPLATES),
+            ("hc", HC_SENSOR_TEMPLATES),
+        ):
+            if device_type == "main":
+                prefixes = [""]
+            else:
+                prefixes = [
+                    f"{device_type}{idx}_"
+                    for idx in range(1, counts.get(device_type, 0) + 1)
+                ]
+            for prefix in prefixes:
+
+                def key_func(name, prefix=prefix):
+                    return self.get_data_key(f"{prefix}{name}")
+
+                for sensor_id, sensor_info in templates.items():
+                    if "anomaly" not in sensor_info:
+                        continue
+                    key = key_func(sensor_id)
+                    monitored[key] = AnomalyThresholds.from_template(
+                        sensor_info["anomaly"], key_func
+                    )
+                    self.anomaly_registers[key] = (
+                        prefix.rstrip("_") or sensor_id,
+                        sensor_id,
+                        sensor_info["name"],
+                    )
+        return AnomalyDetector(monitored, ANOMALY_JUMP_HOLD)
+
+    def data_changed(self, keys) -> bool:
+        """Return True if one of ``keys`` changed in the last update."""
+        return self.changed_keys is None or not self.changed_keys.isdisjoint(keys)
+
+    @callback
+    def async_set_data_value(self, key: str, value) -> None:
+        """Store a written value in data and notify the entities.
+
+        ``key`` is added to changed_keys, so entities that only write their
+        state on changes show the value without waiting for the next poll.
+        """
+        if self.data is None:
+            return
+        self.data[key] = value
+        if self.changed_keys is not None:
+            self.changed_keys = self.changed_keys | {key}
+        self.async_update_listeners()
+
+    async def _async_fetch_data(self):
+        """Read all enabled registers, caller holds connection_lock."""
+        if self.circuit_breaker.is_open:
+            # Controller antwortet nicht -> Zyklus sofort beenden
+            raise UpdateFailed(
+                f"Lambda controller {self.host}:{self.port} not responding "
+                "(circuit breaker open)"
+            )
         try:
             if not self.client:
                 await self._connect()
@@ -722,20 +1697,6 @@ class LambdaDataUpdateCoordinator(DataUpdateCoordinator):
             )
 
             data = {}
-            interval = DEFAULT_UPDATE_INTERVAL / 3600.0  # Intervall in Stunden
-            num_hps = self.entry.data.get("num_hps", 1)
-            # Generische Flankenerkennung für alle relevanten Modi
-            MODES = {
-                "heating": 1,  # CH
-                "hot_water": 2,  # DHW
-                "cooling": 3,  # CC
-                "defrost": 5,  # DEFROST
-            }
-            if not hasattr(self, "_last_mode_state"):
-                self._last_mode_state = {mode: {} for mode in MODES}
-            if not hasattr(self, "_last_operating_state"):
-                self._last_operating_state = {}
-
             # Read general sensors with batch optimization
             await self._read_general_sensors_batch(data)
 
@@ -744,108 +1705,27 @@ class LambdaDataUpdateCoordinator(DataUpdateCoordinator):
             await self._read_heatpump_sensors_batch(
                 data, num_hps, compatible_hp_sensors
             )
+            self._raise_if_circuit_open()
 
-            # Flankenerkennung und Energieintegration nach dem Auslesen aller Wärmepumpen-Sensoren
+            # Energie- und Laufzeitintegration für den aktiven Modus jeder
+            # Wärmepumpe
+            counters_changed = self._rollover_periods(dt_util.now().date())
+            now = time.monotonic()
             for hp_idx in range(1, num_hps + 1):
+                self._check_short_cycle(hp_idx, data, now)
                 op_state_val = data.get(f"hp{hp_idx}_operating_state")
                 if op_state_val is None:
                     continue
-
-                # Debug-Log: Immer ausgeben
-                last_op_state = self._last_operating_state.get(hp_idx, "UNBEKANNT")
-                _LOGGER.debug(
-                    "DEBUG: HP %d, last_op_state=%s, op_state_val=%s",
-                    hp_idx,
-                    last_op_state,
-                    op_state_val,
-                )
-                # Info-Meldung bei Änderung
-                if last_op_state != op_state_val:
-                    _LOGGER.info(
-                        "Wärmepumpe %d: operating_state geändert von %s auf %s",
-                        hp_idx,
-                        last_op_state,
-                        op_state_val,
-                    )
-                self._last_operating_state[hp_idx] = op_state_val
-                for mode, mode_val in MODES.items():
-                    cycling_key = f"{mode}_cycles"
-                    energy_key = f"{mode}_energy"
-                    if not hasattr(self, cycling_key):
-                        setattr(self, cycling_key, {})
-                    if not hasattr(self, energy_key):
-                        setattr(self, energy_key, {})
-                    cycles = getattr(self, cycling_key)
-                    energy = getattr(self, energy_key)
-                    last_mode_state = self._last_mode_state[mode].get(hp_idx)
-                    # Flanke: operating_state wechselt von etwas anderem auf mode_val
-                    if last_mode_state != mode_val and op_state_val == mode_val:
-                        # Prüfe, ob die Cycling-Entities bereits registriert sind
-                        cycling_entities_ready = False
-                        try:
-                            # Prüfe, ob die Cycling-Entities in hass.data verfügbar sind
-                            if (
-                                "lambda_heat_pumps" in self.hass.data
-                                and self.entry.entry_id
-                                in self.hass.data["lambda_heat_pumps"]
-                                and "cycling_entities"
-                                in self.hass.data["lambda_heat_pumps"][
-                                    self.entry.entry_id
-                                ]
-                            ):
-                                cycling_entities_ready = True
-                        except Exception:
-                            pass
-
-                        if cycling_entities_ready:
-                            # Zentrale Funktion für total-Zähler aufrufen
-                            await increment_cycling_counter(
-                                self.hass,
-                                mode=mode,
-                                hp_index=hp_idx,
-                                name_prefix=self.entry.data.get("name", "eu08l"),
-                                use_legacy_modbus_names=self._use_legacy_names,
-                                cycling_offsets=self._cycling_offsets,
-                            )
-                            _LOGGER.info(
-                                "Wärmepumpe %d: %s Modus aktiviert "
-                                "(Cycling total inkrementiert)",
-                                hp_idx,
-                                mode,
-                            )
-                        else:
-                            _LOGGER.debug(
-                                "Wärmepumpe %d: %s Modus aktiviert "
-                                "(Cycling-Entities noch nicht bereit)",
-                                hp_idx,
-                                mode,
-                            )
-                    # Nur für Debug-Zwecke, nicht als Info-Log:
-                    # _LOGGER.debug(
-                    #     "HP %d, Modus %s: last_mode_state=%s, op_state_val=%s",
-                    #     hp_idx, mode, last_mode_state, op_state_val
-                    # )
-                    self._last_mode_state[mode][hp_idx] = op_state_val
-                    # Energieintegration für aktiven Modus
-                    power_info = HP_SENSOR_TEMPLATES.get("actual_heating_capacity")
-                    if power_info:
-                        power_val = data.get(f"hp{hp_idx}_actual_heating_capacity", 0.0)
-                        if op_state_val == mode_val:
-                            energy[hp_idx] = energy.get(hp_idx, 0.0) + (
-                                power_val * interval
-                            )
-                    # Sensorwerte bereitstellen (inkl. Offset)
-                    cycling_entity_id = self._generate_entity_id(
-                        f"{mode}_cycling_daily", hp_idx - 1
-                    )
-                    energy_entity_id = self._generate_entity_id(
-                        f"{mode}_energy_daily", hp_idx - 1
-                    )
-                    cycling_offset = self._cycling_offsets.get(f"hp{hp_idx}", 0)
-                    energy_offset = self._energy_offsets.get(f"hp{hp_idx}", 0.0)
-                    data[cycling_entity_id] = cycles.get(hp_idx, 0) + cycling_offset
-                    data[energy_entity_id] = energy.get(hp_idx, 0.0) + energy_offset
-            await self._persist_counters()
+                active_mode = self._transitions.mode_for_state("hp", op_state_val)
+                if self._accumulate_runtime(hp_idx, active_mode, now):
+                    counters_changed = True
+                if self._accumulate_modulation(hp_idx, active_mode, data, now):
+                    counters_changed = True
+                if self._attribute_energy(hp_idx, active_mode, data, now):
+                    counters_changed = True
+            # Nur speichern, wenn sich ein Zähler geändert hat
+            if counters_changed:
+                self._mark_counters_dirty()
 
             # Read boiler sensors
             num_boil = self.entry.data.get("num_boil", 1)
@@ -864,8 +1744,8 @@ class LambdaDataUpdateCoordinator(DataUpdateCoordinator):
                     try:
                         address = base_address + sensor_info["relative_address"]
                         count = 2 if sensor_info.get("data_type") == "int32" else 1
-                        result = await async_read_holding_registers(
-                            self.client,
+                        result = await self._modbus_call(
+                            async_read_holding_registers,
                             address,
                             count,
                             self.entry.data.get("slave_id", 1),
@@ -923,8 +1803,8 @@ class LambdaDataUpdateCoordinator(DataUpdateCoordinator):
                     try:
                         address = base_address + sensor_info["relative_address"]
                         count = 2 if sensor_info.get("data_type") == "int32" else 1
-                        result = await async_read_holding_registers(
-                            self.client,
+                        result = await self._modbus_call(
+                            async_read_holding_registers,
                             address,
                             count,
                             self.entry.data.get("slave_id", 1),
@@ -982,8 +1862,8 @@ class LambdaDataUpdateCoordinator(DataUpdateCoordinator):
                     try:
                         address = base_address + sensor_info["relative_address"]
                         count = 2 if sensor_info.get("data_type") == "int32" else 1
-                        result = await async_read_holding_registers(
-                            self.client,
+                        result = await self._modbus_call(
+                            async_read_holding_registers,
                             address,
                             count,
                             self.entry.data.get("slave_id", 1),
@@ -1041,8 +1921,8 @@ class LambdaDataUpdateCoordinator(DataUpdateCoordinator):
                     try:
                         address = base_address + sensor_info["relative_address"]
                         count = 2 if sensor_info.get("data_type") == "int32" else 1
-                        result = await async_read_holding_registers(
-                            self.client,
+                        result = await self._modbus_call(
+                            async_read_holding_registers,
                             address,
                             count,
                             self.entry.data.get("slave_id", 1),
@@ -1083,28 +1963,10 @@ class LambdaDataUpdateCoordinator(DataUpdateCoordinator):
                             ex,
                         )
 
-            # Dummy-Keys für Template-Sensoren einfügen
-            # Erzeuge alle möglichen Template-Sensor-IDs
-            num_hps = self.entry.data.get("num_hps", 1)
-            num_boil = self.entry.data.get("num_boil", 1)
-            num_buff = self.entry.data.get("num_buff", 0)
-            num_sol = self.entry.data.get("num_sol", 0)
-            num_hc = self.entry.data.get("num_hc", 1)
-            DEVICE_COUNTS = {
-                "hp": num_hps,
-                "boil": num_boil,
-                "buff": num_buff,
-                "sol": num_sol,
-                "hc": num_hc,
-            }
-            for device_type, count in DEVICE_COUNTS.items():
-                for idx in range(1, count + 1):
-                    device_prefix = f"{device_type}{idx}"
-                    for sensor_id, sensor_info in CALCULATED_SENSOR_TEMPLATES.items():
-                        if sensor_info.get("device_type") == device_type:
-                            key = f"{device_prefix}_{sensor_id}"
-                            # Setze einen sich ändernden Wert, z.B. Zeitstempel
-                            data[key] = time.time()
+            # Flankenerkennung aller Module in einem Durchlauf
+            self._process_transitions(data)
+
+            self._raise_if_circuit_open()
 
             # Update room temperature and PV surplus only after Home Assistant
             # has started. This prevents timing issues with template sensors
@@ -1116,19 +1978,27 @@ class LambdaDataUpdateCoordinator(DataUpdateCoordinator):
 
         except Exception as ex:
             _LOGGER.error("Error updating data: %s", ex)
-            if (
-                self.client is not None
-                and hasattr(self.client, "close")
-                and callable(getattr(self.client, "close", None))
-            ):
-                try:
-                    self.client.close()
-                except Exception as close_ex:
-                    _LOGGER.debug("Error closing client connection: %s", close_ex)
-                finally:
-                    self.client = None
+            self._close_client()
             raise UpdateFailed(f"Error fetching Lambda data: {ex}")
 
+    def _close_client(self):
+        """Drop the Modbus client so the next request reconnects.
+
+        A shared connection is left open for the other slave IDs, the
+        transport reconnects it on demand.
+        """
+        if (
+            self._transport is None
+            and self.client is not None
+            and hasattr(self.client, "close")
+            and callable(getattr(self.client, "close", None))
+        ):
+            try:
+                self.client.close()
+            except Exception as close_ex:
+                _LOGGER.debug("Error closing client connection: %s", close_ex)
+        self.client = None
+
     def _on_ha_started(self, event):
         """Handle Home Assistant started event."""
         self._ha_started = True
@@ -1145,18 +2015,21 @@ class LambdaDataUpdateCoordinator(DataUpdateCoordinator):
                 self._registry_listener()
                 self._registry_listener = None
 
-            # Close Modbus connection
-            if (
-                self.client is not None
-                and hasattr(self.client, "close")
-                and callable(getattr(self.client, "close", None))
-            ):
-                try:
-                    self.client.close()
-                except Exception as close_ex:
-                    _LOGGER.debug("Error closing client connection: %s", close_ex)
-                finally:
-                    self.client = None
+            # Send outstanding writes before closing the connection
+            await self._write_batcher.async_shutdown()
+
+            # Write pending counter changes
+            await self._async_flush_counters()
+
+            release_site_aggregator(self.hass, self.entry.entry_id)
+
+            # Close Modbus connection (shared one only if no other entry uses it)
+            if self._transport is not None:
+                async_release_shared_transport(
+                    self.hass, self._transport, self.slave_id
+                )
+                self._transport = None
+            self._close_client()
         except Exception as ex:
             _LOGGER.error("Error during coordinator shutdown: %s", ex)
 
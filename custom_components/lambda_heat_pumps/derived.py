@@ -0,0 +1,117 @@
+"""Physics-derived values of the heat pumps (thermal power, spreads).
+
+All configured heat pumps are handled in one pass over the polled data:
+the data keys of every heat pump are resolved once into a flat table, so
+each poll is a few dict lookups and multiplications per heat pump.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Mapping, MutableMapping
+
+from .const import DERIVED_QUANTITIES, DERIVED_SPECIFIC_HEAT
+
+# Eingänge je Wärmepumpe: (sensor_id der Register) in Tabellenreihenfolge
+_INPUTS = (
+    "flow_line_temperature",
+    "return_line_temperature",
+    "volume_flow_heat_sink",  # l/h
+    "energy_source_inlet_temperature",
+    "energy_source_outlet_temperature",
+    "volume_flow_energy_source",  # l/min
+)
+
+
+def parse_derived_config(config: Mapping | None, num_hps: int) -> dict[int, dict]:
+    """Return the derived-value settings per heat pump index.
+
+    ``config`` is the ``derived_sensors`` section of lambda_wp_config.yaml,
+    e.g. ``{"hp1": {"quantities": ["thermal_power"],
+    "source_specific_heat": 1.07}}``. Heat pumps without a section get
+    all quantities with the specific heat of water; ``enabled: false``
+    turns a heat pump off.
+    """
+    config = config if isinstance(config, Mapping) else {}
+    settings = {}
+    for idx in range(1, num_hps + 1):
+        hp_config = config.get(f"hp{idx}") or {}
+        if not isinstance(hp_config, Mapping) or not hp_config.get("enabled", True):
+            continue
+        quantities = hp_config.get("quantities", DERIVED_QUANTITIES)
+        if not isinstance(quantities, (list, tuple)):
+            quantities = DERIVED_QUANTITIES
+        entry = {
+            "quantities": tuple(q for q in DERIVED_QUANTITIES if q in quantities),
+        }
+        for side in ("sink", "source"):
+            value = hp_config.get(f"{side}_specific_heat", DERIVED_SPECIFIC_HEAT)
+            entry[f"{side}_specific_heat"] = (
+                float(value)
+                if isinstance(value, (int, float)) and value > 0
+                else DERIVED_SPECIFIC_HEAT
+            )
+        if entry["quantities"]:
+            settings[idx] = entry
+    return settings
+
+
+class DerivedQuantities:
+    """Compute the derived values of all heat pumps into coordinator.data.
+
+    Result keys are "hp{idx}_{quantity}" with the quantities of
+    DERIVED_QUANTITIES. Power values are W (flow in l/h times spread in K
+    times the specific heat in Wh/(l*K)); spreads are K. A value whose
+    inputs are missing is removed from the data.
+    """
+
+    def __init__(
+        self, settings: Mapping[int, Mapping], key_func: Callable[[str], str] = str
+    ) -> None:
+        self._rows = []
+        for idx, hp_settings in sorted(settings.items()):
+            prefix = f"hp{idx}"
+            quantities = hp_settings["quantities"]
+            self._rows.append(
+                (
+                    tuple(key_func(f"{prefix}_{name}") for name in _INPUTS),
+                    tuple(
+                        f"{prefix}_{name}" if name in quantities else None
+                        for name in DERIVED_QUANTITIES
+                    ),
+                    hp_settings["sink_specific_heat"],
+                    # l/min -> l/h
+                    hp_settings["source_specific_heat"] * 60,
+                )
+            )
+
+    @property
+    def keys(self) -> list[str]:
+        """Return the result keys of all heat pumps."""
+        return [key for _inputs, outputs, *_ in self._rows for key in outputs if key]
+
+    def evaluate(self, data: MutableMapping[str, Any]) -> None:
+        for inputs, outputs, c_sink, c_source in self._rows:
+            flow, ret, vol_sink, src_in, src_out, vol_source = (
+                data.get(key) for key in inputs
+            )
+            sink_spread = flow - ret if flow is not None and ret is not None else None
+            source_spread = (
+                src_in - src_out if src_in is not None and src_out is not None else None
+            )
+            values = (
+                sink_spread * vol_sink * c_sink
+                if sink_spread is not None and vol_sink is not None
+                else None,
+                source_spread * vol_source * c_source
+                if source_spread is not None and vol_source is not None
+                else None,
+                sink_spread,
+                source_spread,
+            )
+            for key, value in zip(outputs, values):
+                if key is None:
+                    continue
+                if value is None:
+                    data.pop(key, None)
+                else:
+                    data[key] = value
@@ -0,0 +1,451 @@
+"""Precomputed entity descriptions of the sensor and climate platforms.
+
+Names, entity/unique ids, addresses and device classes only depend on the
+firmware version, the module counts, the naming mode and the name prefix.
+Each table is built once per such combination and kept for the lifetime
+of the process, so reloads and further config entries with the same
+layout only instantiate entities. Per-entry settings (disabled registers,
+name overrides, derived_sensors and cycling offsets from
+lambda_wp_config.yaml, room temperature options) are applied when
+instantiating.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Mapping
+
+from homeassistant.components.sensor import SensorDeviceClass
+
+from .const import (
+    BOIL_SENSOR_TEMPLATES,
+    BUFF_SENSOR_TEMPLATES,
+    CALCULATED_SENSOR_TEMPLATES,
+    CLIMATE_TEMPLATES,
+    HC_SENSOR_TEMPLATES,
+    HEATING_CURVE_DEVICES,
+    HEATING_CURVE_SENSOR_TEMPLATES,
+    HP_SENSOR_TEMPLATES,
+    SENSOR_TYPES,
+    SOL_SENSOR_TEMPLATES,
+    SYSTEM_SENSOR_TEMPLATES,
+)
+from .utils import (
+    generate_base_addresses,
+    generate_sensor_names,
+    generate_template_entity_prefix,
+    get_compatible_sensors,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Gerätetyp -> Templates, in der Reihenfolge der Entity-Erzeugung
+MODULE_SENSOR_TEMPLATES = (
+    ("hp", HP_SENSOR_TEMPLATES),
+    ("boil", BOIL_SENSOR_TEMPLATES),
+    ("buff", BUFF_SENSOR_TEMPLATES),
+    ("sol", SOL_SENSOR_TEMPLATES),
+    ("hc", HC_SENSOR_TEMPLATES),
+)
+
+# Gerätetyp -> (Key in entry.data, Default-Anzahl der Module)
+_MODULE_COUNT_KEYS = {
+    "hp": ("num_hps", 1),
+    "boil": ("num_boil", 1),
+    "buff": ("num_buff", 0),
+    "sol": ("num_sol", 0),
+    "hc": ("num_hc", 1),
+}
+
+# Fallback device_class nach Einheit
+_UNIT_DEVICE_CLASSES = {
+    "°C": SensorDeviceClass.TEMPERATURE,
+    "W": SensorDeviceClass.POWER,
+    "Wh": SensorDeviceClass.ENERGY,
+    "kWh": SensorDeviceClass.ENERGY,
+}
+
+
+@dataclass(frozen=True, slots=True)
+class RegisterSensorDescription:
+    """Everything LambdaSensor needs for one register, except the entry."""
+
+    sensor_id: str
+    name: str
+    unit: str
+    address: int
+    scale: float
+    state_class: str
+    device_class: Any
+    relative_address: int
+    data_type: str
+    device_type: str
+    txt_mapping: bool
+    precision: int | None
+    entity_id: str
+    unique_id: str
+    options: Any
+    sensor_info: Mapping = field(repr=False, compare=False)
+    # Key in sensors_names_override (nur Modul-Sensoren)
+    override_key: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class CalculatedSensorDescription:
+    """Names of a sensor computed by the coordinator or by a template."""
+
+    data_key: str
+    device_prefix: str
+    sensor_id: str
+    # Modul-Typ ("hp", "hc", ...); "main" für System- und Anlagensummen
+    device_type: str
+    # Modulnummer, 0 für System- und Anlagensummen
+    index: int
+    # "expression" (Coordinator), "template" (Jinja) oder "site"
+    kind: str
+    name: str
+    entity_id: str
+    unique_id: str
+    sensor_info: Mapping = field(repr=False, compare=False)
+    # Entity-Präfix für die Jinja-Templates (nur kind "template")
+    entity_prefix: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class ClimateDescription:
+    """Names and base address of a climate entity."""
+
+    climate_type: str
+    index: int
+    base_address: int
+    name: str
+    entity_id: str
+    unique_id: str
+
+
+def entry_module_counts(data: Mapping) -> tuple[tuple[str, int], ...]:
+    """Return the (device type, module count) pairs of a config entry."""
+    return tuple(
+        (prefix, data.get(key, default))
+        for prefix, (key, default) in _MODULE_COUNT_KEYS.items()
+    )
+
+
+@lru_cache(maxsize=4096)
+def sensor_names(
+    device_prefix: str,
+    sensor_name: str,
+    sensor_id: str,
+    name_prefix: str,
+    use_legacy_modbus_names: bool,
+) -> Mapping[str, str]:
+    """Cached, read-only generate_sensor_names() for the per-entity loops."""
+    return MappingProxyType(
+        generate_sensor_names(
+            device_prefix,
+            sensor_name,
+            sensor_id,
+            name_prefix,
+            use_legacy_modbus_names,
+        )
+    )
+
+
+def _device_class(sensor_info: Mapping):
+    return sensor_info.get("device_class") or _UNIT_DEVICE_CLASSES.get(
+        sensor_info.get("unit")
+    )
+
+
+def _description(sensor_info: Mapping, **values) -> RegisterSensorDescription:
+    return RegisterSensorDescription(
+        unit=sensor_info.get("unit", ""),
+        scale=sensor_info.get("scale", 1.0),
+        state_class=sensor_info.get("state_class", ""),
+        device_class=_device_class(sensor_info),
+        data_type=sensor_info.get("data_type", ""),
+        txt_mapping=sensor_info.get("txt_mapping", False),
+        precision=sensor_info.get("precision", None),
+        options=sensor_info.get("options", None),
+        sensor_info=sensor_info,
+        **values,
+    )
+
+
+@lru_cache(maxsize=16)
+def register_sensor_descriptions(
+    fw_version: int,
+    counts: tuple[tuple[str, int], ...],
+    use_legacy_modbus_names: bool,
+    name_prefix: str,
+) -> tuple[RegisterSensorDescription, ...]:
+    """Return the descriptions of all register sensors of a layout.
+
+    ``counts`` are (device type, module count) pairs, e.g. (("hp", 1), ...).
+    The result is cached; it is shared by all entries with the same layout.
+    """
+    module_counts = dict(counts)
+    descriptions = []
+    for prefix, templates in MODULE_SENSOR_TEMPLATES:
+        count = module_counts.get(prefix, 0)
+        compatible = get_compatible_sensors(templates, fw_version)
+        base_addresses = generate_base_addresses(prefix, count)
+        for idx in range(1, count + 1):
+            device_prefix = f"{prefix}{idx}"
+            for sensor_id, sensor_info in compatible.items():
+                if prefix == "hc" and sensor_info.get("device_type") == "Climate":
+                    name = sensor_info["name"].format(idx)
+                else:
+                    name = f"{prefix.upper()}{idx} {sensor_info['name']}"
+                names = generate_sensor_names(
+                    device_prefix,
+                    sensor_info["name"],
+                    sensor_id,
+                    name_prefix,
+                    use_legacy_modbus_names,
+                )
+                descriptions.append(
+                    _description(
+                        sensor_info,
+                        sensor_id=f"{device_prefix}_{sensor_id}",
+                        name=name,
+                        address=base_addresses[idx] + sensor_info["relative_address"],
+                        relative_address=sensor_info.get("relative_address", 0),
+                        device_type=prefix.upper(),
+                        entity_id=names["entity_id"],
+                        unique_id=names["unique_id"],
+                        override_key=f"{device_prefix}_{sensor_id}",
+                    )
+                )
+
+    # General Sensors (SENSOR_TYPES): sensor_id ist der device_prefix
+    for sensor_id, sensor_info in SENSOR_TYPES.items():
+        if use_legacy_modbus_names and "override_name" in sensor_info:
+            name = sensor_id_final = sensor_info["override_name"]
+            _LOGGER.info(
+                "Override name for sensor '%s': '%s' is used as name and sensor_id",
+                sensor_id,
+                name,
+            )
+        else:
+            name = sensor_info["name"]
+            sensor_id_final = sensor_id
+        names = generate_sensor_names(
+            sensor_id,
+            sensor_info["name"],
+            sensor_id_final,
+            name_prefix,
+            use_legacy_modbus_names,
+        )
+        descriptions.append(
+            _description(
+                sensor_info,
+                sensor_id=sensor_id_final,
+                name=name,
+                address=sensor_info["address"],
+                relative_address=sensor_info.get("address", 0),
+                device_type=sensor_info.get("device_type", "main"),
+                entity_id=names["entity_id"],
+                unique_id=names["unique_id"],
+            )
+        )
+    _LOGGER.debug(
+        "Built %d register sensor descriptions (firmware %d, modules %s)",
+        len(descriptions),
+        fw_version,
+        module_counts,
+    )
+    return tuple(descriptions)
+
+
+def _names(
+    device_prefix: str,
+    sensor_info: Mapping,
+    sensor_id: str,
+    name_prefix: str,
+    use_legacy_modbus_names: bool,
+) -> dict:
+    return generate_sensor_names(
+        device_prefix,
+        sensor_info["name"],
+        sensor_id,
+        name_prefix,
+        use_legacy_modbus_names,
+    )
+
+
+@lru_cache(maxsize=16)
+def calculated_sensor_descriptions(
+    fw_version: int,
+    counts: tuple[tuple[str, int], ...],
+    use_legacy_modbus_names: bool,
+    name_prefix: str,
+) -> tuple[CalculatedSensorDescription, ...]:
+    """Return the calculated, heating curve and system sensors of a layout.
+
+    Derived sensors are all included; the caller filters them with the
+    derived_sensors settings of the entry.
+    """
+    module_counts = dict(counts)
+    compatible = get_compatible_sensors(CALCULATED_SENSOR_TEMPLATES, fw_version)
+    descriptions = []
+    for device_type, count in counts:
+        for idx in range(1, count + 1):
+            device_prefix = f"{device_type}{idx}"
+            for sensor_id, sensor_info in compatible.items():
+                if sensor_info.get("device_type") != device_type:
+                    continue
+                if "expression" in sensor_info or sensor_info.get("derived"):
+                    # Wert berechnet der Coordinator (calculations.py,
+                    # derived.py)
+                    kind, entity_prefix = "expression", None
+                elif "template" in sensor_info:
+                    kind = "template"
+                    entity_prefix = generate_template_entity_prefix(
+                        device_prefix, name_prefix, use_legacy_modbus_names
+                    )
+                else:
+                    continue
+                names = _names(
+                    device_prefix,
+                    sensor_info,
+                    sensor_id,
+                    name_prefix,
+                    use_legacy_modbus_names,
+                )
+                descriptions.append(
+                    CalculatedSensorDescription(
+                        data_key=f"{device_prefix}_{sensor_id}",
+                        device_prefix=device_prefix,
+                        sensor_id=sensor_id,
+                        device_type=device_type,
+                        index=idx,
+                        kind=kind,
+                        name=names["name"],
+                        entity_id=names["entity_id"],
+                        unique_id=names["unique_id"],
+                        sensor_info=sensor_info,
+                        entity_prefix=entity_prefix,
+                    )
+                )
+
+    # Gelernte Heizkurven (heating_curve.py) je Heizkreis und Wärmepumpe
+    for device_type in HEATING_CURVE_DEVICES:
+        for idx in range(1, module_counts.get(device_type, 0) + 1):
+            device_prefix = f"{device_type}{idx}"
+            for sensor_id, sensor_info in HEATING_CURVE_SENSOR_TEMPLATES.items():
+                names = _names(
+                    device_prefix,
+                    sensor_info,
+                    sensor_id,
+                    name_prefix,
+                    use_legacy_modbus_names,
+                )
+                descriptions.append(
+                    CalculatedSensorDescription(
+                        data_key=f"{device_prefix}_{sensor_id}",
+                        device_prefix=device_prefix,
+                        sensor_id=sensor_id,
+                        device_type=device_type,
+                        index=idx,
+                        kind="expression",
+                        name=names["name"],
+                        entity_id=names["entity_id"],
+                        unique_id=names["unique_id"],
+                        sensor_info=sensor_info,
+                    )
+                )
+
+    # Systemsummen (aggregates.py) ab zwei Wärmepumpen
+    if module_counts.get("hp", 0) > 1:
+        for sensor_id, sensor_info in SYSTEM_SENSOR_TEMPLATES.items():
+            names = _names(
+                sensor_id, sensor_info, sensor_id, name_prefix, use_legacy_modbus_names
+            )
+            descriptions.append(
+                CalculatedSensorDescription(
+                    data_key=sensor_id,
+                    device_prefix=sensor_id,
+                    sensor_id=sensor_id,
+                    device_type="main",
+                    index=0,
+                    kind="expression",
+                    name=names["name"],
+                    entity_id=names["entity_id"],
+                    unique_id=names["unique_id"],
+                    sensor_info=sensor_info,
+                )
+            )
+    return tuple(descriptions)
+
+
+@lru_cache(maxsize=4)
+def site_sensor_descriptions(
+    use_legacy_modbus_names: bool,
+) -> tuple[CalculatedSensorDescription, ...]:
+    """Return the site totals over all entries (data_key is the system key)."""
+    descriptions = []
+    for sensor_id, sensor_info in SYSTEM_SENSOR_TEMPLATES.items():
+        site_id = sensor_id.replace("system_", "site_", 1)
+        names = generate_sensor_names(
+            site_id,
+            sensor_info["name"].replace("System", "Site", 1),
+            site_id,
+            "lambda",
+            use_legacy_modbus_names,
+        )
+        descriptions.append(
+            CalculatedSensorDescription(
+                data_key=sensor_id,
+                device_prefix=site_id,
+                sensor_id=site_id,
+                device_type="main",
+                index=0,
+                kind="site",
+                name=names["name"],
+                entity_id=names["entity_id"],
+                unique_id=names["unique_id"],
+                sensor_info=sensor_info,
+            )
+        )
+    return tuple(descriptions)
+
+
+@lru_cache(maxsize=16)
+def climate_descriptions(
+    fw_version: int,
+    counts: tuple[tuple[str, int], ...],
+    use_legacy_modbus_names: bool,
+    name_prefix: str,
+) -> tuple[ClimateDescription, ...]:
+    """Return the hot water and heating circuit climate entities of a layout."""
+    module_counts = dict(counts)
+    descriptions = []
+    for climate_type, template in get_compatible_sensors(
+        CLIMATE_TEMPLATES, fw_version
+    ).items():
+        device_type = template["device_type"]
+        count = module_counts.get(device_type, 0)
+        base_addresses = generate_base_addresses(device_type, count)
+        for idx in range(1, count + 1):
+            names = _names(
+                f"{device_type}{idx}",
+                template,
+                climate_type,
+                name_prefix,
+                use_legacy_modbus_names,
+            )
+            descriptions.append(
+                ClimateDescription(
+                    climate_type=climate_type,
+                    index=idx,
+                    base_address=base_addresses[idx],
+                    name=names["name"],
+                    entity_id=names["entity_id"],
+                    unique_id=names["unique_id"],
+                )
+            )
+    return tuple(descriptions)
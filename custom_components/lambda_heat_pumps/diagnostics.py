@@ -0,0 +1,47 @@
+"""Diagnostics support for Lambda Heat Pumps."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .modbus_transport import TRANSPORTS_KEY
+
+TO_REDACT = {CONF_HOST}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return connection diagnostics for a config entry.
+
+    Includes the latency/timeout of this entry and, for a shared gateway
+    connection, the latency of every slave ID using it.
+    """
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    diagnostics = {
+        "entry": async_redact_data(dict(entry.data), TO_REDACT),
+        "connection": {
+            "slave_id": coordinator.slave_id,
+            "circuit_breaker": coordinator.circuit_breaker.state,
+            "latency": coordinator.latency.as_dict(),
+        },
+        "shared_connection": None,
+    }
+    transport = hass.data.get(TRANSPORTS_KEY, {}).get(
+        (coordinator.host, coordinator.port)
+    )
+    if transport is not None:
+        diagnostics["shared_connection"] = {
+            "slave_ids": transport.slave_ids,
+            "latency": {
+                str(slave_id): stats
+                for slave_id, stats in transport.latency_stats().items()
+            },
+        }
+    return diagnostics
@@ -0,0 +1,99 @@
+"""Rolling-window COP from energy deltas kept in fixed time buckets."""
+
+from __future__ import annotations
+
+from array import array
+import math
+from typing import Mapping
+
+# Rundungsreste der laufenden Summen darunter als 0 behandeln (kWh)
+_EPSILON = 1e-9
+
+
+class RollingEnergyWindow:
+    """Electrical/thermal energy of the last ``window`` seconds.
+
+    Energy is added to ring buffer buckets of ``bucket`` seconds, the sums
+    of the window are kept up to date, so adding and reading are O(1)
+    (expired buckets are cleared once while time moves on).
+    """
+
+    def __init__(self, window: float, bucket: float) -> None:
+        self._bucket = bucket
+        self._size = max(1, math.ceil(window / bucket))
+        self._electrical = array("d", [0.0] * self._size)
+        self._thermal = array("d", [0.0] * self._size)
+        self._head: int | None = None
+        self.electrical = 0.0
+        self.thermal = 0.0
+
+    def _advance(self, now: float) -> int:
+        """Move the window to ``now`` and return the current bucket slot."""
+        index = int(now // self._bucket)
+        if self._head is None:
+            self._head = index
+        elif index - self._head >= self._size:
+            for slot in range(self._size):
+                self._electrical[slot] = self._thermal[slot] = 0.0
+            self.electrical = self.thermal = 0.0
+            self._head = index
+        else:
+            while self._head < index:
+                self._head += 1
+                slot = self._head % self._size
+                self.electrical -= self._electrical[slot]
+                self.thermal -= self._thermal[slot]
+                self._electrical[slot] = self._thermal[slot] = 0.0
+            if self.electrical < _EPSILON:
+                self.electrical = 0.0
+            if self.thermal < _EPSILON:
+                self.thermal = 0.0
+        return self._head % self._size
+
+    def add(self, now: float, electrical: float, thermal: float) -> None:
+        slot = self._advance(now)
+        self._electrical[slot] += electrical
+        self._thermal[slot] += thermal
+        self.electrical += electrical
+        self.thermal += thermal
+
+    def cop(self, now: float) -> float | None:
+        """Return thermal / electrical energy of the window (None if no data)."""
+        self._advance(now)
+        if self.electrical <= 0:
+            return None
+        return self.thermal / self.electrical
+
+
+class EfficiencyTracker:
+    """Rolling COP windows per heat pump and for the whole system.
+
+    ``windows`` maps a name to (window seconds, bucket seconds). Index 0
+    is the system (sum of all heat pumps).
+    """
+
+    def __init__(self, windows: Mapping[str, tuple[float, float]]) -> None:
+        self._windows = windows
+        self._trackers: dict[int, dict[str, RollingEnergyWindow]] = {}
+
+    def _get(self, hp_idx: int) -> dict[str, RollingEnergyWindow]:
+        trackers = self._trackers.get(hp_idx)
+        if trackers is None:
+            trackers = {
+                name: RollingEnergyWindow(window, bucket)
+                for name, (window, bucket) in self._windows.items()
+            }
+            self._trackers[hp_idx] = trackers
+        return trackers
+
+    def add(self, hp_idx: int, now: float, electrical: float, thermal: float) -> None:
+        """Add the energy (kWh) of one poll of a heat pump."""
+        for key in (hp_idx, 0):
+            for window in self._get(key).values():
+                window.add(now, electrical, thermal)
+
+    def cop(self, hp_idx: int, window: str, now: float) -> float | None:
+        trackers = self._trackers.get(hp_idx)
+        if trackers is None:
+            return None
+        return trackers[window].cop(now)
@@ -0,0 +1,93 @@
+"""Shared base entity for writeable Lambda registers (number/select)."""
+
+from __future__ import annotations
+
+import logging
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .coordinator import LambdaDataUpdateCoordinator
+from .modbus_utils import ModbusWriteError
+from .utils import build_device_info, to_register_values
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class LambdaWriteableEntity(CoordinatorEntity[LambdaDataUpdateCoordinator]):
+    """Base class for entities that read from and write to one register."""
+
+    _attr_should_poll = False
+
+    def __init__(
+        self,
+        coordinator: LambdaDataUpdateCoordinator,
+        entry: ConfigEntry,
+        register: dict,
+        platform: str,
+    ) -> None:
+        """Initialize from a register description of get_writeable_registers()."""
+        super().__init__(coordinator)
+        self._entry = entry
+        self._register = register
+        self._sensor_info = register["sensor_info"]
+        self._address = register["address"]
+        self._data_type = self._sensor_info.get("data_type")
+        self._scale = self._sensor_info.get("scale", 1)
+
+        names = register["names"]
+        self._attr_name = names["name"]
+        # Gleiche unique_id wie der Sensor wäre ein Konflikt -> Plattform anhängen
+        self._attr_unique_id = f"{names['unique_id']}_{platform}"
+        self.entity_id = f"{platform}.{names['entity_id'].split('.', 1)[1]}"
+
+    @property
+    def device_info(self):
+        return build_device_info(self._entry)
+
+    @property
+    def _data_key(self) -> str:
+        """Key of the register value in coordinator.data (respects overrides)."""
+        return self.coordinator.get_data_key(self._register["data_key"])
+
+    @property
+    def _current_value(self):
+        """Return the cached (scaled) register value or None."""
+        if not self.coordinator.data:
+            return None
+        return self.coordinator.data.get(self._data_key)
+
+    async def async_added_to_hass(self):
+        """Enable polling of the register while the entity exists."""
+        await super().async_added_to_hass()
+        self.coordinator._enabled_addresses.add(self._address)
+
+    async def async_will_remove_from_hass(self):
+        """Stop polling the register."""
+        self.coordinator._enabled_addresses.discard(self._address)
+        await super().async_will_remove_from_hass()
+
+    async def _async_write_value(self, value: float) -> None:
+        """Scale, encode and write ``value``, then update the cached state."""
+        raw_value = round(value / self._scale)
+        _LOGGER.debug(
+            "Write %s: address=%s, value=%s, raw=%s",
+            self.entity_id,
+            self._address,
+            value,
+            raw_value,
+        )
+        try:
+            await self.coordinator.async_write_register_value(
+                self._address, to_register_values(raw_value, self._data_type)
+            )
+        except ModbusWriteError as ex:
+            raise HomeAssistantError(
+                f"Failed to write {self.entity_id}: {ex}"
+            ) from ex
+
+        # Cache aktualisieren statt kompletten Refresh auszulösen
+        self.coordinator.async_set_data_value(
+            self._data_key, raw_value * self._scale
+        )
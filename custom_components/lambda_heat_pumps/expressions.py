@@ -0,0 +1,159 @@
+"""Small arithmetic expressions over coordinator data keys.
+
+Expressions use Python syntax restricted to numbers, data keys (names),
+arithmetic, comparisons, ``a if cond else b`` and a few functions. They
+are parsed once and compiled into nested closures, so evaluating one is a
+handful of dict lookups and operator calls instead of a Jinja render.
+"""
+
+from __future__ import annotations
+
+import ast
+import operator
+from typing import Any, Callable, Mapping
+
+
+def _pow(base, exponent):
+    # Begrenzter Exponent, damit eine Formel den Event-Loop nicht blockiert
+    if abs(exponent) > 64:
+        raise ValueError("exponent too large")
+    return operator.pow(base, exponent)
+
+
+_BINARY_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: _pow,
+}
+_UNARY_OPS = {ast.USub: operator.neg, ast.UAdd: operator.pos}
+_COMPARE_OPS = {
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+}
+_FUNCTIONS = {"min": min, "max": max, "abs": abs, "round": round}
+
+
+class _Undefined(Exception):
+    """An input of the expression has no value."""
+
+
+class Expression:
+    """A compiled expression; call it with coordinator.data.
+
+    ``inputs`` are the data keys the expression reads; ``key_func`` maps
+    the names to data keys (sensor overrides). The result is None if an
+    input is missing or the arithmetic is undefined (e.g. x / 0).
+
+    Raises:
+        ValueError: If the expression uses unsupported syntax
+    """
+
+    __slots__ = ("source", "inputs", "_func")
+
+    def __init__(self, source: str, key_func: Callable[[str], str] = str) -> None:
+        self.source = source
+        inputs: set[str] = set()
+        try:
+            tree = ast.parse(source.strip(), mode="eval")
+        except SyntaxError as ex:
+            raise ValueError(f"Invalid expression {source!r}: {ex.msg}") from ex
+        self._func = _compile(tree.body, inputs, key_func)
+        self.inputs = frozenset(inputs)
+
+    def __call__(self, data: Mapping[str, Any]) -> float | None:
+        try:
+            result = self._func(data)
+        except (_Undefined, ArithmeticError, TypeError, ValueError):
+            return None
+        if isinstance(result, bool):
+            return float(result)
+        return result
+
+    def __repr__(self) -> str:
+        return f"Expression({self.source!r})"
+
+
+def _compile(
+    node: ast.AST, inputs: set[str], key_func: Callable[[str], str]
+) -> Callable[[Mapping], Any]:
+    """Turn an AST node into a closure ``func(data)``."""
+
+    def sub(child: ast.AST) -> Callable[[Mapping], Any]:
+        return _compile(child, inputs, key_func)
+
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+        value = node.value
+        return lambda data: value
+
+    if isinstance(node, ast.Name):
+        key = key_func(node.id)
+        inputs.add(key)
+
+        def get(data):
+            value = data.get(key)
+            if value is None:
+                raise _Undefined(key)
+            return value
+
+        return get
+
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPS:
+        op = _BINARY_OPS[type(node.op)]
+        left, right = sub(node.left), sub(node.right)
+        return lambda data: op(left(data), right(data))
+
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPS:
+        op = _UNARY_OPS[type(node.op)]
+        operand = sub(node.operand)
+        return lambda data: op(operand(data))
+
+    if isinstance(node, ast.Compare) and all(
+        type(op) in _COMPARE_OPS for op in node.ops
+    ):
+        first = sub(node.left)
+        chain = [
+            (_COMPARE_OPS[type(op)], sub(comparator))
+            for op, comparator in zip(node.ops, node.comparators)
+        ]
+
+        def compare(data):
+            left = first(data)
+            for op, func in chain:
+                right = func(data)
+                if not op(left, right):
+                    return False
+                left = right
+            return True
+
+        return compare
+
+    if isinstance(node, ast.BoolOp):
+        values = [sub(value) for value in node.values]
+        if isinstance(node.op, ast.And):
+            return lambda data: all(func(data) for func in values)
+        return lambda data: any(func(data) for func in values)
+
+    if isinstance(node, ast.IfExp):
+        test = sub(node.test)
+        body, orelse = sub(node.body), sub(node.orelse)
+        return lambda data: body(data) if test(data) else orelse(data)
+
+    if (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Name)
+        and node.func.id in _FUNCTIONS
+        and not node.keywords
+    ):
+        function = _FUNCTIONS[node.func.id]
+        args = [sub(arg) for arg in node.args]
+        return lambda data: function(*(arg(data) for arg in args))
+
+    raise ValueError(f"Unsupported expression element: {ast.dump(node)}")
@@ -0,0 +1,167 @@
+"""Online estimation of the effective heating curve (flow vs. ambient).
+
+Every poll in heating operation adds one (ambient, flow) sample to a
+weighted least-squares fit ``flow = slope * ambient + flow_at_0c``. The
+fit keeps only five sums; older samples fade out with a half-life, so the
+curve follows changes of the settings without storing any history.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Mapping, MutableMapping, NamedTuple
+
+
+class CurveEstimator:
+    """Least-squares line through (ambient, flow) with exponential forgetting."""
+
+    __slots__ = ("_half_life", "_weight", "_sx", "_sy", "_sxx", "_sxy", "_last")
+
+    def __init__(self, half_life: float) -> None:
+        self._half_life = half_life
+        self._weight = 0.0
+        self._sx = self._sy = self._sxx = self._sxy = 0.0
+        self._last: float | None = None
+
+    @property
+    def weight(self) -> float:
+        return self._weight
+
+    def add(self, ambient: float, flow: float, now: float) -> None:
+        """Add a sample; ``now`` is a wall-clock timestamp in seconds."""
+        if self._last is not None and now > self._last:
+            decay = 0.5 ** ((now - self._last) / self._half_life)
+            self._weight *= decay
+            self._sx *= decay
+            self._sy *= decay
+            self._sxx *= decay
+            self._sxy *= decay
+        if self._last is None or now > self._last:
+            self._last = now
+        self._weight += 1
+        self._sx += ambient
+        self._sy += flow
+        self._sxx += ambient * ambient
+        self._sxy += ambient * flow
+
+    def fit(self, min_weight: float, min_spread: float) -> tuple[float, float] | None:
+        """Return (slope, flow_at_0c) or None without enough data.
+
+        ``min_spread`` is the minimum standard deviation (K) of the ambient
+        temperatures; without it the slope is not determined.
+        """
+        if self._weight < min_weight:
+            return None
+        mean_x = self._sx / self._weight
+        mean_y = self._sy / self._weight
+        variance = self._sxx / self._weight - mean_x * mean_x
+        if variance < min_spread * min_spread:
+            return None
+        slope = (self._sxy / self._weight - mean_x * mean_y) / variance
+        return slope, mean_y - slope * mean_x
+
+    def as_dict(self) -> dict:
+        return {
+            "weight": self._weight,
+            "sums": [self._sx, self._sy, self._sxx, self._sxy],
+            "last": self._last,
+        }
+
+    def load(self, data: Mapping) -> None:
+        sums = data.get("sums")
+        if not isinstance(sums, list) or len(sums) != 4:
+            return
+        self._weight = float(data.get("weight") or 0)
+        self._sx, self._sy, self._sxx, self._sxy = (float(value) for value in sums)
+        self._last = data.get("last")
+
+
+class CurveSeries(NamedTuple):
+    """Data keys of one learned curve (heating circuit or heat pump)."""
+
+    flow: str
+    state: str
+    heating_states: frozenset
+    # Vorgabe der Regelung (konfigurierte Heizkurve)
+    target: str
+
+
+class HeatingCurves:
+    """Learned heating curves of all heating circuits and heat pumps.
+
+    Results are written into coordinator.data as "{prefix}_heating_curve_slope",
+    "{prefix}_heating_curve_flow_at_0c" and "{prefix}_heating_curve_deviation"
+    (learned flow at the current ambient minus the controller's target).
+    """
+
+    def __init__(
+        self, half_life: float, min_weight: float, min_spread: float
+    ) -> None:
+        self._half_life = half_life
+        self._min_weight = min_weight
+        self._min_spread = min_spread
+        self._ambient = ""
+        self._series: dict[str, CurveSeries] = {}
+        self._estimators: dict[str, CurveEstimator] = {}
+
+    def configure(self, ambient: str, series: Mapping[str, CurveSeries]) -> None:
+        self._ambient = ambient
+        self._series = dict(series)
+        for prefix in self._series:
+            self._estimator(prefix)
+
+    def _estimator(self, prefix: str) -> CurveEstimator:
+        estimator = self._estimators.get(prefix)
+        if estimator is None:
+            estimator = self._estimators[prefix] = CurveEstimator(self._half_life)
+        return estimator
+
+    def fit(self, prefix: str) -> tuple[float, float] | None:
+        estimator = self._estimators.get(prefix)
+        if estimator is None:
+            return None
+        return estimator.fit(self._min_weight, self._min_spread)
+
+    def update(self, data: MutableMapping[str, Any], now: float) -> bool:
+        """Learn from one poll and publish the fits; True if a sample was added."""
+        ambient = data.get(self._ambient)
+        learned = False
+        for prefix, series in self._series.items():
+            flow = data.get(series.flow)
+            if (
+                ambient is not None
+                and flow is not None
+                and data.get(series.state) in series.heating_states
+            ):
+                self._estimators[prefix].add(ambient, flow, now)
+                learned = True
+            fit = self.fit(prefix)
+            keys = [
+                f"{prefix}_heating_curve_slope",
+                f"{prefix}_heating_curve_flow_at_0c",
+                f"{prefix}_heating_curve_deviation",
+            ]
+            if fit is None:
+                for key in keys:
+                    data.pop(key, None)
+                continue
+            slope, flow_at_0c = fit
+            data[keys[0]] = slope
+            data[keys[1]] = flow_at_0c
+            target = data.get(series.target)
+            if ambient is None or target is None:
+                data.pop(keys[2], None)
+            else:
+                data[keys[2]] = slope * ambient + flow_at_0c - target
+        return learned
+
+    def as_dict(self) -> dict:
+        return {
+            prefix: estimator.as_dict()
+            for prefix, estimator in self._estimators.items()
+            if estimator.weight
+        }
+
+    def load(self, data: Mapping | None) -> None:
+        for prefix, values in (data or {}).items():
+            if isinstance(values, Mapping):
+                self._estimator(prefix).load(values)
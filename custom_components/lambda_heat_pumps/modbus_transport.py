@@ -0,0 +1,175 @@
+"""Shared Modbus TCP transport for several slave IDs behind one gateway."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+import logging
+import time
+from typing import Any, Callable
+
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, MODBUS_TIMEOUT_MAX
+from .modbus_utils import LatencyTracker
+
+_LOGGER = logging.getLogger(__name__)
+
+TRANSPORTS_KEY = f"{DOMAIN}_transports"
+
+
+class SharedModbusTransport:
+    """One Modbus TCP connection used by all config entries of a gateway.
+
+    Every slave ID has its own request queue. A single worker sends the
+    requests one after another, taking turns between the slaves (round
+    robin) so a busy entry cannot starve the others. Latency is tracked
+    per slave ID.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        client_factory: Callable[[], Any] | None = None,
+    ) -> None:
+        self.host = host
+        self.port = port
+        if client_factory is None:
+            from pymodbus.client import AsyncModbusTcpClient
+
+            def client_factory():
+                return AsyncModbusTcpClient(
+                    host=host, port=port, timeout=MODBUS_TIMEOUT_MAX
+                )
+
+        self.client = client_factory()
+        self._users: dict[int, int] = {}
+        self._latency: dict[int, LatencyTracker] = {}
+        self._queues: dict[int, deque] = {}
+        self._ready: deque[int] = deque()
+        self._worker: asyncio.Task | None = None
+        self._connect_lock = asyncio.Lock()
+
+    @property
+    def slave_ids(self) -> list[int]:
+        """Slave IDs currently using this transport."""
+        return sorted(self._users)
+
+    def register(self, slave_id: int, latency: LatencyTracker) -> None:
+        """Register a user of the transport and its latency tracker."""
+        self._users[slave_id] = self._users.get(slave_id, 0) + 1
+        self._latency[slave_id] = latency
+        self._queues.setdefault(slave_id, deque())
+
+    def unregister(self, slave_id: int) -> bool:
+        """Remove a user. Returns True if the transport is no longer used."""
+        count = self._users.get(slave_id, 0) - 1
+        if count > 0:
+            self._users[slave_id] = count
+        else:
+            self._users.pop(slave_id, None)
+            self._latency.pop(slave_id, None)
+            for _func, _args, _timeout, future in self._queues.pop(slave_id, ()):
+                if not future.done():
+                    future.cancel()
+        return not self._users
+
+    def latency_stats(self) -> dict[int, dict]:
+        """Latency statistics per slave ID."""
+        return {
+            slave_id: tracker.as_dict() for slave_id, tracker in self._latency.items()
+        }
+
+    async def async_connect(self) -> None:
+        """Open the TCP connection if it is not connected.
+
+        Raises:
+            ConnectionError: If the connection could not be established
+        """
+        async with self._connect_lock:
+            if getattr(self.client, "connected", False):
+                return
+            if not await self.client.connect():
+                raise ConnectionError(f"Failed to connect to {self.host}:{self.port}")
+            _LOGGER.debug(
+                "Shared Modbus connection to %s:%s established for slaves %s",
+                self.host,
+                self.port,
+                self.slave_ids,
+            )
+
+    async def async_execute(
+        self, slave_id: int, func, *args, timeout: float = MODBUS_TIMEOUT_MAX
+    ) -> Any:
+        """Queue ``func(client, *args)`` for ``slave_id`` and wait for its result.
+
+        ``timeout`` applies to the request itself, not to the time spent in
+        the queue.
+        """
+        future = asyncio.get_running_loop().create_future()
+        queue = self._queues.setdefault(slave_id, deque())
+        if not queue:
+            self._ready.append(slave_id)
+        queue.append((func, args, timeout, future))
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.get_running_loop().create_task(self._async_work())
+        return await future
+
+    async def _async_work(self) -> None:
+        """Send queued requests, one slave after the other."""
+        while self._ready:
+            slave_id = self._ready.popleft()
+            queue = self._queues.get(slave_id)
+            if not queue:
+                continue
+            func, args, timeout, future = queue.popleft()
+            if queue:
+                self._ready.append(slave_id)
+            if future.done():
+                continue
+            start = time.monotonic()
+            try:
+                await self.async_connect()
+                result = await asyncio.wait_for(func(self.client, *args), timeout)
+            except Exception as ex:  # noqa: BLE001 - forwarded to the caller
+                if not future.done():
+                    future.set_exception(ex)
+                continue
+            tracker = self._latency.get(slave_id)
+            if tracker is not None:
+                tracker.add_sample(time.monotonic() - start)
+            if not future.done():
+                future.set_result(result)
+
+    def close(self) -> None:
+        """Close the TCP connection (it is reopened on the next request)."""
+        try:
+            self.client.close()
+        except Exception as ex:
+            _LOGGER.debug("Error closing shared Modbus connection: %s", ex)
+
+
+def async_get_shared_transport(
+    hass: HomeAssistant, host: str, port: int, slave_id: int, latency: LatencyTracker
+) -> SharedModbusTransport:
+    """Return the transport for (host, port), creating it on first use."""
+    transports = hass.data.setdefault(TRANSPORTS_KEY, {})
+    transport = transports.get((host, port))
+    if transport is None:
+        transport = SharedModbusTransport(host, port)
+        transports[(host, port)] = transport
+    transport.register(slave_id, latency)
+    return transport
+
+
+def async_release_shared_transport(
+    hass: HomeAssistant, transport: SharedModbusTransport, slave_id: int
+) -> None:
+    """Release a transport, closing it when the last entry is gone."""
+    if not transport.unregister(slave_id):
+        return
+    transport.close()
+    transports = hass.data.get(TRANSPORTS_KEY, {})
+    if transports.get((transport.host, transport.port)) is transport:
+        del transports[(transport.host, transport.port)]
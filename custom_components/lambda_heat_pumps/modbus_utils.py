@@ -2,10 +2,22 @@
 
 import logging
 import asyncio
-from typing import Any
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable
 
 _LOGGER = logging.getLogger(__name__)
 
+# Modbus allows at most 123 registers in one Write Multiple Registers request
+MAX_WRITE_REGISTERS = 123
+
+# Modbus exception code 1: Illegal Function (FC not supported by the device)
+ILLEGAL_FUNCTION = 1
+
+
+class ModbusWriteError(Exception):
+    """Raised when a (batched) Modbus write request fails."""
+
 
 def _detect_pymodbus_api(client, method_name: str) -> str:
     """Detect pymodbus API version compatibility."""
@@ -142,6 +154,49 @@ async def async_write_registers(
         raise
 
 
+async def async_read_write_registers(
+    client,
+    address: int,
+    values: list,
+    slave_id: int = 1,
+    read_address: int | None = None,
+    read_count: int | None = None,
+) -> Any:
+    """Write and read back registers in one request (function code 23).
+
+    By default the written registers are read back. Per Modbus specification
+    the write is executed before the read, so the response contains the
+    confirmed values.
+    """
+    if read_address is None:
+        read_address = address
+    if read_count is None:
+        read_count = len(values)
+    try:
+        try:
+            # pymodbus >= 3.x
+            return await client.readwrite_registers(
+                read_address=read_address,
+                read_count=read_count,
+                write_address=address,
+                values=values,
+                slave=slave_id,
+            )
+        except TypeError:
+            # pymodbus 2.x
+            return await client.readwrite_registers(
+                read_address=read_address,
+                read_count=read_count,
+                write_address=address,
+                write_registers=values,
+                unit=slave_id,
+            )
+
+    except Exception as e:
+        _LOGGER.debug("Modbus read/write error at address %d: %s", address, e)
+        raise
+
+
 # Synchronous versions for backward compatibility
 def read_holding_registers(client, address: int, count: int, slave_id: int = 1) -> Any:
     """Synchronous read holding registers with compatibility."""
@@ -217,3 +272,267 @@ def read_input_registers(client, address: int, count: int, slave_id: int = 1) ->
     except Exception as e:
         _LOGGER.error("Modbus read error at address %d: %s", address, e)
         raise
+
+
+class ModbusWriteBatcher:
+    """Coalesce register writes issued in quick succession.
+
+    Writes are collected for ``delay`` seconds. Afterwards all pending
+    registers are sorted and every run of consecutive addresses is sent as
+    one Write Multiple Registers request. A later write to the same address
+    within the window replaces the earlier value.
+    """
+
+    def __init__(
+        self,
+        write_func: Callable[[int, list[int]], Awaitable[Any]],
+        delay: float,
+        max_count: int = MAX_WRITE_REGISTERS,
+    ) -> None:
+        """Initialize the batcher.
+
+        Args:
+            write_func: Coroutine ``(start_address, values)`` doing the write
+            delay: Collection window in seconds
+            max_count: Maximum number of registers per request
+        """
+        self._write_func = write_func
+        self._delay = delay
+        self._max_count = max_count
+        self._pending: dict[int, int] = {}
+        self._waiters: dict[int, list[asyncio.Future]] = {}
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._flush_task: asyncio.Task | None = None
+
+    @property
+    def pending(self) -> dict[int, int]:
+        """Return a copy of the registers waiting to be written."""
+        return dict(self._pending)
+
+    async def async_write(self, address: int, values: list[int]) -> None:
+        """Queue ``values`` starting at ``address`` and wait for the write.
+
+        Raises:
+            ModbusWriteError: If the request containing the registers failed
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        for offset, value in enumerate(values):
+            self._pending[address + offset] = value
+        # Only the first register carries the waiter, the batch containing it
+        # always contains the following words as well.
+        self._waiters.setdefault(address, []).append(future)
+        if self._flush_handle is None and self._flush_task is None:
+            self._flush_handle = loop.call_later(self._delay, self._start_flush)
+        await future
+
+    def _start_flush(self) -> None:
+        """Timer callback starting the flush task."""
+        self._flush_handle = None
+        self._flush_task = asyncio.get_running_loop().create_task(self.async_flush())
+
+    async def async_flush(self) -> None:
+        """Write all pending registers immediately."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, {}
+        waiters, self._waiters = self._waiters, {}
+        try:
+            for start, values in group_register_runs(pending, self._max_count):
+                error: Exception | None = None
+                try:
+                    result = await self._write_func(start, values)
+                    if hasattr(result, "isError") and result.isError():
+                        error = ModbusWriteError(
+                            f"Write of {len(values)} register(s) at {start} failed: "
+                            f"{result}"
+                        )
+                except Exception as ex:  # noqa: BLE001 - forwarded to waiters
+                    error = ModbusWriteError(
+                        f"Write of {len(values)} register(s) at {start} failed: {ex}"
+                    )
+                _LOGGER.debug(
+                    "Batched write of %d register(s) at %d: %s",
+                    len(values),
+                    start,
+                    "failed" if error else "ok",
+                )
+                for address in range(start, start + len(values)):
+                    for future in waiters.pop(address, []):
+                        if future.done():
+                            continue
+                        if error:
+                            future.set_exception(error)
+                        else:
+                            future.set_result(None)
+        finally:
+            self._flush_task = None
+            # Writes queued while this flush was running get their own window
+            if self._pending and self._flush_handle is None:
+                self._flush_handle = asyncio.get_running_loop().call_later(
+                    self._delay, self._start_flush
+                )
+
+    async def async_shutdown(self) -> None:
+        """Flush outstanding writes before the connection goes away."""
+        if self._pending:
+            await self.async_flush()
+
+
+def group_register_runs(
+    registers: dict[int, int], max_count: int = MAX_WRITE_REGISTERS
+) -> list[tuple[int, list[int]]]:
+    """Group ``{address: value}`` into runs of consecutive addresses.
+
+    Returns:
+        list[tuple[int, list[int]]]: ``(start_address, values)`` per request
+    """
+    runs: list[tuple[int, list[int]]] = []
+    for address in sorted(registers):
+        if (
+            runs
+            and address == runs[-1][0] + len(runs[-1][1])
+            and len(runs[-1][1]) < max_count
+        ):
+            runs[-1][1].append(registers[address])
+        else:
+            runs.append((address, [registers[address]]))
+    return runs
+
+
+class CircuitOpenError(Exception):
+    """Raised when a request is rejected because the circuit breaker is open."""
+
+
+class LatencyTracker:
+    """Track request latency and derive an adaptive request timeout.
+
+    Keeps an exponentially weighted moving average and the last ``window``
+    samples for the 95th percentile. The timeout is ``factor`` times the
+    larger of both, clamped to ``[min_timeout, max_timeout]``. Without
+    samples ``max_timeout`` is used.
+    """
+
+    def __init__(
+        self,
+        min_timeout: float,
+        max_timeout: float,
+        factor: float = 3.0,
+        alpha: float = 0.2,
+        window: int = 50,
+    ) -> None:
+        self._min_timeout = min_timeout
+        self._max_timeout = max_timeout
+        self._factor = factor
+        self._alpha = alpha
+        self._samples: deque[float] = deque(maxlen=window)
+        self.ewma: float | None = None
+
+    def add_sample(self, latency: float) -> None:
+        """Record the duration of a successful request (seconds)."""
+        self._samples.append(latency)
+        if self.ewma is None:
+            self.ewma = latency
+        else:
+            self.ewma = self._alpha * latency + (1 - self._alpha) * self.ewma
+
+    @property
+    def p95(self) -> float | None:
+        """95th percentile of the recorded samples."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+
+    @property
+    def timeout(self) -> float:
+        """Timeout to use for the next request (seconds)."""
+        if self.ewma is None:
+            return self._max_timeout
+        timeout = self._factor * max(self.ewma, self.p95)
+        return min(self._max_timeout, max(self._min_timeout, timeout))
+
+    def as_dict(self) -> dict:
+        """Return the statistics for diagnostics/logging."""
+        return {
+            "ewma": self.ewma,
+            "p95": self.p95,
+            "timeout": self.timeout,
+            "samples": len(self._samples),
+        }
+
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Simple circuit breaker for the Modbus connection.
+
+    Opens after ``failure_threshold`` consecutive failures. While open all
+    requests are rejected. After ``reset_timeout`` seconds a single probe
+    request is let through (half open); its result closes or re-opens the
+    circuit.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_timeout: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probe_in_flight = False
+        self.state = CIRCUIT_CLOSED
+
+    @property
+    def is_open(self) -> bool:
+        """True while requests are rejected without a probe being due."""
+        return (
+            self.state == CIRCUIT_OPEN
+            and self._clock() - self._opened_at < self._reset_timeout
+        )
+
+    def allow_request(self) -> bool:
+        """Return True if a request may be sent now."""
+        if self.state == CIRCUIT_CLOSED:
+            return True
+        if self.state == CIRCUIT_OPEN:
+            if self.is_open:
+                return False
+            self.state = CIRCUIT_HALF_OPEN
+            self._probe_in_flight = False
+        # Half open: nur eine Probe-Anfrage gleichzeitig
+        if self._probe_in_flight:
+            return False
+        self._probe_in_flight = True
+        return True
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful request."""
+        if self.state != CIRCUIT_CLOSED:
+            _LOGGER.info("Modbus circuit breaker closed, controller responding")
+        self.state = CIRCUIT_CLOSED
+        self._failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        """Count a failed request, open the circuit if the threshold is hit."""
+        self._failures += 1
+        self._probe_in_flight = False
+        if self.state == CIRCUIT_HALF_OPEN or (
+            self._failures >= self._failure_threshold
+        ):
+            if self.state != CIRCUIT_OPEN:
+                _LOGGER.warning(
+                    "Modbus circuit breaker opened after %d failure(s)",
+                    self._failures,
+                )
+            self.state = CIRCUIT_OPEN
+            self._opened_at = self._clock()
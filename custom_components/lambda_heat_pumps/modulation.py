@@ -0,0 +1,111 @@
+"""Time-weighted histograms of the compressor modulation per mode."""
+
+from __future__ import annotations
+
+from array import array
+from datetime import date
+from typing import Mapping
+
+# Tage, für die Histogramme gehalten werden
+HISTOGRAM_DAYS = ("today", "yesterday")
+
+
+def histogram_percentile(
+    histogram: list[int], percent: float, bin_width: float
+) -> float | None:
+    """Return the modulation (%) below which ``percent`` of the time was spent.
+
+    Linear interpolation inside the bin; None for an empty histogram.
+    """
+    total = sum(histogram)
+    if not total:
+        return None
+    target = total * percent / 100
+    cumulative = 0
+    for index, seconds in enumerate(histogram):
+        if seconds and cumulative + seconds >= target:
+            return bin_width * (index + (target - cumulative) / seconds)
+        cumulative += seconds
+    return bin_width * len(histogram)
+
+
+class ModulationHistograms:
+    """Seconds per modulation bin for every (heat pump, mode).
+
+    The bins cover 0-100 % in steps of ``bin_width``; 100 % belongs to the
+    last bin. Each histogram is an unsigned int array of seconds. At the
+    start of a new (local) day "today" becomes "yesterday".
+    """
+
+    def __init__(self, bin_width: int) -> None:
+        self.bin_width = bin_width
+        self._bins = -(-100 // bin_width)
+        self._day: date | None = None
+        self._histograms: dict[str, dict[tuple[int, str], array]] = {
+            day: {} for day in HISTOGRAM_DAYS
+        }
+
+    def add(self, hp_idx: int, mode: str, rating: float, seconds: float) -> None:
+        histograms = self._histograms["today"]
+        histogram = histograms.get((hp_idx, mode))
+        if histogram is None:
+            histogram = histograms[(hp_idx, mode)] = array("I", [0] * self._bins)
+        index = min(max(int(rating // self.bin_width), 0), self._bins - 1)
+        histogram[index] += round(seconds)
+
+    def rollover(self, day: date) -> bool:
+        """Start a new day; returns True if "today" moved to "yesterday"."""
+        if day == self._day:
+            return False
+        if self._day is not None:
+            # Nach mehr als einem Tag Pause ist "gestern" leer
+            consecutive = (day - self._day).days == 1
+            self._histograms["yesterday"] = (
+                self._histograms["today"] if consecutive else {}
+            )
+            self._histograms["today"] = {}
+        self._day = day
+        return True
+
+    def get(self, hp_idx: int, mode: str, day: str = "today") -> list[int]:
+        histogram = self._histograms[day].get((hp_idx, mode))
+        return list(histogram) if histogram else [0] * self._bins
+
+    def keys(self) -> list[tuple[int, str]]:
+        """Return all (hp_idx, mode) with a histogram, sorted."""
+        return sorted({key for days in self._histograms.values() for key in days})
+
+    def percentiles(
+        self, hp_idx: int, mode: str, percents: tuple[int, ...], day: str = "today"
+    ) -> dict[int, float | None]:
+        histogram = self.get(hp_idx, mode, day)
+        return {
+            percent: histogram_percentile(histogram, percent, self.bin_width)
+            for percent in percents
+        }
+
+    def as_dict(self) -> dict:
+        return {
+            "day": self._day.isoformat() if self._day else None,
+            "bin_width": self.bin_width,
+            **{
+                day: {
+                    f"{hp_idx}:{mode}": list(histogram)
+                    for (hp_idx, mode), histogram in histograms.items()
+                }
+                for day, histograms in self._histograms.items()
+            },
+        }
+
+    def load(self, data: Mapping | None) -> None:
+        """Restore from as_dict(); ignored if the bin width changed."""
+        if not data or data.get("bin_width") != self.bin_width:
+            return
+        self._day = date.fromisoformat(data["day"]) if data.get("day") else None
+        for day in HISTOGRAM_DAYS:
+            histograms = {}
+            for key, values in (data.get(day) or {}).items():
+                hp_idx, _, mode = key.partition(":")
+                if hp_idx.isdigit() and len(values) == self._bins:
+                    histograms[(int(hp_idx), mode)] = array("I", values)
+            self._histograms[day] = histograms
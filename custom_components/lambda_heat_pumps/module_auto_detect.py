@@ -4,8 +4,8 @@ from __future__ import annotations
 
 import logging
 
-from typing import TYPE_CHECKING, Any
-from .modbus_utils import async_read_holding_registers
+from typing import TYPE_CHECKING, Any, Awaitable, Callable
+from .modbus_utils import CircuitOpenError, async_read_holding_registers
 
 if TYPE_CHECKING:
     from homeassistant.config_entries import ConfigEntry
@@ -32,13 +32,20 @@ MAX_MODULE_COUNTS = {
 }
 
 
-async def auto_detect_modules(client: Any, slave_id: int) -> dict[str, int]:
+async def auto_detect_modules(
+    client: Any,
+    slave_id: int,
+    read: Callable[[int, int], Awaitable[Any]] | None = None,
+) -> dict[str, int]:
     """
     Automatically detect installed modules by testing register accessibility.
 
     Args:
         client: Modbus client
         slave_id: Modbus slave ID
+        read: Optional ``read(address, count)`` coroutine used instead of
+            the client, e.g. the coordinator read through the per-slave
+            queue of a shared connection
 
     Returns:
         Dict with detected module counts: {
@@ -77,10 +84,13 @@ async def auto_detect_modules(client: Any, slave_id: int) -> dict[str, int]:
             test_register = base_address + (test_registers[0] % 100)
 
             try:
-                # Verwende die Kompatibilitätsfunktion für alle pymodbus-Versionen
-                result = await async_read_holding_registers(
-                    client, test_register, 1, slave_id
-                )
+                if read is not None:
+                    result = await read(test_register, 1)
+                else:
+                    # Kompatibilitätsfunktion für alle pymodbus-Versionen
+                    result = await async_read_holding_registers(
+                        client, test_register, 1, slave_id
+                    )
 
                 if not result.isError():
                     detected[module_type] = module_idx + 1
@@ -100,7 +110,12 @@ async def auto_detect_modules(client: Any, slave_id: int) -> dict[str, int]:
                     )
                     break
 
-            except (AttributeError, ConnectionError, TimeoutError) as ex:
+            except (
+                AttributeError,
+                ConnectionError,
+                TimeoutError,
+                CircuitOpenError,
+            ) as ex:
                 _LOGGER.debug(
                     "Error testing %s module %s at %s: %s",
                     module_type,
@@ -0,0 +1,69 @@
+"""Number platform for writeable Lambda registers."""
+
+from __future__ import annotations
+
+import logging
+
+from homeassistant.components.number import NumberEntity, NumberMode
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import DOMAIN, NUMBER_DEFAULT_LIMITS
+from .entity import LambdaWriteableEntity
+from .utils import get_writeable_registers
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
+) -> None:
+    """Set up number entities for writeable numeric registers."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    disabled_registers = getattr(coordinator, "disabled_registers", set())
+
+    entities = [
+        LambdaNumber(coordinator, entry, register)
+        for register in get_writeable_registers(entry, disabled_registers)
+        if register["mapping"] is None
+    ]
+    _LOGGER.debug("Adding %d Lambda number entities", len(entities))
+    async_add_entities(entities)
+
+
+class LambdaNumber(LambdaWriteableEntity, NumberEntity):
+    """Numeric setpoint backed by a writeable register."""
+
+    _attr_mode = NumberMode.BOX
+
+    def __init__(self, coordinator, entry, register) -> None:
+        super().__init__(coordinator, entry, register, "number")
+        unit = self._sensor_info.get("unit")
+        self._attr_native_unit_of_measurement = unit
+        self._attr_native_step = self._scale
+
+        # Grenzen: Template -> Standardwerte je Einheit -> Wertebereich des Registers
+        if self._data_type == "int32":
+            raw_min, raw_max = -(2**31), 2**31 - 1
+        else:
+            raw_min, raw_max = -32768, 32767
+        default_min, default_max = NUMBER_DEFAULT_LIMITS.get(
+            unit, (raw_min * self._scale, raw_max * self._scale)
+        )
+        self._attr_native_min_value = self._sensor_info.get("min_value", default_min)
+        self._attr_native_max_value = self._sensor_info.get("max_value", default_max)
+
+    @property
+    def native_value(self) -> float | None:
+        value = self._current_value
+        if value is None:
+            return None
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+
+    async def async_set_native_value(self, value: float) -> None:
+        """Write a new setpoint."""
+        await self._async_write_value(value)
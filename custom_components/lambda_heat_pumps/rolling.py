@@ -0,0 +1,140 @@
+"""Rolling min/max/mean/standard deviation over fixed time windows.
+
+A window is a ring of time buckets; every bucket keeps count, sum, sum of
+squares, min and max of its samples. Adding a sample touches one bucket
+(O(1)), a query combines the fixed number of buckets of the window. Old
+samples drop out when their bucket is reused, so nothing is replayed and
+the memory does not grow with the poll rate.
+"""
+
+from __future__ import annotations
+
+import math
+from array import array
+from typing import Iterable, Mapping
+
+
+class RollingWindow:
+    """Statistics of the samples of the last ``window`` seconds.
+
+    The window is split into ``buckets`` slots; it moves in steps of one
+    bucket, so the oldest bucket may be partially outside the window.
+    """
+
+    __slots__ = (
+        "_width",
+        "_size",
+        "_ids",
+        "_count",
+        "_sum",
+        "_sumsq",
+        "_min",
+        "_max",
+    )
+
+    def __init__(self, window: float, buckets: int) -> None:
+        self._width = window / buckets
+        self._size = buckets
+        self._ids = array("q", [-1] * buckets)
+        self._count = array("I", [0] * buckets)
+        self._sum = array("d", [0.0] * buckets)
+        self._sumsq = array("d", [0.0] * buckets)
+        self._min = array("d", [0.0] * buckets)
+        self._max = array("d", [0.0] * buckets)
+
+    def bucket(self, now: float) -> int:
+        """Return the index of the bucket containing ``now``."""
+        return int(now // self._width)
+
+    def add(self, value: float, now: float) -> None:
+        bucket = self.bucket(now)
+        slot = bucket % self._size
+        if self._ids[slot] != bucket:
+            # Slot gehört zu einem abgelaufenen Bucket -> neu beginnen
+            self._ids[slot] = bucket
+            self._count[slot] = 1
+            self._sum[slot] = value
+            self._sumsq[slot] = value * value
+            self._min[slot] = value
+            self._max[slot] = value
+            return
+        self._count[slot] += 1
+        self._sum[slot] += value
+        self._sumsq[slot] += value * value
+        if value < self._min[slot]:
+            self._min[slot] = value
+        if value > self._max[slot]:
+            self._max[slot] = value
+
+    def stats(self, now: float) -> dict[str, float] | None:
+        """Return min, max, mean and std (population) or None if empty."""
+        oldest = self.bucket(now) - self._size
+        count = 0
+        total = 0.0
+        total_sq = 0.0
+        low = math.inf
+        high = -math.inf
+        for slot in range(self._size):
+            if self._ids[slot] <= oldest or not self._count[slot]:
+                continue
+            count += self._count[slot]
+            total += self._sum[slot]
+            total_sq += self._sumsq[slot]
+            low = min(low, self._min[slot])
+            high = max(high, self._max[slot])
+        if not count:
+            return None
+        mean = total / count
+        # Rundungsfehler können die Varianz knapp negativ machen
+        variance = max(total_sq / count - mean * mean, 0.0)
+        return {"min": low, "max": high, "mean": mean, "std": math.sqrt(variance)}
+
+
+class RollingStatistics:
+    """Rolling windows for a set of coordinator.data keys.
+
+    ``windows`` maps a label (e.g. "1h") to (seconds, buckets). update()
+    feeds the current values of all tracked keys once per poll.
+    """
+
+    def __init__(
+        self, keys: Iterable[str], windows: Mapping[str, tuple[float, int]]
+    ) -> None:
+        self._windows = dict(windows)
+        self._series = {
+            key: {
+                label: RollingWindow(seconds, buckets)
+                for label, (seconds, buckets) in self._windows.items()
+            }
+            for key in keys
+        }
+        # Kleinster Bucket: Takt, in dem sich Statistiken sichtbar ändern
+        self._revision_width = min(
+            (seconds / buckets for seconds, buckets in self._windows.values()),
+            default=0,
+        )
+        self.revision = 0
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._series
+
+    def update(self, data: Mapping, now: float) -> None:
+        for key, windows in self._series.items():
+            value = data.get(key)
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                continue
+            for window in windows.values():
+                window.add(value, now)
+        if self._revision_width:
+            self.revision = int(now // self._revision_width)
+
+    def attributes(self, key: str, now: float, precision: int = 2) -> dict:
+        """Return {"min_1h": .., "std_24h": ..} for ``key``; {} if untracked."""
+        attributes = {}
+        for label, window in self._series.get(key, {}).items():
+            stats = window.stats(now)
+            if stats is None:
+                continue
+            for name, value in stats.items():
+                attributes[f"{name}_{label}"] = round(value, precision)
+        return attributes
@@ -0,0 +1,72 @@
+"""Daily / monthly / yearly rollups of the native counters."""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import Mapping
+
+ROLLUP_PERIODS = ("daily", "monthly", "yearly")
+
+
+def period_start(period: str, day: date) -> date:
+    """Return the first (local) day of the period containing ``day``."""
+    if period == "daily":
+        return day
+    if period == "monthly":
+        return day.replace(day=1)
+    if period == "yearly":
+        return day.replace(month=1, day=1)
+    raise ValueError(f"Unknown period: {period}")
+
+
+class PeriodRollups:
+    """Period baselines of monotonically increasing counters.
+
+    The value of a counter for a period is its total minus the total at
+    the start of the period. Counters are addressed by string keys such as
+    "cycling:heating:1"; a key without baseline started in this period.
+    """
+
+    def __init__(self, periods: tuple[str, ...] = ROLLUP_PERIODS) -> None:
+        self._starts: dict[str, date | None] = dict.fromkeys(periods)
+        self._baselines: dict[str, dict[str, float]] = {p: {} for p in periods}
+
+    def rollover(self, day: date, totals: Mapping[str, float]) -> list[str]:
+        """Start all periods that changed with ``day`` at the current totals.
+
+        All periods roll together (a new year is also a new month and day).
+        Returns the rolled periods.
+        """
+        starts = {period: period_start(period, day) for period in self._starts}
+        rolled = [p for p, start in starts.items() if start != self._starts[p]]
+        for period in rolled:
+            self._starts[period] = starts[period]
+            self._baselines[period] = dict(totals)
+        return rolled
+
+    def value(self, period: str, key: str, total: float) -> float:
+        """Return the part of ``total`` counted in the current ``period``."""
+        return max(total - self._baselines[period].get(key, 0), 0)
+
+    def shift(self, key: str, delta: float) -> None:
+        """Move the baselines of ``key`` (counts that belong to no period)."""
+        for baselines in self._baselines.values():
+            baselines[key] = baselines.get(key, 0) + delta
+
+    def as_dict(self) -> dict:
+        return {
+            period: {
+                "start": start.isoformat() if start else None,
+                "baselines": self._baselines[period],
+            }
+            for period, start in self._starts.items()
+        }
+
+    def load(self, data: Mapping | None) -> None:
+        """Restore from as_dict() output; unknown periods are ignored."""
+        for period, stored in (data or {}).items():
+            if period not in self._starts or not isinstance(stored, Mapping):
+                continue
+            start = stored.get("start")
+            self._starts[period] = date.fromisoformat(start) if start else None
+            self._baselines[period] = dict(stored.get("baselines") or {})
@@ -0,0 +1,61 @@
+"""Select platform for writeable Lambda mode registers."""
+
+from __future__ import annotations
+
+import logging
+
+from homeassistant.components.select import SelectEntity
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import DOMAIN
+from .entity import LambdaWriteableEntity
+from .utils import get_writeable_registers
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
+) -> None:
+    """Set up select entities for writeable registers with a state mapping."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    disabled_registers = getattr(coordinator, "disabled_registers", set())
+
+    entities = [
+        LambdaSelect(coordinator, entry, register)
+        for register in get_writeable_registers(entry, disabled_registers)
+        if register["mapping"] is not None
+    ]
+    _LOGGER.debug("Adding %d Lambda select entities", len(entities))
+    async_add_entities(entities)
+
+
+class LambdaSelect(LambdaWriteableEntity, SelectEntity):
+    """Mode register exposed as a select (options from const_mapping)."""
+
+    def __init__(self, coordinator, entry, register) -> None:
+        super().__init__(coordinator, entry, register, "select")
+        self._mapping = register["mapping"]
+        # Negative Werte (Invalid/Unknown) sind nur Rückmeldungen, nicht setzbar
+        self._reverse_mapping = {
+            text: raw for raw, text in self._mapping.items() if raw >= 0
+        }
+        self._attr_options = list(self._reverse_mapping)
+
+    @property
+    def current_option(self) -> str | None:
+        value = self._current_value
+        if value is None:
+            return None
+        try:
+            return self._mapping.get(int(float(value)))
+        except (TypeError, ValueError):
+            return None
+
+    async def async_select_option(self, option: str) -> None:
+        """Write the raw value belonging to ``option``."""
+        if option not in self._reverse_mapping:
+            raise ValueError(f"Invalid option {option} for {self.entity_id}")
+        await self._async_write_value(self._reverse_mapping[option] * self._scale)
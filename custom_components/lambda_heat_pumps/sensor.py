@@ -14,28 +14,28 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.helpers.event import TrackTemplate, async_track_template_result
 from homeassistant.helpers.template import Template
 from homeassistant.exceptions import TemplateError
-from homeassistant.helpers.dispatcher import async_dispatcher_connect
 
 
 from .const import (
     DOMAIN,
-    SENSOR_TYPES,
-    HP_SENSOR_TEMPLATES,
-    BOIL_SENSOR_TEMPLATES,
-    HC_SENSOR_TEMPLATES,
-    BUFF_SENSOR_TEMPLATES,
-    SOL_SENSOR_TEMPLATES,
     CALCULATED_SENSOR_TEMPLATES,
+    COUNTER_SENSOR_KINDS,
+    COUNTER_SENSOR_PERIODS,
+    EFFICIENCY_METRICS,
+    ROLLING_STATISTICS_ATTRIBUTES,
 )
 from .coordinator import LambdaDataUpdateCoordinator
 from .utils import (
     build_device_info,
-    generate_base_addresses,
-    generate_sensor_names,
     get_firmware_version_int,
-    get_compatible_sensors,
+)
+from .descriptions import (
+    entry_module_counts,
+    register_sensor_descriptions,
+    sensor_names,
 )
 from .const_mapping import HP_ERROR_STATE  # noqa: F401
 from .const_mapping import HP_STATE  # noqa: F401
@@ -76,10 +76,6 @@ async def async_setup_entry(
 
     # Get device counts from config
     num_hps = entry.data.get("num_hps", 1)
-    num_boil = entry.data.get("num_boil", 1)
-    num_buff = entry.data.get("num_buff", 0)
-    num_sol = entry.data.get("num_sol", 0)
-    num_hc = entry.data.get("num_hc", 1)
 
     # Hole den Legacy-Modbus-Namen-Switch aus der Config
     use_legacy_modbus_names = entry.data.get("use_legacy_modbus_names", True)
@@ -92,177 +88,63 @@ async def async_setup_entry(
         fw_version,
     )
 
-    # Create sensors for each device type using a generic loop
-    sensors = []
-
-    TEMPLATES = [
-        ("hp", num_hps, get_compatible_sensors(HP_SENSOR_TEMPLATES, fw_version)),
-        ("boil", num_boil, get_compatible_sensors(BOIL_SENSOR_TEMPLATES, fw_version)),
-        ("buff", num_buff, get_compatible_sensors(BUFF_SENSOR_TEMPLATES, fw_version)),
-        ("sol", num_sol, get_compatible_sensors(SOL_SENSOR_TEMPLATES, fw_version)),
-        ("hc", num_hc, get_compatible_sensors(HC_SENSOR_TEMPLATES, fw_version)),
-    ]
-
-    for prefix, count, template in TEMPLATES:
-        for idx in range(1, count + 1):
-            base_address = generate_base_addresses(prefix, count)[idx]
-            # Always use lowercased name_prefix for all entity_id/unique_id generation
-            name_prefix_lc = name_prefix.lower() if name_prefix else ""
-            for sensor_id, sensor_info in template.items():
-                address = base_address + sensor_info["relative_address"]
-                if coordinator.is_register_disabled(address):
-                    _LOGGER.debug(
-                        "Skipping sensor %s (address %d) because register is disabled",
-                        f"{prefix}{idx}_{sensor_id}",
-                        address,
-                    )
-                    continue
-
-                device_class = sensor_info.get("device_class")
-                if not device_class and sensor_info.get("unit") == "°C":
-                    device_class = SensorDeviceClass.TEMPERATURE
-                elif not device_class and sensor_info.get("unit") == "W":
-                    device_class = SensorDeviceClass.POWER
-                elif not device_class and sensor_info.get("unit") == "Wh":
-                    device_class = SensorDeviceClass.ENERGY
-                elif not device_class and sensor_info.get("unit") == "kWh":
-                    device_class = SensorDeviceClass.ENERGY
-
-                # Prüfe auf Override-Name
-                override_name = None
-                if use_legacy_modbus_names and hasattr(coordinator, "sensor_overrides"):
-                    override_name = coordinator.sensor_overrides.get(
-                        f"{prefix}{idx}_{sensor_id}"
-                    )
-                if override_name:
-                    name = override_name
-                    sensor_id_final = f"{prefix}{idx}_{sensor_id}"
-                    # Data key (original format)
-                    entity_id = f"sensor.{name_prefix_lc}_{override_name}"
-                    unique_id = f"{name_prefix_lc}_{override_name}"
-                else:
-                    prefix_upper = prefix.upper()
-                    device_prefix = f"{prefix}{idx}"
-
-                    if prefix == "hc" and sensor_info.get("device_type") == "Climate":
-                        name = sensor_info["name"].format(idx)
-                    else:
-                        name = f"{prefix_upper}{idx} {sensor_info['name']}"
-
-                    # Verwende die zentrale Namensgenerierung
-                    names = generate_sensor_names(
-                        device_prefix,
-                        sensor_info["name"],
-                        sensor_id,
-                        name_prefix,
-                        use_legacy_modbus_names,
-                    )
-
-                    sensor_id_final = f"{prefix}{idx}_{sensor_id}"
-                    entity_id = names["entity_id"]
-                    unique_id = names["unique_id"]
-
-                device_type = (
-                    prefix.upper()
-                    if prefix
-                    in [
-                        "hp",
-                        "boil",
-                        "hc",
-                        "buff",
-                        "sol",
-                    ]
-                    else sensor_info.get("device_type", "main")
-                )
-
-                sensors.append(
-                    LambdaSensor(
-                        coordinator=coordinator,
-                        entry=entry,
-                        sensor_id=sensor_id_final,
-                        name=name,
-                        unit=sensor_info.get("unit", ""),
-                        address=address,
-                        scale=sensor_info.get("scale", 1.0),
-                        state_class=sensor_info.get("state_class", ""),
-                        device_class=device_class,
-                        relative_address=sensor_info.get("relative_address", 0),
-                        data_type=sensor_info.get("data_type", ""),
-                        device_type=device_type,
-                        txt_mapping=sensor_info.get("txt_mapping", False),
-                        precision=sensor_info.get("precision", None),
-                        entity_id=entity_id,
-                        unique_id=unique_id,
-                        options=sensor_info.get("options", None),
-                        sensor_info=sensor_info,
-                    )
-                )
+    # Beschreibungen sind pro Firmware/Modulanzahl/Namensmodus gecacht
+    descriptions = register_sensor_descriptions(
+        fw_version,
+        entry_module_counts(entry.data),
+        use_legacy_modbus_names,
+        name_prefix,
+    )
+    overrides = (
+        getattr(coordinator, "sensor_overrides", None) or {}
+        if use_legacy_modbus_names
+        else {}
+    )
 
-    # General Sensors (SENSOR_TYPES)
-    for sensor_id, sensor_info in SENSOR_TYPES.items():
-        address = sensor_info["address"]
-        if coordinator.is_register_disabled(address):
+    sensors = []
+    for description in descriptions:
+        if coordinator.is_register_disabled(description.address):
             _LOGGER.debug(
-                "Skipping general sensor %s (address %d) because register is disabled",
-                sensor_id,
-                address,
+                "Skipping sensor %s (address %d) because register is disabled",
+                description.sensor_id,
+                description.address,
             )
             continue
-        device_class = sensor_info.get("device_class")
-        if not device_class and sensor_info.get("unit") == "°C":
-            device_class = SensorDeviceClass.TEMPERATURE
-        elif not device_class and sensor_info.get("unit") == "W":
-            device_class = SensorDeviceClass.POWER
-        elif not device_class and sensor_info.get("unit") == "Wh":
-            device_class = SensorDeviceClass.ENERGY
-        elif not device_class and sensor_info.get("unit") == "kWh":
-            device_class = SensorDeviceClass.ENERGY
-
-        # Name und Entity-ID für General Sensors
-        if use_legacy_modbus_names and "override_name" in sensor_info:
-            name = sensor_info["override_name"]
-            sensor_id_final = sensor_info["override_name"]
-            _LOGGER.info(
-                f"Override name for sensor '{sensor_id}': '{name}' "
-                f"wird als Name und sensor_id verwendet."
-            )
-        else:
-            name = sensor_info["name"]
-            sensor_id_final = sensor_id
-
-        # Verwende die zentrale Namensgenerierung für General Sensors
-        # Für General Sensors ist der sensor_id der device_prefix
-        names = generate_sensor_names(
-            sensor_id,  # device_prefix für General Sensors ist der sensor_id
-            sensor_info["name"],
-            sensor_id_final,  # sensor_id für die Namensgenerierung
-            name_prefix,
-            use_legacy_modbus_names,
-        )
 
-        entity_id = names["entity_id"]
-        unique_id = names["unique_id"]
+        name = description.name
+        entity_id = description.entity_id
+        unique_id = description.unique_id
+        # Prüfe auf Override-Name (lambda_wp_config.yaml)
+        override_name = (
+            overrides.get(description.override_key)
+            if description.override_key
+            else None
+        )
+        if override_name:
+            name = override_name
+            entity_id = f"sensor.{name_prefix}_{override_name}"
+            unique_id = f"{name_prefix}_{override_name}"
 
         sensors.append(
             LambdaSensor(
                 coordinator=coordinator,
                 entry=entry,
-                sensor_id=sensor_id_final,
+                sensor_id=description.sensor_id,
                 name=name,
-                unit=sensor_info.get("unit", ""),
-                address=address,
-                scale=sensor_info.get("scale", 1.0),
-                state_class=sensor_info.get("state_class", ""),
-                device_class=device_class,
-                relative_address=sensor_info.get("address", 0),
-                data_type=sensor_info.get("data_type", ""),
-                device_type=sensor_info.get("device_type", "main"),
-                txt_mapping=sensor_info.get("txt_mapping", False),
-                precision=sensor_info.get("precision", None),
+                unit=description.unit,
+                address=description.address,
+                scale=description.scale,
+                state_class=description.state_class,
+                device_class=description.device_class,
+                relative_address=description.relative_address,
+                data_type=description.data_type,
+                device_type=description.device_type,
+                txt_mapping=description.txt_mapping,
+                precision=description.precision,
                 entity_id=entity_id,
                 unique_id=unique_id,
-                options=sensor_info.get("options", None),
-                sensor_info=sensor_info,
+                options=description.options,
+                sensor_info=description.sensor_info,
             )
         )
 
@@ -276,14 +158,13 @@ async def async_setup_entry(
     ]
     cycling_sensor_count = 0
     cycling_sensor_ids = []
-    cycling_entities = {}  # Dictionary für schnellen Zugriff
 
     for hp_idx in range(1, num_hps + 1):
         for mode, template_id in cycling_modes:
             template = CALCULATED_SENSOR_TEMPLATES[template_id]
             # Entity-ID und unique_id generieren
             device_prefix = f"hp{hp_idx}"
-            names = generate_sensor_names(
+            names = sensor_names(
                 device_prefix,
                 template["name"],
                 template_id,
@@ -295,6 +176,7 @@ async def async_setup_entry(
             cycling_sensor = LambdaCyclingSensor(
                 hass=hass,
                 entry=entry,
+                coordinator=coordinator,
                 sensor_id=template_id,
                 name=names["name"],
                 entity_id=names["entity_id"],
@@ -304,72 +186,101 @@ async def async_setup_entry(
                 device_class=template["device_class"],
                 device_type=template["device_type"],
                 hp_index=hp_idx,
+                mode=mode,
             )
 
             sensors.append(cycling_sensor)
-            cycling_entities[names["entity_id"]] = cycling_sensor
             cycling_sensor_count += 1
 
-    # --- Yesterday Cycling Sensors (echte Entities für Daily-Berechnung) ---
-    yesterday_modes = [
-        ("heating", "heating_cycling_yesterday"),
-        ("hot_water", "hot_water_cycling_yesterday"),
-        ("cooling", "cooling_cycling_yesterday"),
-        ("defrost", "defrost_cycling_yesterday"),
-    ]
-    yesterday_sensor_count = 0
-    yesterday_sensor_ids = []
-
+    # --- Zähler-Sensoren (Cycling/Energie/Laufzeit, total und Perioden) ---
+    counter_sensor_count = 0
     for hp_idx in range(1, num_hps + 1):
-        for mode, template_id in yesterday_modes:
+        for mode, _template_id in cycling_modes:
+            for kind in COUNTER_SENSOR_KINDS:
+                for period in COUNTER_SENSOR_PERIODS:
+                    if kind == "cycling" and period == "total":
+                        continue  # LambdaCyclingSensor
+                    template_id = f"{mode}_{kind}_{period}"
+                    template = CALCULATED_SENSOR_TEMPLATES[template_id]
+                    names = sensor_names(
+                        f"hp{hp_idx}",
+                        template["name"],
+                        template_id,
+                        name_prefix,
+                        use_legacy_modbus_names,
+                    )
+                    sensors.append(
+                        LambdaCounterSensor(
+                            coordinator=coordinator,
+                            entry=entry,
+                            template=template,
+                            name=names["name"],
+                            entity_id=names["entity_id"],
+                            unique_id=names["unique_id"],
+                            hp_index=hp_idx,
+                            mode=mode,
+                            kind=kind,
+                            period=period,
+                        )
+                    )
+                    counter_sensor_count += 1
+
+    # --- COP/JAZ-Sensoren pro Wärmepumpe und für das Gesamtsystem ---
+    for metric, (sensor_id, _name) in EFFICIENCY_METRICS.items():
+        for hp_idx in range(0 if num_hps > 1 else 1, num_hps + 1):
+            if hp_idx:
+                device_prefix, template_id = f"hp{hp_idx}", sensor_id
+            else:
+                device_prefix = template_id = f"system_{sensor_id}"
             template = CALCULATED_SENSOR_TEMPLATES[template_id]
-            # Entity-ID und unique_id generieren
-            device_prefix = f"hp{hp_idx}"
-            names = generate_sensor_names(
+            names = sensor_names(
                 device_prefix,
                 template["name"],
                 template_id,
                 name_prefix,
                 use_legacy_modbus_names,
             )
-            yesterday_sensor_ids.append(names["entity_id"])
+            sensors.append(
+                LambdaEfficiencySensor(
+                    coordinator=coordinator,
+                    entry=entry,
+                    template=template,
+                    name=names["name"],
+                    entity_id=names["entity_id"],
+                    unique_id=names["unique_id"],
+                    hp_index=hp_idx,
+                    metric=metric,
+                )
+            )
 
-            yesterday_sensor = LambdaYesterdaySensor(
-                hass=hass,
+    # --- Taktungs-Sensor pro Wärmepumpe ---
+    template = CALCULATED_SENSOR_TEMPLATES["short_cycles"]
+    for hp_idx in range(1, num_hps + 1):
+        names = sensor_names(
+            f"hp{hp_idx}",
+            template["name"],
+            "short_cycles",
+            name_prefix,
+            use_legacy_modbus_names,
+        )
+        sensors.append(
+            LambdaShortCycleSensor(
+                coordinator=coordinator,
                 entry=entry,
-                sensor_id=template_id,
+                template=template,
                 name=names["name"],
                 entity_id=names["entity_id"],
                 unique_id=names["unique_id"],
-                unit=template["unit"],
-                state_class=template["state_class"],
-                device_class=template["device_class"],
-                device_type=template["device_type"],
                 hp_index=hp_idx,
-                mode=mode,
             )
+        )
 
-            sensors.append(yesterday_sensor)
-            yesterday_sensor_count += 1
-
-    # Speichere die Cycling-Entities für schnellen Zugriff
-    if "lambda_heat_pumps" not in hass.data:
-        hass.data["lambda_heat_pumps"] = {}
-    if entry.entry_id not in hass.data["lambda_heat_pumps"]:
-        hass.data["lambda_heat_pumps"][entry.entry_id] = {}
-    hass.data["lambda_heat_pumps"][entry.entry_id]["cycling_entities"] = (
-        cycling_entities
-    )
     _LOGGER.info(
         "Cycling-Sensoren erzeugt: %d, Entity-IDs: %s",
         cycling_sensor_count,
         cycling_sensor_ids,
     )
-    _LOGGER.info(
-        "Yesterday-Sensoren erzeugt: %d, Entity-IDs: %s",
-        yesterday_sensor_count,
-        yesterday_sensor_ids,
-    )
+    _LOGGER.info("Zähler-Sensoren erzeugt: %d", counter_sensor_count)
 
     _LOGGER.info(
         "Alle Sensoren (inkl. Cycling) erzeugt: %d",
@@ -386,185 +297,154 @@ async def async_setup_entry(
         _LOGGER.error("Error setting up template sensors: %s", e)
 
 
-# --- Entity-Klasse für Cycling Total Sensoren ---
-class LambdaCyclingSensor(RestoreEntity, SensorEntity):
-    """Cycling total sensor (echte Entity, Wert wird von increment_cycling_counter gesetzt)."""
+# --- Entity-Klasse für Zähler-Sensoren (Cycling/Energie/Laufzeit) ---
+class LambdaCounterSensor(CoordinatorEntity[LambdaDataUpdateCoordinator], SensorEntity):
+    """Native counter of a heat pump mode (total or daily/monthly/yearly).
+
+    Die Werte hält der Coordinator, Perioden kommen aus rollups.py.
+    """
+
+    _attr_should_poll = False
 
     def __init__(
         self,
-        hass,
+        coordinator,
         entry,
-        sensor_id,
+        template,
         name,
         entity_id,
         unique_id,
-        unit,
-        state_class,
-        device_class,
-        device_type,
         hp_index,
+        mode,
+        kind,
+        period,
     ):
-        self.hass = hass
+        super().__init__(coordinator)
         self._entry = entry
-        self._sensor_id = sensor_id
-        self._name = name
-        self.entity_id = entity_id
-        self._unique_id = unique_id
-        self._unit = unit
-        self._state_class = state_class
-        self._device_class = device_class
-        self._device_type = device_type
         self._hp_index = hp_index
-        self._attr_has_entity_name = True
-        self._attr_should_poll = False
-        self._attr_native_unit_of_measurement = unit
+        self._mode = mode
+        self._kind = kind
+        self._period = period
+        self.entity_id = entity_id
         self._attr_name = name
         self._attr_unique_id = unique_id
-        # Initialisiere cycling_value mit 0
-        self._cycling_value = 0
-        # Yesterday-Wert für Daily-Berechnung
-        self._yesterday_value = 0
-        # Signal-Unsubscribe-Funktion
-        self._unsub_dispatcher = None
-
-        if state_class == "total_increasing":
-            self._attr_state_class = SensorStateClass.TOTAL_INCREASING
-        elif state_class == "total":
-            self._attr_state_class = SensorStateClass.TOTAL
-        elif state_class == "measurement":
-            self._attr_state_class = SensorStateClass.MEASUREMENT
-        else:
-            self._attr_state_class = None
-        self._attr_device_class = device_class
-
-    def set_cycling_value(self, value):
-        """Set the cycling value and update state."""
-        self._cycling_value = int(value)  # Stelle sicher, dass es ein Integer ist
-        # Stelle sicher, dass der State korrekt aktualisiert wird
-        self.async_write_ha_state()
-        _LOGGER.debug(f"Cycling sensor {self.entity_id} value set to {value}")
-
-    def update_yesterday_value(self):
-        """Update yesterday value with current total value (called at midnight)."""
-        old_yesterday = self._yesterday_value
-        self._yesterday_value = self._cycling_value
-        _LOGGER.info(
-            f"Yesterday value updated for {self.entity_id}: {old_yesterday} -> {self._yesterday_value}"
+        self._attr_native_unit_of_measurement = template["unit"]
+        self._attr_suggested_display_precision = template["precision"]
+        self._attr_device_class = template["device_class"]
+        self._attr_state_class = (
+            SensorStateClass.TOTAL_INCREASING
+            if period == "total"
+            else SensorStateClass.TOTAL
         )
 
-    async def async_added_to_hass(self):
-        """Initialize the sensor when added to Home Assistant."""
-        await super().async_added_to_hass()
-
-        # RestoreEntity provides async_get_last_state() method
-        last_state = await self.async_get_last_state()
-        await self.restore_state(last_state)
-
-        # Registriere Signal-Handler für Yesterday-Update
-        from .automations import SIGNAL_UPDATE_YESTERDAY  # noqa: F401
+    @property
+    def device_info(self):
+        return build_device_info(self._entry)
 
-        self._unsub_dispatcher = async_dispatcher_connect(
-            self.hass, SIGNAL_UPDATE_YESTERDAY, self._handle_yesterday_update
+    @property
+    def native_value(self) -> float:
+        value = self.coordinator.get_counter(
+            self._kind, self._hp_index, self._mode, self._period
         )
+        if self._kind == "runtime":
+            return round(value / 3600, 4)  # Sekunden -> Stunden
+        if self._kind in ("energy", "electrical_energy"):
+            return round(value, 3)
+        return int(value)
 
-        # Schreibe den State sofort ins UI
-        self.async_write_ha_state()
+    @property
+    def extra_state_attributes(self) -> dict | None:
+        # Modulations-Perzentile des Tages an der Tageslaufzeit
+        if self._kind != "runtime" or self._period != "daily":
+            return None
+        return self.coordinator.get_modulation_percentiles(
+            self._hp_index, self._mode
+        )
 
-    async def async_will_remove_from_hass(self):
-        """Clean up when entity is removed."""
-        if self._unsub_dispatcher:
-            self._unsub_dispatcher()
-            self._unsub_dispatcher = None
-        await super().async_will_remove_from_hass()
 
-    async def restore_state(self, last_state):
-        """Restore state from database to prevent reset on reload."""
-        if last_state is not None:
-            try:
-                # Lade den letzten Wert aus der Datenbank
-                last_value = last_state.state
-                if last_value not in (None, "unknown", "unavailable"):
-                    self._cycling_value = int(float(last_value))
-                    _LOGGER.info(
-                        f"Cycling sensor {self.entity_id} restored from database: {self._cycling_value}"
-                    )
-                else:
-                    # Fallback auf 0 nur wenn wirklich kein Wert in der DB
-                    self._cycling_value = 0
-                    _LOGGER.info(
-                        f"Cycling sensor {self.entity_id} initialized with 0 (no previous state)"
-                    )
-            except (ValueError, TypeError) as e:
-                _LOGGER.warning(
-                    f"Could not restore state for {self.entity_id}: {e}, using 0"
-                )
-                self._cycling_value = 0
-        else:
-            # Kein vorheriger State vorhanden, initialisiere mit 0
-            self._cycling_value = 0
-            _LOGGER.info(
-                f"Cycling sensor {self.entity_id} initialized with 0 (no previous state)"
-            )
+# --- Entity-Klasse für COP/JAZ ---
+class LambdaEfficiencySensor(
+    CoordinatorEntity[LambdaDataUpdateCoordinator], SensorEntity
+):
+    """COP (lifetime or rolling window) or JAZ of a heat pump or the system."""
 
-        # Stelle sicher, dass der Wert ein Integer ist
-        self._cycling_value = int(self._cycling_value)
+    _attr_should_poll = False
+    _attr_state_class = SensorStateClass.MEASUREMENT
 
-    @callback
-    def _handle_yesterday_update(self, entry_id: str):
-        """Handle yesterday update signal."""
-        if entry_id == self._entry.entry_id:
-            self.update_yesterday_value()
+    def __init__(
+        self,
+        coordinator,
+        entry,
+        template,
+        name,
+        entity_id,
+        unique_id,
+        hp_index,
+        metric,
+    ):
+        super().__init__(coordinator)
+        self._entry = entry
+        self._hp_index = hp_index  # 0 = Gesamtsystem
+        self._metric = metric
+        self.entity_id = entity_id
+        self._attr_name = name
+        self._attr_unique_id = unique_id
+        self._attr_suggested_display_precision = template["precision"]
 
     @property
-    def name(self):
-        return self._name
+    def device_info(self):
+        return build_device_info(self._entry)
 
     @property
-    def unique_id(self):
-        return self._unique_id
+    def native_value(self) -> float | None:
+        value = self.coordinator.get_efficiency(self._hp_index, self._metric)
+        return round(value, 2) if value is not None else None
 
-    @property
-    def native_unit_of_measurement(self):
-        return self._unit
 
-    @property
-    def state_class(self):
-        return self._attr_state_class
+# --- Entity-Klasse für die Taktungs-Erkennung ---
+class LambdaShortCycleSensor(
+    CoordinatorEntity[LambdaDataUpdateCoordinator], SensorEntity
+):
+    """Number of short compressor runs of a heat pump in the last 24 h."""
 
-    @property
-    def device_class(self):
-        return self._attr_device_class
+    _attr_should_poll = False
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(
+        self, coordinator, entry, template, name, entity_id, unique_id, hp_index
+    ):
+        super().__init__(coordinator)
+        self._entry = entry
+        self._hp_index = hp_index
+        self.entity_id = entity_id
+        self._attr_name = name
+        self._attr_unique_id = unique_id
+        self._attr_native_unit_of_measurement = template["unit"]
+        self._attr_suggested_display_precision = template["precision"]
 
     @property
     def device_info(self):
         return build_device_info(self._entry)
 
     @property
-    def native_value(self):
-        """Return the current cycling value."""
-        # Wert aus Attribut, Standard 0
-        value = getattr(self, "_cycling_value", 0)
-        if value is None:
-            value = 0
-        return int(value)  # Stelle sicher, dass es ein Integer ist
+    def native_value(self) -> int:
+        return self.coordinator.get_short_cycles(self._hp_index)
 
     @property
-    def extra_state_attributes(self):
-        """Return extra state attributes."""
-        return {
-            "yesterday_value": self._yesterday_value,
-            "hp_index": self._hp_index,
-            "sensor_type": "cycling_total",
-        }
+    def extra_state_attributes(self) -> dict:
+        # min_runtime / last_runtime in Sekunden
+        return self.coordinator.get_short_cycle_attributes(self._hp_index)
 
 
-class LambdaYesterdaySensor(RestoreEntity, SensorEntity):
-    """Yesterday cycling sensor (speichert Total-Werte für Daily-Berechnung)."""
+# --- Entity-Klasse für Cycling Total Sensoren ---
+class LambdaCyclingSensor(RestoreEntity, SensorEntity):
+    """Cycling total sensor (echte Entity, Zählerstand hält der Coordinator)."""
 
     def __init__(
         self,
         hass,
         entry,
+        coordinator,
         sensor_id,
         name,
         entity_id,
@@ -578,6 +458,8 @@ class LambdaYesterdaySensor(RestoreEntity, SensorEntity):
     ):
         self.hass = hass
         self._entry = entry
+        self._coordinator = coordinator
+        self._mode = mode
         self._sensor_id = sensor_id
         self._name = name
         self.entity_id = entity_id
@@ -587,16 +469,11 @@ class LambdaYesterdaySensor(RestoreEntity, SensorEntity):
         self._device_class = device_class
         self._device_type = device_type
         self._hp_index = hp_index
-        self._mode = mode
         self._attr_has_entity_name = True
         self._attr_should_poll = False
         self._attr_native_unit_of_measurement = unit
         self._attr_name = name
         self._attr_unique_id = unique_id
-        # Yesterday-Wert (wird von Total-Sensor übernommen)
-        self._yesterday_value = 0
-        # Signal-Unsubscribe-Funktion
-        self._unsub_dispatcher = None
 
         if state_class == "total_increasing":
             self._attr_state_class = SensorStateClass.TOTAL_INCREASING
@@ -608,15 +485,6 @@ class LambdaYesterdaySensor(RestoreEntity, SensorEntity):
             self._attr_state_class = None
         self._attr_device_class = device_class
 
-    def update_yesterday_value(self, total_value):
-        """Update yesterday value with current total value (called at midnight)."""
-        old_yesterday = self._yesterday_value
-        self._yesterday_value = int(total_value)
-        _LOGGER.info(
-            f"Yesterday sensor {self.entity_id} updated: {old_yesterday} -> {self._yesterday_value}"
-        )
-        self.async_write_ha_state()
-
     async def async_added_to_hass(self):
         """Initialize the sensor when added to Home Assistant."""
         await super().async_added_to_hass()
@@ -624,86 +492,30 @@ class LambdaYesterdaySensor(RestoreEntity, SensorEntity):
         # RestoreEntity provides async_get_last_state() method
         last_state = await self.async_get_last_state()
         await self.restore_state(last_state)
-
-        # Registriere Signal-Handler für Yesterday-Update
-        from .automations import SIGNAL_UPDATE_YESTERDAY  # noqa: F401
-
-        self._unsub_dispatcher = async_dispatcher_connect(
-            self.hass, SIGNAL_UPDATE_YESTERDAY, self._handle_yesterday_update
-        )
+        self._coordinator.register_cycling_entity(self._hp_index, self._mode, self)
 
         # Schreibe den State sofort ins UI
         self.async_write_ha_state()
 
     async def async_will_remove_from_hass(self):
         """Clean up when entity is removed."""
-        if self._unsub_dispatcher:
-            self._unsub_dispatcher()
-            self._unsub_dispatcher = None
+        self._coordinator.unregister_cycling_entity(self._hp_index, self._mode)
         await super().async_will_remove_from_hass()
 
     async def restore_state(self, last_state):
-        """Restore state from database to prevent reset on reload."""
-        if last_state is not None:
-            try:
-                # Lade den letzten Wert aus der Datenbank
-                last_value = last_state.state
-                if last_value not in (None, "unknown", "unavailable"):
-                    self._yesterday_value = int(float(last_value))
-                    _LOGGER.info(
-                        f"Yesterday sensor {self.entity_id} restored from database: {self._yesterday_value}"
-                    )
-                else:
-                    # Fallback auf 0 nur wenn wirklich kein Wert in der DB
-                    self._yesterday_value = 0
-                    _LOGGER.info(
-                        f"Yesterday sensor {self.entity_id} initialized with 0 (no previous state)"
-                    )
-            except (ValueError, TypeError) as e:
-                _LOGGER.warning(
-                    f"Could not restore state for {self.entity_id}: {e}, using 0"
-                )
-                self._yesterday_value = 0
-        else:
-            # Kein vorheriger State vorhanden, initialisiere mit 0
-            self._yesterday_value = 0
-            _LOGGER.info(
-                f"Yesterday sensor {self.entity_id} initialized with 0 (no previous state)"
-            )
-
-        # Stelle sicher, dass der Wert ein Integer ist
-        self._yesterday_value = int(self._yesterday_value)
+        """Restore state from database to prevent reset on reload.
 
-    @callback
-    def _handle_yesterday_update(self, entry_id: str):
-        """Handle yesterday update signal."""
-        if entry_id == self._entry.entry_id:
-            # Hole den aktuellen Total-Wert vom entsprechenden Total-Sensor
-            total_sensor_id = f"{self._mode}_cycling_total"
-            device_prefix = f"hp{self._hp_index}"
-            names = generate_sensor_names(
-                device_prefix,
-                CALCULATED_SENSOR_TEMPLATES[total_sensor_id]["name"],
-                total_sensor_id,
-                self._entry.data.get("name", "").lower().replace(" ", ""),
-                self._entry.data.get("use_legacy_modbus_names", True),
-            )
-            total_entity_id = names["entity_id"]
-
-            # Hole den aktuellen Wert vom Total-Sensor
-            total_state = self.hass.states.get(total_entity_id)
-            if total_state and total_state.state not in (
-                None,
-                "unknown",
-                "unavailable",
-            ):
-                try:
-                    total_value = int(float(total_state.state))
-                    self.update_yesterday_value(total_value)
-                except (ValueError, TypeError):
-                    _LOGGER.warning(
-                        f"Could not parse total value from {total_entity_id}: {total_state.state}"
-                    )
+        Der Zählerstand liegt im Coordinator-Store; der letzte Entity-State
+        wird nur übernommen, solange dort noch kein Wert existiert (Migration).
+        """
+        if last_state is None or last_state.state in (None, "unknown", "unavailable"):
+            return
+        try:
+            restored = int(float(last_state.state))
+        except (ValueError, TypeError) as e:
+            _LOGGER.warning(f"Could not restore state for {self.entity_id}: {e}")
+            return
+        self._coordinator.seed_cycling_total(self._hp_index, self._mode, restored)
 
     @property
     def name(self):
@@ -727,24 +539,19 @@ class LambdaYesterdaySensor(RestoreEntity, SensorEntity):
 
     @property
     def device_info(self):
-        """Return device info."""
         return build_device_info(self._entry)
 
     @property
     def native_value(self):
-        """Return the yesterday value."""
-        value = getattr(self, "_yesterday_value", 0)
-        if value is None:
-            value = 0
-        return int(value)
+        """Return the current cycling value."""
+        return self._coordinator.get_cycling_total(self._hp_index, self._mode)
 
     @property
     def extra_state_attributes(self):
         """Return extra state attributes."""
         return {
-            "mode": self._mode,
             "hp_index": self._hp_index,
-            "sensor_type": "cycling_yesterday",
+            "sensor_type": "cycling_total",
         }
 
 
@@ -753,6 +560,8 @@ class LambdaSensor(CoordinatorEntity[LambdaDataUpdateCoordinator], SensorEntity)
 
     _attr_has_entity_name = True
     _attr_should_poll = False
+    # Gleitende Statistiken lassen sich jederzeit neu bilden
+    _unrecorded_attributes = ROLLING_STATISTICS_ATTRIBUTES
 
     def __init__(
         self,
@@ -794,6 +603,8 @@ class LambdaSensor(CoordinatorEntity[LambdaDataUpdateCoordinator], SensorEntity)
         self._options = options
         self._sensor_info = sensor_info or {}
         self._entity_enabled = False  # Track if entity is enabled
+        self._last_available = None
+        self._last_rolling_revision = None
 
         # Debug log sensor creation with register option
         if sensor_info and sensor_info.get("options", {}).get("register", False):
@@ -858,6 +669,27 @@ class LambdaSensor(CoordinatorEntity[LambdaDataUpdateCoordinator], SensorEntity)
         """Only poll if the entity is enabled and added to HA."""
         return self._entity_enabled
 
+    @property
+    def input_keys(self) -> tuple[str, ...]:
+        """coordinator.data keys the state of this sensor depends on."""
+        return (self._sensor_id,)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only on input, availability or statistics changes."""
+        available = self.available
+        rolling = self.coordinator.rolling
+        revision = rolling.revision if self._sensor_id in rolling else None
+        if (
+            available == self._last_available
+            and revision == self._last_rolling_revision
+            and not self.coordinator.data_changed(self.input_keys)
+        ):
+            return
+        self._last_available = available
+        self._last_rolling_revision = revision
+        self.async_write_ha_state()
+
     async def async_added_to_hass(self):
         """Setup polling when entity is enabled and added to HA."""
         await super().async_added_to_hass()
@@ -1073,6 +905,9 @@ class LambdaSensor(CoordinatorEntity[LambdaDataUpdateCoordinator], SensorEntity)
                         "Error getting state mapping for %s: %s", mapping_name, e
                     )
 
+        # min/max/mean/std über 1h und 24h (rolling.py)
+        attrs.update(self.coordinator.get_rolling_statistics(self._sensor_id))
+
         _LOGGER.debug("Final attributes for %s: %s", self._sensor_id, attrs)
         return attrs
 
@@ -1117,6 +952,8 @@ class LambdaTemplateSensor(CoordinatorEntity, SensorEntity):
         self._entity_id = entity_id
         self._unique_id = unique_id
         self._template_str = template_str
+        self._template = None  # einmal kompiliert in async_added_to_hass
+        self._last_available = None
         self._state = None
         _LOGGER.info(
             f"Template-Sensor erstellt: {self._name} (ID: {self._sensor_id}) mit Template: {self._template_str}"
@@ -1170,15 +1007,14 @@ class LambdaTemplateSensor(CoordinatorEntity, SensorEntity):
         return build_device_info(self._entry)
 
     @callback
-    def handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
+    def handle_template_result(self, rendered_value) -> None:
+        """Store a rendered template result (called when an input changed)."""
         try:
-            template = Template(self._template_str, self.hass)
-            rendered_value = template.async_render()
+            if isinstance(rendered_value, TemplateError):
+                raise rendered_value
             if rendered_value is None or rendered_value == "unavailable":
                 self._state = None
-                return
-            if isinstance(rendered_value, str) and (
+            elif isinstance(rendered_value, str) and (
                 rendered_value.startswith("{{") or "states(" in rendered_value
             ):
                 _LOGGER.debug(
@@ -1186,23 +1022,28 @@ class LambdaTemplateSensor(CoordinatorEntity, SensorEntity):
                     self._sensor_id,
                 )
                 self._state = None
-                return
-            try:
-                float_value = float(rendered_value)
-                if self._precision is not None and isinstance(self._precision, int):
-                    self._state = round(float_value, self._precision)
-                else:
-                    self._state = float_value
-                _LOGGER.info(
-                    f"Template-Sensor berechnet: {self._name} (ID: {self._sensor_id}) = {self._state}"
-                )
-            except (ValueError, TypeError):
-                _LOGGER.warning(
-                    "Could not convert template result to float for sensor %s: %s",
-                    self._sensor_id,
-                    rendered_value,
-                )
-                self._state = None
+            else:
+                try:
+                    float_value = float(rendered_value)
+                    if self._precision is not None and isinstance(
+                        self._precision, int
+                    ):
+                        self._state = round(float_value, self._precision)
+                    else:
+                        self._state = float_value
+                    _LOGGER.debug(
+                        "Template-Sensor berechnet: %s (ID: %s) = %s",
+                        self._name,
+                        self._sensor_id,
+                        self._state,
+                    )
+                except (ValueError, TypeError):
+                    _LOGGER.warning(
+                        "Could not convert template result to float for sensor %s: %s",
+                        self._sensor_id,
+                        rendered_value,
+                    )
+                    self._state = None
         except TemplateError as err:
             _LOGGER.warning("Template error for sensor %s: %s", self._sensor_id, err)
             self._state = None
@@ -1213,11 +1054,29 @@ class LambdaTemplateSensor(CoordinatorEntity, SensorEntity):
             self._state = None
         self.async_write_ha_state()
 
+    @callback
+    def _async_template_updated(self, event, updates) -> None:
+        self.handle_template_result(updates[-1].result)
+
     def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator (for testing)."""
-        self.handle_coordinator_update()
+        """Handle updated data from the coordinator.
+
+        The template is not rendered here; async_track_template_result
+        re-renders it when one of the entities it references changes.
+        """
+        if self.available != self._last_available:
+            self._last_available = self.available
+            self.async_write_ha_state()
 
     async def async_added_to_hass(self) -> None:
         """When entity is added to hass."""
         await super().async_added_to_hass()
-        self.handle_coordinator_update()
+        self._last_available = self.available
+        self._template = Template(self._template_str, self.hass)
+        tracker = async_track_template_result(
+            self.hass,
+            [TrackTemplate(self._template, None)],
+            self._async_template_updated,
+        )
+        self.async_on_remove(tracker.async_remove)
+        tracker.async_refresh()
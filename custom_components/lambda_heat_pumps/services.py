@@ -1,23 +1,28 @@
 """Services for Lambda WP integration."""
 
 from __future__ import annotations
+import asyncio
 import logging
 from datetime import timedelta
 
 import voluptuous as vol
 
-from homeassistant.core import HomeAssistant, ServiceCall, callback
+from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse, callback
 from homeassistant.helpers import config_validation as cv
 from homeassistant.const import ATTR_ENTITY_ID
 from homeassistant.helpers.event import async_track_time_interval
+import homeassistant.util.dt as dt_util
 
 from .const import (
     DOMAIN,
     CONF_ROOM_TEMPERATURE_ENTITY,
     DEFAULT_WRITE_INTERVAL,
+    DEFAULT_SERVICE_ENTRY_TIMEOUT,
     CONF_PV_POWER_SENSOR_ENTITY,
+    OPERATING_STATE_TRANSITIONS,
+    MODULATION_BIN_WIDTH,
 )
-from .modbus_utils import async_read_holding_registers, async_write_registers
+from .utils import to_register_values, to_signed_16bit
 
 # Konstanten für Zustandsarten definieren
 STATE_UNAVAILABLE = "unavailable"
@@ -56,10 +61,114 @@ WRITE_MODBUS_REGISTER_SCHEMA = vol.Schema(
     }
 )
 
+# Service Schema für get_sessions
+GET_SESSIONS_SCHEMA = vol.Schema(
+    {
+        vol.Optional("start"): cv.datetime,
+        vol.Optional("end"): cv.datetime,
+        vol.Optional("mode"): vol.In(list(OPERATING_STATE_TRANSITIONS["hp"]["modes"])),
+        vol.Optional("hp_index"): vol.All(vol.Coerce(int), vol.Range(min=1)),
+    }
+)
+
+# Service Schema für get_modulation_histogram
+GET_MODULATION_HISTOGRAM_SCHEMA = vol.Schema(
+    {
+        vol.Optional("mode"): vol.In(list(OPERATING_STATE_TRANSITIONS["hp"]["modes"])),
+        vol.Optional("hp_index"): vol.All(vol.Coerce(int), vol.Range(min=1)),
+    }
+)
+
+
+async def _write_and_verify_register(
+    coordinator,
+    register_address: int,
+    raw_value: int,
+    data_key: str | None = None,
+    scale: float = 1,
+) -> int:
+    """Write one 16 bit register and return the value confirmed by the device.
+
+    The confirmed value is stored in coordinator.data under ``data_key`` so
+    entities show it without waiting for the next poll.
+    """
+    confirmed = (
+        await coordinator.async_write_and_verify(
+            register_address, to_register_values(raw_value, "int16")
+        )
+    )[0]
+    if confirmed != raw_value & 0xFFFF:
+        _LOGGER.warning(
+            "Register %s: wrote %s but device reports %s",
+            register_address,
+            raw_value,
+            confirmed,
+        )
+    if data_key:
+        coordinator.async_set_data_value(
+            coordinator.get_data_key(data_key), to_signed_16bit(confirmed) * scale
+        )
+    return confirmed
+
+
+async def _async_run_for_entries(
+    hass: HomeAssistant, entry_func, *args
+) -> dict[str, dict]:
+    """Run ``entry_func(hass, entry_id, entry_data, *args)`` for all entries.
+
+    The entries are processed concurrently, each one limited to
+    DEFAULT_SERVICE_ENTRY_TIMEOUT seconds. An error or timeout of one
+    controller does not affect the others.
+
+    Returns:
+        dict[str, dict]: Result per entry_id, always containing ``status``
+        ("ok", "skipped", "error" or "timeout").
+    """
+    lambda_entries = hass.data.get(DOMAIN, {})
+    entry_ids = list(lambda_entries)
+    results = await asyncio.gather(
+        *(
+            asyncio.wait_for(
+                entry_func(hass, entry_id, lambda_entries[entry_id], *args),
+                DEFAULT_SERVICE_ENTRY_TIMEOUT,
+            )
+            for entry_id in entry_ids
+        ),
+        return_exceptions=True,
+    )
+
+    response = {}
+    for entry_id, result in zip(entry_ids, results):
+        if isinstance(result, asyncio.TimeoutError):
+            _LOGGER.error(
+                "Timeout after %ss for entry_id %s",
+                DEFAULT_SERVICE_ENTRY_TIMEOUT,
+                entry_id,
+            )
+            response[entry_id] = {"status": "timeout"}
+        elif isinstance(result, Exception):
+            _LOGGER.error("Error for entry_id %s: %s", entry_id, result)
+            response[entry_id] = {"status": "error", "error": str(result)}
+        else:
+            response[entry_id] = result
+    return response
+
+
+def _get_connected_coordinator(entry_id: str, entry_data: dict):
+    """Return the coordinator of an entry if its Modbus client is available."""
+    coordinator = entry_data.get("coordinator")
+    if not coordinator or not coordinator.client:
+        _LOGGER.error(
+            "Coordinator or Modbus client not available for entry_id %s",
+            entry_id,
+        )
+        return None
+    return coordinator
+
 
 async def _handle_update_room_temperature(
     hass: HomeAssistant, call: ServiceCall
-) -> None:
+) -> dict:
     """Handle room temperature update service call."""
     # Hole alle Lambda-Integrationen
     lambda_entries = hass.data.get(DOMAIN, {})
@@ -71,7 +180,7 @@ async def _handle_update_room_temperature(
         _LOGGER.error(
             "No Lambda WP integrations found",
         )
-        return
+        return {"error": "No Lambda WP integrations found"}
 
     # Optional spezifisches Entity_ID zur Einschränkung
     target_entity_id = call.data.get(ATTR_ENTITY_ID)
@@ -80,15 +189,14 @@ async def _handle_update_room_temperature(
         target_entity_id,
     )
 
-    for entry_id, entry_data in lambda_entries.items():
-        await _process_room_temperature_entry(
-            hass, entry_id, entry_data, target_entity_id
-        )
+    return await _async_run_for_entries(
+        hass, _process_room_temperature_entry, target_entity_id
+    )
 
 
 async def _process_room_temperature_entry(
     hass: HomeAssistant, entry_id: str, entry_data: dict, target_entity_id: str
-) -> None:
+) -> dict:
     """Process room temperature update for a specific entry."""
     config_entry = hass.config_entries.async_get_entry(entry_id)
     if not config_entry or not config_entry.options:
@@ -96,7 +204,7 @@ async def _process_room_temperature_entry(
             "No config entry or options for entry_id %s",
             entry_id,
         )
-        return
+        return {"status": "skipped", "reason": "no options"}
 
     _LOGGER.debug(
         "[Service] Options for entry_id %s: %s",
@@ -110,7 +218,7 @@ async def _process_room_temperature_entry(
             "Room thermostat control not enabled for entry_id %s",
             entry_id,
         )
-        return
+        return {"status": "skipped", "reason": "room thermostat control disabled"}
 
     # Anzahl Heizkreise ermitteln
     num_hc = config_entry.data.get("num_hc", 1)
@@ -127,22 +235,25 @@ async def _process_room_temperature_entry(
             "Skipping entry_id %s due to ATTR_ENTITY_ID filter",
             entry_id,
         )
-        return
+        return {"status": "skipped", "reason": "filtered"}
 
     # Hole Coordinator für gemeinsame Nutzung
-    coordinator = entry_data.get("coordinator")
-    if not coordinator or not coordinator.client:
-        _LOGGER.error(
-            "Coordinator or Modbus client not available for entry_id %s",
-            entry_id,
-        )
-        return
+    coordinator = _get_connected_coordinator(entry_id, entry_data)
+    if not coordinator:
+        return {"status": "error", "error": "Modbus client not available"}
 
-    # Für jeden Heizkreis prüfen und aktualisieren
+    # Für jeden Heizkreis prüfen und aktualisieren (nacheinander, eine Verbindung)
+    heating_circuits = {}
     for hc_idx in range(1, num_hc + 1):
-        await _update_heating_circuit_temperature(
+        heating_circuits[hc_idx] = await _update_heating_circuit_temperature(
             hass, config_entry, coordinator, hc_idx, entry_id, entry_data
         )
+    status = (
+        "ok"
+        if all(hc["status"] != "error" for hc in heating_circuits.values())
+        else "error"
+    )
+    return {"status": status, "heating_circuits": heating_circuits}
 
 
 async def _update_heating_circuit_temperature(
@@ -152,7 +263,7 @@ async def _update_heating_circuit_temperature(
     hc_idx: int,
     entry_id: str,
     entry_data: dict,
-) -> None:
+) -> dict:
     """Update temperature for a specific heating circuit."""
     entity_key = CONF_ROOM_TEMPERATURE_ENTITY.format(hc_idx)
     room_temp_entity_id = config_entry.options.get(entity_key)
@@ -169,7 +280,7 @@ async def _update_heating_circuit_temperature(
             hc_idx,
             entry_id,
         )
-        return
+        return {"status": "error", "error": "no room temperature entity"}
 
     # Holen der Temperatur vom Sensor
     state = hass.states.get(room_temp_entity_id)
@@ -191,7 +302,7 @@ async def _update_heating_circuit_temperature(
             hc_idx,
             state.state if state else None,
         )
-        return
+        return {"status": "skipped", "reason": "room temperature unavailable"}
 
     try:
         temperature = float(state.state)
@@ -209,18 +320,14 @@ async def _update_heating_circuit_temperature(
             entry_id,
         )
 
-        result = await async_write_registers(
-            coordinator.client,
+        confirmed = await _write_and_verify_register(
+            coordinator,
             register_address,
-            [raw_value],
-            entry_data.get("slave_id", 1),
+            raw_value,
+            f"hc{hc_idx}_room_device_temperature",
+            0.1,
         )
-
-        if result.isError():
-            _LOGGER.error(
-                "Failed to write room temperature: %s",
-                result,
-            )
+        return {"status": "ok", "value": to_signed_16bit(confirmed) * 0.1}
 
     except (ValueError, TypeError) as ex:
         _LOGGER.error(
@@ -229,12 +336,14 @@ async def _update_heating_circuit_temperature(
             hc_idx,
             ex,
         )
+        return {"status": "error", "error": str(ex)}
     except Exception as ex:
         _LOGGER.error(
             "Error updating room temperature for heating circuit %s: %s",
             hc_idx,
             ex,
         )
+        return {"status": "error", "error": str(ex)}
 
 
 async def _handle_read_modbus_register(hass: HomeAssistant, call: ServiceCall) -> dict:
@@ -258,11 +367,7 @@ async def _handle_read_modbus_register(hass: HomeAssistant, call: ServiceCall) -
             continue
 
         try:
-            result = await async_read_holding_registers(
-                coordinator.client,
-                register_address,
-                1,
-            )
+            result = await coordinator.async_read_registers(register_address, 1)
             if result.isError():
                 _LOGGER.error(
                     "Failed to read Modbus register: %s",
@@ -286,7 +391,7 @@ async def _handle_read_modbus_register(hass: HomeAssistant, call: ServiceCall) -
     return {"error": "No valid coordinator found"}
 
 
-async def _handle_write_modbus_register(hass: HomeAssistant, call: ServiceCall) -> None:
+async def _handle_write_modbus_register(hass: HomeAssistant, call: ServiceCall) -> dict:
     """Handle write Modbus register service call."""
     register_address = call.data.get("register_address")
     value = call.data.get("value")
@@ -300,43 +405,45 @@ async def _handle_write_modbus_register(hass: HomeAssistant, call: ServiceCall)
     lambda_entries = hass.data.get(DOMAIN, {})
     if not lambda_entries:
         _LOGGER.error("No Lambda WP integrations found")
-        return
+        return {"error": "No Lambda WP integrations found"}
 
-    for entry_id, entry_data in lambda_entries.items():
-        coordinator = entry_data.get("coordinator")
-        if not coordinator or not coordinator.client:
-            _LOGGER.error(
-                "Coordinator or Modbus client not available for entry_id %s",
-                entry_id,
-            )
-            continue
+    return await _async_run_for_entries(
+        hass, _write_modbus_register_for_entry, register_address, value
+    )
 
-        try:
-            result = await async_write_registers(
-                coordinator.client,
-                register_address,
-                [value],
-                entry_data.get("slave_id", 1),
-            )
-            if result.isError():
-                _LOGGER.error(
-                    "Failed to write Modbus register: %s",
-                    result,
-                )
-            else:
-                _LOGGER.info(
-                    "Wrote Modbus register %s with value %s",
-                    register_address,
-                    value,
-                )
-        except Exception as ex:
-            _LOGGER.error(
-                "Error writing Modbus register: %s",
-                ex,
-            )
 
+async def _write_modbus_register_for_entry(
+    hass: HomeAssistant,
+    entry_id: str,
+    entry_data: dict,
+    register_address: int,
+    value: int,
+) -> dict:
+    """Write a Modbus register of a specific entry."""
+    coordinator = _get_connected_coordinator(entry_id, entry_data)
+    if not coordinator:
+        return {"status": "error", "error": "Modbus client not available"}
+
+    try:
+        confirmed = await _write_and_verify_register(
+            coordinator, register_address, value
+        )
+        _LOGGER.info(
+            "Wrote Modbus register %s with value %s (confirmed: %s)",
+            register_address,
+            value,
+            confirmed,
+        )
+        return {"status": "ok", "value": confirmed}
+    except Exception as ex:
+        _LOGGER.error(
+            "Error writing Modbus register: %s",
+            ex,
+        )
+        return {"status": "error", "error": str(ex)}
 
-async def _handle_write_room_and_pv(hass: HomeAssistant) -> None:
+
+async def _handle_write_room_and_pv(hass: HomeAssistant) -> dict:
     """
     Write room temperature and PV surplus to Modbus registers
     for all entries.
@@ -344,27 +451,22 @@ async def _handle_write_room_and_pv(hass: HomeAssistant) -> None:
     lambda_entries = hass.data.get(DOMAIN, {})
     if not lambda_entries:
         _LOGGER.debug("No Lambda WP integrations found yet, skipping write operation")
-        return
+        return {}
 
-    for entry_id, entry_data in lambda_entries.items():
-        await _write_room_and_pv_for_entry(hass, entry_id, entry_data)
+    return await _async_run_for_entries(hass, _write_room_and_pv_for_entry)
 
 
 async def _write_room_and_pv_for_entry(
     hass: HomeAssistant, entry_id: str, entry_data: dict
-) -> None:
+) -> dict:
     """Write room temperature and PV surplus for a specific entry."""
     config_entry = hass.config_entries.async_get_entry(entry_id)
     if not config_entry or not config_entry.options:
-        return
+        return {"status": "skipped", "reason": "no options"}
 
-    coordinator = entry_data.get("coordinator")
-    if not coordinator or not coordinator.client:
-        _LOGGER.error(
-            "Coordinator or Modbus client not available for entry_id %s",
-            entry_id,
-        )
-        return
+    coordinator = _get_connected_coordinator(entry_id, entry_data)
+    if not coordinator:
+        return {"status": "error", "error": "Modbus client not available"}
 
     # Raumthermostat schreiben
     if config_entry.options.get("room_thermostat_control", False):
@@ -376,6 +478,8 @@ async def _write_room_and_pv_for_entry(
     if config_entry.options.get("pv_surplus", False):
         await _write_pv_surplus(hass, config_entry, coordinator, entry_id, entry_data)
 
+    return {"status": "ok"}
+
 
 async def _write_room_temperatures(
     hass: HomeAssistant, config_entry, coordinator, entry_id: str, entry_data: dict
@@ -404,11 +508,12 @@ async def _write_room_temperatures(
                 temperature,
                 hc_idx,
             )
-            await async_write_registers(
-                coordinator.client,
+            await _write_and_verify_register(
+                coordinator,
                 register_address,
-                [raw_value],
-                entry_data.get("slave_id", 1),
+                raw_value,
+                f"hc{hc_idx}_room_device_temperature",
+                0.1,
             )
         except Exception as ex:
             _LOGGER.error(
@@ -462,16 +567,67 @@ async def _write_pv_surplus(
             write_type,
         )
 
-        await async_write_registers(
-            coordinator.client,
+        await _write_and_verify_register(
+            coordinator,
             102,  # register_address for PV surplus
-            [raw_value],
-            entry_data.get("slave_id", 1),
+            raw_value,
+            "emgr_actual_power",
         )
     except Exception as ex:
         _LOGGER.error("Error writing PV surplus: %s", ex)
 
 
+async def _get_entry_sessions(
+    hass: HomeAssistant, entry_id: str, entry_data: dict, query: dict
+) -> dict:
+    """Return the compressor sessions of one entry matching ``query``."""
+    coordinator = entry_data.get("coordinator")
+    if coordinator is None:
+        return {"status": "skipped"}
+    return {"status": "ok", "sessions": coordinator.get_sessions(**query)}
+
+
+async def _handle_get_sessions(hass: HomeAssistant, call: ServiceCall) -> dict:
+    """Handle get_sessions service call (no Modbus access)."""
+    query = {}
+    for key in ("start", "end"):
+        if call.data.get(key) is not None:
+            # Zeiten ohne Zeitzone gelten als lokale Zeit
+            query[key] = dt_util.as_utc(call.data[key])
+    for key in ("mode", "hp_index"):
+        if call.data.get(key) is not None:
+            query[key] = call.data[key]
+    return {"entries": await _async_run_for_entries(hass, _get_entry_sessions, query)}
+
+
+async def _get_entry_modulation(
+    hass: HomeAssistant, entry_id: str, entry_data: dict, query: dict
+) -> dict:
+    """Return the modulation histograms of one entry matching ``query``."""
+    coordinator = entry_data.get("coordinator")
+    if coordinator is None:
+        return {"status": "skipped"}
+    return {
+        "status": "ok",
+        "histograms": coordinator.get_modulation_histograms(**query),
+    }
+
+
+async def _handle_get_modulation_histogram(
+    hass: HomeAssistant, call: ServiceCall
+) -> dict:
+    """Handle get_modulation_histogram service call (no Modbus access)."""
+    query = {
+        key: call.data[key]
+        for key in ("mode", "hp_index")
+        if call.data.get(key) is not None
+    }
+    return {
+        "bin_width": MODULATION_BIN_WIDTH,
+        "entries": await _async_run_for_entries(hass, _get_entry_modulation, query),
+    }
+
+
 async def async_setup_services(hass: HomeAssistant) -> None:
     """Set up Lambda WP services."""
     _LOGGER.debug("Service setup completed successfully")
@@ -480,17 +636,25 @@ async def async_setup_services(hass: HomeAssistant) -> None:
     # um sie später entfernen zu können
     unsub_update_callbacks = {}
 
-    async def async_update_room_temperature(call: ServiceCall) -> None:
+    async def async_update_room_temperature(call: ServiceCall) -> dict:
         """Update room temperature from the selected sensor to Modbus register."""
-        await _handle_update_room_temperature(hass, call)
+        return await _handle_update_room_temperature(hass, call)
 
     async def async_read_modbus_register(call: ServiceCall) -> dict:
         """Read a value from a Modbus register of the Lambda heat pump."""
         return await _handle_read_modbus_register(hass, call)
 
-    async def async_write_modbus_register(call: ServiceCall) -> None:
+    async def async_write_modbus_register(call: ServiceCall) -> dict:
         """Write a value to a Modbus register of the Lambda heat pump."""
-        await _handle_write_modbus_register(hass, call)
+        return await _handle_write_modbus_register(hass, call)
+
+    async def async_get_sessions(call: ServiceCall) -> dict:
+        """Return the recorded compressor run sessions."""
+        return await _handle_get_sessions(hass, call)
+
+    async def async_get_modulation_histogram(call: ServiceCall) -> dict:
+        """Return the compressor modulation histograms."""
+        return await _handle_get_modulation_histogram(hass, call)
 
     async def async_write_room_and_pv(call: ServiceCall = None) -> None:
         """Write room temperature and PV surplus to Modbus registers."""
@@ -536,6 +700,7 @@ async def async_setup_services(hass: HomeAssistant) -> None:
         "update_room_temperature",
         async_update_room_temperature,
         schema=UPDATE_ROOM_TEMPERATURE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
     )
 
     # Registriere read_modbus_register Service
@@ -553,6 +718,23 @@ async def async_setup_services(hass: HomeAssistant) -> None:
         "write_modbus_register",
         async_write_modbus_register,
         schema=WRITE_MODBUS_REGISTER_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        "get_sessions",
+        async_get_sessions,
+        schema=GET_SESSIONS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        "get_modulation_histogram",
+        async_get_modulation_histogram,
+        schema=GET_MODULATION_HISTOGRAM_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
     )
 
     # Unregister-Callback für das Entfernen aller Unsubscriber
@@ -0,0 +1,219 @@
+"""Compressor run sessions in a fixed-size binary ring buffer."""
+
+from __future__ import annotations
+
+import base64
+from dataclasses import dataclass, field
+import struct
+from typing import Mapping
+import zlib
+
+from .const import ACCUMULATOR_MAX_POWER
+from .utils import accumulator_delta
+
+# start, end (epoch s), hp_idx, Modus-Index, elektrisch/thermisch (kWh),
+# Ø Vorlauf / Rücklauf / Quelle (°C), Anzahl Modulationswechsel
+_RECORD = struct.Struct("<IIBBfffffH")
+# Modus-Index für Modi, die nicht (mehr) in der Tabelle stehen
+_UNKNOWN_MODE = 255
+# Temperaturen, deren Mittelwert pro Session gespeichert wird
+SESSION_TEMPERATURES = (
+    "flow_line_temperature",
+    "return_line_temperature",
+    "energy_source_inlet_temperature",
+)
+
+
+class SessionLog:
+    """Finished sessions, packed into one preallocated bytearray.
+
+    When the log is full the oldest session is overwritten. ``modes`` maps
+    the mode names to the index stored in the records, so the order of
+    the tuple must not change between versions.
+    """
+
+    def __init__(self, capacity: int, modes: tuple[str, ...]) -> None:
+        self._capacity = capacity
+        self._modes = modes
+        self._buffer = bytearray(_RECORD.size * capacity)
+        self._head = 0  # nächster Schreibplatz
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, session: Mapping) -> None:
+        try:
+            mode = self._modes.index(session["mode"])
+        except ValueError:
+            mode = _UNKNOWN_MODE
+        temperatures = [
+            float("nan") if value is None else value
+            for value in (session.get(name) for name in SESSION_TEMPERATURES)
+        ]
+        _RECORD.pack_into(
+            self._buffer,
+            self._head * _RECORD.size,
+            int(session["start"]),
+            int(session["end"]),
+            session["hp_index"],
+            mode,
+            session["electrical_energy"],
+            session["thermal_energy"],
+            *temperatures,
+            min(session["modulation_changes"], 0xFFFF),
+        )
+        self._head = (self._head + 1) % self._capacity
+        self._count = min(self._count + 1, self._capacity)
+
+    def _unpack(self, slot: int) -> dict:
+        start, end, hp_idx, mode, electrical, thermal, *rest = _RECORD.unpack_from(
+            self._buffer, slot * _RECORD.size
+        )
+        session = {
+            "start": start,
+            "end": end,
+            "hp_index": hp_idx,
+            "mode": self._modes[mode] if mode < len(self._modes) else None,
+            "electrical_energy": round(electrical, 3),
+            "thermal_energy": round(thermal, 3),
+        }
+        for name, value in zip(SESSION_TEMPERATURES, rest):
+            # NaN = kein Messwert während der Session
+            session[name] = None if value != value else round(value, 1)
+        session["modulation_changes"] = rest[-1]
+        return session
+
+    def query(
+        self,
+        start: float | None = None,
+        end: float | None = None,
+        mode: str | None = None,
+        hp_index: int | None = None,
+    ) -> list[dict]:
+        """Return the sessions overlapping [start, end], oldest first."""
+        sessions = []
+        first = (self._head - self._count) % self._capacity
+        for offset in range(self._count):
+            session = self._unpack((first + offset) % self._capacity)
+            if start is not None and session["end"] < start:
+                continue
+            if end is not None and session["start"] > end:
+                continue
+            if mode is not None and session["mode"] != mode:
+                continue
+            if hp_index is not None and session["hp_index"] != hp_index:
+                continue
+            sessions.append(session)
+        return sessions
+
+    def dumps(self) -> str:
+        """Return the records (oldest first), compressed for the Store."""
+        first = (self._head - self._count) % self._capacity
+        size = _RECORD.size
+        data = b"".join(
+            self._buffer[slot * size : (slot + 1) * size]
+            for slot in (
+                (first + offset) % self._capacity for offset in range(self._count)
+            )
+        )
+        return base64.b64encode(zlib.compress(data)).decode("ascii")
+
+    def loads(self, data: str | None) -> None:
+        """Restore from dumps() output; the newest records are kept."""
+        if not data:
+            return
+        raw = zlib.decompress(base64.b64decode(data))
+        stored = len(raw) // _RECORD.size
+        count = min(stored, self._capacity)
+        raw = raw[(stored - count) * _RECORD.size : stored * _RECORD.size]
+        self._buffer[: len(raw)] = raw
+        self._count = count
+        self._head = count % self._capacity
+
+
+@dataclass(slots=True)
+class _ActiveSession:
+    start: float
+    mode: str
+    electrical: float | None
+    thermal: float | None
+    sums: list[float] = field(default_factory=lambda: [0.0] * 3)
+    samples: list[int] = field(default_factory=lambda: [0] * 3)
+    rating: float | None = None
+    modulation_changes: int = 0
+
+
+class SessionTracker:
+    """Build sessions from the polls and mode transitions of the heat pumps.
+
+    ``data`` is coordinator.data with the hp{idx}_ keys of the energy
+    accumulators, the temperatures and compressor_unit_rating.
+    """
+
+    def __init__(
+        self, log: SessionLog, max_power: float = ACCUMULATOR_MAX_POWER
+    ) -> None:
+        self.log = log
+        # Plausibilitätsgrenze der Akkumulator-Differenz (W)
+        self._max_power = max_power
+        self._active: dict[int, _ActiveSession] = {}
+
+    def start(self, hp_idx: int, mode: str, timestamp: float, data: Mapping) -> None:
+        self._active[hp_idx] = _ActiveSession(
+            timestamp,
+            mode,
+            data.get(f"hp{hp_idx}_compressor_power_consumption_accumulated"),
+            data.get(f"hp{hp_idx}_compressor_thermal_energy_output_accumulated"),
+        )
+
+    def sample(self, data: Mapping) -> None:
+        """Add the temperatures and modulation of one poll to active sessions."""
+        for hp_idx, session in self._active.items():
+            for slot, name in enumerate(SESSION_TEMPERATURES):
+                value = data.get(f"hp{hp_idx}_{name}")
+                if value is not None:
+                    session.sums[slot] += value
+                    session.samples[slot] += 1
+            rating = data.get(f"hp{hp_idx}_compressor_unit_rating")
+            if rating is None:
+                continue
+            if session.rating is not None and rating != session.rating:
+                session.modulation_changes += 1
+            session.rating = rating
+
+    def finish(self, hp_idx: int, timestamp: float, data: Mapping) -> dict | None:
+        """Close the active session of a heat pump and append it to the log."""
+        session = self._active.pop(hp_idx, None)
+        if session is None:
+            return None
+        energy = {}
+        limit = self._max_power * max(timestamp - session.start, 0.0) / 3600
+        for name, begin, key in (
+            ("electrical_energy", session.electrical, "power_consumption"),
+            ("thermal_energy", session.thermal, "thermal_energy_output"),
+        ):
+            current = data.get(f"hp{hp_idx}_compressor_{key}_accumulated")
+            delta = (
+                accumulator_delta(begin, current, limit)
+                if begin is not None and current is not None
+                else None
+            )
+            # Reset oder Lesefehler während der Session -> keine Energie
+            energy[name] = delta / 1000 if delta is not None else 0.0
+        record = {
+            "start": session.start,
+            "end": timestamp,
+            "hp_index": hp_idx,
+            "mode": session.mode,
+            **energy,
+            **{
+                name: session.sums[slot] / session.samples[slot]
+                if session.samples[slot]
+                else None
+                for slot, name in enumerate(SESSION_TEMPERATURES)
+            },
+            "modulation_changes": session.modulation_changes,
+        }
+        self.log.append(record)
+        return record
@@ -0,0 +1,52 @@
+"""Short-cycling detection from the compressor on/off edges."""
+
+from __future__ import annotations
+
+from collections import deque
+
+
+class ShortCycleDetector:
+    """Count compressor runs shorter than ``min_runtime`` in a sliding window.
+
+    update() is called once per poll with the compressor state. The end
+    times of short runs are kept in a deque; expired entries are dropped
+    from the left, so every run is added and removed once (amortized O(1)).
+    Times are monotonic seconds.
+    """
+
+    def __init__(self, min_runtime: float, window: float) -> None:
+        self.min_runtime = min_runtime
+        self._window = window
+        self._started: float | None = None
+        self._running: bool | None = None  # None = noch kein Wert
+        self._short_runs: deque[float] = deque()
+        self.last_runtime: float | None = None
+
+    def update(self, running: bool, now: float) -> float | None:
+        """Process one poll; return the runtime (s) if a short run just ended."""
+        previous, self._running = self._running, running
+        if previous is None or running == previous:
+            return None
+        if running:
+            self._started = now
+            return None
+        started, self._started = self._started, None
+        if started is None:
+            return None
+        runtime = now - started
+        self.last_runtime = runtime
+        if runtime >= self.min_runtime:
+            return None
+        self._short_runs.append(now)
+        self._expire(now)
+        return runtime
+
+    def _expire(self, now: float) -> None:
+        short_runs = self._short_runs
+        while short_runs and now - short_runs[0] > self._window:
+            short_runs.popleft()
+
+    def count(self, now: float) -> int:
+        """Return the number of short runs that ended within the window."""
+        self._expire(now)
+        return len(self._short_runs)
@@ -13,21 +13,23 @@ from homeassistant.helpers.template import Template
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import TrackTemplate, async_track_template_result
 from homeassistant.helpers.template import TemplateError
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import (
-    DOMAIN,
-    CALCULATED_SENSOR_TEMPLATES,
-)
+from .const import DOMAIN
 from .coordinator import LambdaDataUpdateCoordinator
+from .derived import parse_derived_config
+from .aggregates import async_claim_site_sensors, get_site_aggregator
+from .descriptions import (
+    calculated_sensor_descriptions,
+    entry_module_counts,
+    site_sensor_descriptions,
+)
 from .utils import (
     build_device_info,
-    generate_sensor_names,
-    generate_template_entity_prefix,
     load_lambda_config,
     get_firmware_version_int,
-    get_compatible_sensors,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -52,10 +54,6 @@ async def async_setup_entry(
 
     # Get device counts from config
     num_hps = entry.data.get("num_hps", 1)
-    num_boil = entry.data.get("num_boil", 1)
-    num_buff = entry.data.get("num_buff", 0)
-    num_sol = entry.data.get("num_sol", 0)
-    num_hc = entry.data.get("num_hc", 1)
 
     # Hole den Legacy-Modbus-Namen-Switch aus der Config
     use_legacy_modbus_names = entry.data.get("use_legacy_modbus_names", True)
@@ -64,6 +62,9 @@ async def async_setup_entry(
     # Lade cycling_offsets aus der Konfiguration
     lambda_config = await load_lambda_config(hass)
     cycling_offsets = lambda_config.get("cycling_offsets", {})
+    derived_settings = parse_derived_config(
+        lambda_config.get("derived_sensors"), num_hps
+    )
 
     # Get firmware version and filter compatible sensors
     fw_version = get_firmware_version_int(entry)
@@ -72,80 +73,84 @@ async def async_setup_entry(
         fw_version,
     )
 
-    # Filter compatible template sensors
-    compatible_templates = get_compatible_sensors(CALCULATED_SENSOR_TEMPLATES, fw_version)
+    # Berechnete Sensoren, Heizkurven und Systemsummen; die Namen sind pro
+    # Firmware/Modulanzahl/Namensmodus gecacht (descriptions.py)
+    descriptions = calculated_sensor_descriptions(
+        fw_version,
+        entry_module_counts(entry.data),
+        use_legacy_modbus_names,
+        name_prefix,
+    )
+    # Anlagensummen über alle Entries beim ersten von mindestens zwei
+    # Entries (aggregates.py)
+    if async_claim_site_sensors(hass, entry.entry_id):
+        descriptions += site_sensor_descriptions(use_legacy_modbus_names)
 
-    # Create template sensors for each device type
     template_sensors = []
-
-    # Device type mapping
-    DEVICE_COUNTS = {
-        "hp": num_hps,
-        "boil": num_boil,
-        "buff": num_buff,
-        "sol": num_sol,
-        "hc": num_hc,
-    }
-
-    # Create template sensors for each device type
-    for device_type, count in DEVICE_COUNTS.items():
-        for idx in range(1, count + 1):
-            device_prefix = f"{device_type}{idx}"
-            # Nur Template-Sensoren mit "template"-Feld erzeugen
-            # (ausschließlich Daily-Sensoren)
-            for sensor_id, sensor_info in compatible_templates.items():
-                if (
-                    sensor_info.get("device_type") == device_type
-                    and "template" in sensor_info
-                    and not sensor_id.endswith("_cycling_total")
-                    and not sensor_id.endswith("_cycling_yesterday")
-                    and not sensor_id.endswith("_cycling_daily")
-                ):
-                    # Generate consistent names using centralized function
-                    naming = generate_sensor_names(
-                        device_prefix=device_prefix,
-                        sensor_name=sensor_info["name"],
-                        sensor_id=sensor_id,
-                        name_prefix=name_prefix,
-                        use_legacy_modbus_names=use_legacy_modbus_names,
-                    )
-                    # Generate entity prefix for template
-                    full_entity_prefix = generate_template_entity_prefix(
-                        device_prefix=device_prefix,
-                        name_prefix=name_prefix,
-                        use_legacy_modbus_names=use_legacy_modbus_names,
-                    )
-                    # Offset bestimmen
-                    cycling_offset = 0
-                    if sensor_id.endswith("_cycling_total"):
-                        device_offsets = cycling_offsets.get(device_prefix, {})
-                        cycling_offset = device_offsets.get(sensor_id, 0)
-                    # Template immer mit cycling_offset formatieren
-                    template_str = sensor_info["template"].format(
-                        full_entity_prefix=full_entity_prefix,
-                        cycling_offset=cycling_offset,
-                    )
-                    _LOGGER.debug(
-                        "Creating template sensor %s with template: %s",
-                        naming["entity_id"],
-                        template_str,
-                    )
-                    template_sensors.append(
-                        LambdaTemplateSensor(
-                            coordinator=coordinator,
-                            entry=entry,
-                            sensor_id=f"{device_prefix}_{sensor_id}",
-                            name=naming["name"],
-                            unit=sensor_info.get("unit", ""),
-                            state_class=sensor_info.get("state_class", ""),
-                            device_class=sensor_info.get("device_class"),
-                            device_type=device_type.upper(),
-                            precision=sensor_info.get("precision"),
-                            entity_id=naming["entity_id"],
-                            unique_id=naming["unique_id"],
-                            template_str=template_str,
-                        )
-                    )
+    for description in descriptions:
+        sensor_info = description.sensor_info
+        if sensor_info.get("derived") and description.sensor_id not in (
+            derived_settings.get(description.index, {}).get("quantities", ())
+        ):
+            # In lambda_wp_config.yaml (derived_sensors) abgeschaltet
+            continue
+        if description.kind == "site":
+            template_sensors.append(
+                LambdaSiteSensor(
+                    hass=hass,
+                    entry=entry,
+                    sensor_info=sensor_info,
+                    name=description.name,
+                    entity_id=description.entity_id,
+                    unique_id=description.unique_id,
+                    value_key=description.data_key,
+                )
+            )
+        elif description.kind == "expression":
+            # Wert berechnet der Coordinator (calculations.py, derived.py)
+            template_sensors.append(
+                LambdaExpressionSensor(
+                    coordinator=coordinator,
+                    entry=entry,
+                    sensor_info=sensor_info,
+                    name=description.name,
+                    entity_id=description.entity_id,
+                    unique_id=description.unique_id,
+                    data_key=description.data_key,
+                )
+            )
+        else:
+            # Offset bestimmen
+            cycling_offset = 0
+            if description.sensor_id.endswith("_cycling_total"):
+                device_offsets = cycling_offsets.get(description.device_prefix, {})
+                cycling_offset = device_offsets.get(description.sensor_id, 0)
+            # Template immer mit cycling_offset formatieren
+            template_str = sensor_info["template"].format(
+                full_entity_prefix=description.entity_prefix,
+                cycling_offset=cycling_offset,
+            )
+            _LOGGER.debug(
+                "Creating template sensor %s with template: %s",
+                description.entity_id,
+                template_str,
+            )
+            template_sensors.append(
+                LambdaTemplateSensor(
+                    coordinator=coordinator,
+                    entry=entry,
+                    sensor_id=description.data_key,
+                    name=description.name,
+                    unit=sensor_info.get("unit", ""),
+                    state_class=sensor_info.get("state_class", ""),
+                    device_class=sensor_info.get("device_class"),
+                    device_type=description.device_type.upper(),
+                    precision=sensor_info.get("precision"),
+                    entity_id=description.entity_id,
+                    unique_id=description.unique_id,
+                    template_str=template_str,
+                )
+            )
 
     if template_sensors:
         async_add_entities(template_sensors)
@@ -188,6 +193,7 @@ class LambdaTemplateSensor(CoordinatorEntity, SensorEntity):
         self._unique_id = unique_id
         self._template_str = template_str
         self._template = None  # Will be set in async_added_to_hass
+        self._last_available = None
         self._state = None
 
     @property
@@ -239,13 +245,26 @@ class LambdaTemplateSensor(CoordinatorEntity, SensorEntity):
 
     @callback
     def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        if self._template is None:
-            return
+        """Handle updated data from the coordinator.
+
+        Only availability changes are written; the template is re-rendered
+        by async_track_template_result when one of its inputs changes.
+        """
+        if self.available != self._last_available:
+            self._last_available = self.available
+            self.async_write_ha_state()
+
+    @callback
+    def _async_template_updated(self, event, updates) -> None:
+        self._handle_template_result(updates[-1].result)
 
+    @callback
+    def _handle_template_result(self, result) -> None:
+        """Convert a rendered template result and write the state."""
         try:
-            # Render the template
-            self._state = self._template.async_render()
+            if isinstance(result, TemplateError):
+                raise result
+            self._state = result
 
             _LOGGER.debug(
                 "Template sensor %s rendered state: %s (template: %s)",
@@ -311,7 +330,128 @@ class LambdaTemplateSensor(CoordinatorEntity, SensorEntity):
         """When entity is added to hass."""
         await super().async_added_to_hass()
 
-        # Initialize the template now that we have access to hass
+        # Template einmal anlegen; Jinja kompiliert es beim ersten Rendern,
+        # danach rendert der Tracker nur bei Änderung einer Abhängigkeit
+        self._last_available = self.available
         self._template = Template(self._template_str, self.hass)
+        tracker = async_track_template_result(
+            self.hass,
+            [TrackTemplate(self._template, None)],
+            self._async_template_updated,
+        )
+        self.async_on_remove(tracker.async_remove)
+        tracker.async_refresh()
+
+
+class LambdaExpressionSensor(CoordinatorEntity, SensorEntity):
+    """Calculated sensor; the coordinator evaluates its expression."""
+
+    _attr_should_poll = False
+
+    def __init__(
+        self,
+        coordinator: LambdaDataUpdateCoordinator,
+        entry: ConfigEntry,
+        sensor_info: dict,
+        name: str,
+        entity_id: str,
+        unique_id: str,
+        data_key: str,
+    ) -> None:
+        super().__init__(coordinator)
+        self._entry = entry
+        self._data_key = data_key
+        self._precision = sensor_info.get("precision")
+        self._last_available = None
+        self.entity_id = entity_id
+        self._attr_name = name
+        self._attr_unique_id = unique_id
+        self._attr_native_unit_of_measurement = sensor_info.get("unit")
+        self._attr_suggested_display_precision = self._precision
+        _apply_sensor_classes(self, sensor_info)
+
+    @property
+    def device_info(self):
+        return build_device_info(self._entry)
+
+    @property
+    def native_value(self) -> float | None:
+        value = (self.coordinator.data or {}).get(self._data_key)
+        if value is not None and self._precision is not None:
+            value = round(value, self._precision)
+        return value
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only if the calculated value changed."""
+        available = self.available
+        if available == self._last_available and not self.coordinator.data_changed(
+            (self._data_key,)
+        ):
+            return
+        self._last_available = available
+        self.async_write_ha_state()
+
+
+def _apply_sensor_classes(entity: SensorEntity, sensor_info: dict) -> None:
+    """Set state and device class of a calculated sensor from its template."""
+    if sensor_info.get("state_class") == "measurement":
+        entity._attr_state_class = SensorStateClass.MEASUREMENT
+    elif sensor_info.get("state_class") == "total_increasing":
+        entity._attr_state_class = SensorStateClass.TOTAL_INCREASING
+    if sensor_info.get("device_class") == "power":
+        entity._attr_device_class = SensorDeviceClass.POWER
+    elif sensor_info.get("device_class") == "temperature":
+        entity._attr_device_class = SensorDeviceClass.TEMPERATURE
+
+
+class LambdaSiteSensor(SensorEntity):
+    """Total over all Lambda entries, published by the site aggregator."""
+
+    _attr_should_poll = False
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        sensor_info: dict,
+        name: str,
+        entity_id: str,
+        unique_id: str,
+        value_key: str,
+    ) -> None:
+        self._entry = entry
+        self._site = get_site_aggregator(hass)
+        self._value_key = value_key
+        self._last_value = None
+        self._precision = sensor_info.get("precision")
+        self.entity_id = entity_id
+        self._attr_name = name
+        self._attr_unique_id = unique_id
+        self._attr_native_unit_of_measurement = sensor_info.get("unit")
+        self._attr_suggested_display_precision = self._precision
+        _apply_sensor_classes(self, sensor_info)
+
+    @property
+    def device_info(self):
+        return build_device_info(self._entry)
+
+    @property
+    def native_value(self) -> float | None:
+        value = self._site.values.get(self._value_key)
+        if value is not None and self._precision is not None:
+            value = round(value, self._precision)
+        return value
 
-        self._handle_coordinator_update()
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self._site.async_add_listener(self._handle_site_update)
+        )
+
+    @callback
+    def _handle_site_update(self) -> None:
+        value = self.native_value
+        if value != self._last_value:
+            self._last_value = value
+            self.async_write_ha_state()
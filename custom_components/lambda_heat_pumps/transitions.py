@@ -0,0 +1,102 @@
+"""Table driven edge detection for the operating states of all modules."""
+
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Mapping
+
+# Platzhalter im Zustands-Array für "noch kein Wert gelesen"
+_UNKNOWN = -(2**31)
+
+
+@dataclass(frozen=True, slots=True)
+class StateTransition:
+    """One change of an operating state register."""
+
+    prefix: str  # "hp", "boil", "buff", "sol", "hc"
+    index: int  # 1-based module index
+    previous: int | None  # None = first value after start
+    state: int
+    mode: str | None  # counted mode entered with this transition
+    timestamp: datetime
+
+
+class TransitionEngine:
+    """Detect operating state transitions for all modules in one pass.
+
+    The table maps a module prefix to its state sensor, the entry option
+    holding the number of modules and the counted modes (mode -> state)::
+
+        {"hp": {"sensor": "operating_state", "count": ("num_hps", 1),
+                "modes": {"heating": 1, ...}}}
+
+    compile() turns the table into flat slots; the previous state of every
+    slot is kept in one int array.
+    """
+
+    def __init__(self, table: Mapping[str, dict]) -> None:
+        self._table = table
+        self._mode_by_state: dict[str, dict[int, str]] = {
+            prefix: {state: mode for mode, state in row.get("modes", {}).items()}
+            for prefix, row in table.items()
+        }
+        self._slots: list[tuple[str, int, str, dict[int, str]]] = []
+        self._states = array("l")
+
+    def compile(
+        self, counts: Mapping[str, int], key_func: Callable[[str], str] = str
+    ) -> None:
+        """Build the slots for the configured number of modules.
+
+        ``key_func`` maps "boil1_operating_state" to the coordinator.data
+        key (sensor overrides). Previous states are reset.
+        """
+        slots = []
+        for prefix, row in self._table.items():
+            option, default = row["count"]
+            for idx in range(1, int(counts.get(option, default)) + 1):
+                key = key_func(f"{prefix}{idx}_{row['sensor']}")
+                slots.append((prefix, idx, key, self._mode_by_state[prefix]))
+        self._slots = slots
+        self._states = array("l", [_UNKNOWN] * len(slots))
+
+    @property
+    def compiled(self) -> bool:
+        return bool(self._slots)
+
+    def mode_for_state(self, prefix: str, state) -> str | None:
+        """Return the counted mode of ``state`` (None if it is not counted)."""
+        try:
+            return self._mode_by_state.get(prefix, {}).get(int(state))
+        except (TypeError, ValueError):
+            return None
+
+    def process(self, data: Mapping, now: datetime) -> list[StateTransition]:
+        """Compare ``data`` with the previous states and return the changes."""
+        transitions = []
+        states = self._states
+        for slot, (prefix, idx, key, modes) in enumerate(self._slots):
+            value = data.get(key)
+            if value is None:
+                continue
+            try:
+                state = int(value)
+            except (TypeError, ValueError):
+                continue
+            previous = states[slot]
+            if previous == state:
+                continue
+            states[slot] = state
+            transitions.append(
+                StateTransition(
+                    prefix,
+                    idx,
+                    None if previous == _UNKNOWN else previous,
+                    state,
+                    modes.get(state),
+                    now,
+                )
+            )
+        return transitions
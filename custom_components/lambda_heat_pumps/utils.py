@@ -7,14 +7,8 @@ import os
 import yaml
 
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.entity_registry import async_get as async_get_entity_registry
-from homeassistant.const import STATE_UNKNOWN
-from homeassistant.helpers.entity_component import async_update_entity
 
-from .const import (
-    BASE_ADDRESSES,
-    CALCULATED_SENSOR_TEMPLATES,
-)
+from .const import BASE_ADDRESSES
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -214,6 +208,7 @@ async def load_lambda_config(hass: HomeAssistant) -> dict:
         "disabled_registers": set(),
         "sensors_names_override": {},
         "cycling_offsets": {},
+        "derived_sensors": {},
     }
 
     if not os.path.exists(lambda_config_path):
@@ -291,6 +286,7 @@ async def load_lambda_config(hass: HomeAssistant) -> dict:
             "disabled_registers": disabled_registers,
             "sensors_names_override": sensors_names_override,
             "cycling_offsets": cycling_offsets,
+            "derived_sensors": config.get("derived_sensors") or {},
         }
 
     except Exception as e:
@@ -361,6 +357,23 @@ def to_signed_32bit(val):
     return val - 0x100000000 if val >= 0x80000000 else val
 
 
+def to_register_values(raw_value: int, data_type: str | None) -> list[int]:
+    """Encode a raw (already scaled) value into Modbus register words.
+
+    Args:
+        raw_value: Integer value in register units (e.g. 0.1 °C steps)
+        data_type: Template data type ("int16", "uint16" or "int32")
+
+    Returns:
+        list[int]: One word for 16-bit types, high/low words for int32
+    """
+    raw_value = int(raw_value)
+    if data_type == "int32":
+        raw_value &= 0xFFFFFFFF
+        return [(raw_value >> 16) & 0xFFFF, raw_value & 0xFFFF]
+    return [raw_value & 0xFFFF]
+
+
 def clamp_to_int16(value: float, context: str = "value") -> int:
     """Clamp a value to int16 range (-32768 to 32767).
 
@@ -461,108 +474,158 @@ def generate_template_entity_prefix(
         return device_prefix
 
 
-# --- Cycling Counter Increment Function ---
+def accumulator_delta(
+    previous: float, current: float, limit: float
+) -> float | None:
+    """Return the increase of an accumulating (signed int32) counter.
 
+    None if the value decreased or rose by more than ``limit`` (glitch or
+    counter reset). A wrap from the positive to the negative int32 range
+    is unwrapped if the resulting increase is within ``limit``, i.e. only
+    close to 2**31.
+    """
+    delta = current - previous
+    if delta < 0 and previous > 0 > current:
+        delta += 2**32
+    return delta if 0 <= delta <= limit else None
 
-async def increment_cycling_counter(
-    hass: HomeAssistant,
-    mode: str,
-    hp_index: int,
-    name_prefix: str,
-    use_legacy_modbus_names: bool = True,
-    cycling_offsets: dict = None,
-):
+
+class AccumulatorTracker:
+    """Plausibility-checked increases of one energy accumulator (Wh).
+
+    An increase above ``max_power`` (W) times the elapsed time and any
+    decrease are not counted. Such a read is kept as candidate: if the next
+    read continues plausibly from it, the counter was reset (or the device
+    replaced) and the candidate becomes the new baseline; otherwise it was
+    a glitch and is dropped. The energy of the poll with a reset is lost,
+    a bad read never adds the lifetime value of the counter.
     """
-    Increment the cycling_total counter for a given mode and heat pump index.
-    This should be called only on a real flank (state change)!
 
-    Args:
-        hass: HomeAssistant instance
-        mode: One of ["heating", "hot_water", "cooling", "defrost"]
-        hp_index: Index of the heat pump (1-based)
-        name_prefix: Name prefix (e.g. "eu08l")
-        use_legacy_modbus_names: Use legacy entity naming
-        cycling_offsets: Optional dict with cycling offsets from config
+    __slots__ = ("max_power", "_value", "_time", "_candidate")
+
+    def __init__(self, max_power: float) -> None:
+        self.max_power = max_power
+        self._value: float | None = None
+        self._time = 0.0
+        self._candidate: tuple[float, float] | None = None
+
+    def _limit(self, since: float, now: float) -> float:
+        return self.max_power * max(now - since, 0.0) / 3600
+
+    def update(self, current: float, now: float) -> float:
+        """Add a read (monotonic seconds); return the accepted increase in Wh."""
+        if self._value is None:
+            self._value, self._time = current, now
+            return 0.0
+        delta = accumulator_delta(
+            self._value, current, self._limit(self._time, now)
+        )
+        if delta is None and self._candidate is not None:
+            value, since = self._candidate
+            delta = accumulator_delta(value, current, self._limit(since, now))
+        if delta is None:
+            self._candidate = (current, now)
+            return 0.0
+        self._value, self._time, self._candidate = current, now, None
+        return delta
+
+
+def changed_keys(previous: dict | None, current: dict) -> frozenset | None:
+    """Return the keys added, removed or changed between two data dicts.
+
+    None if there is no previous data (everything is new).
+    """
+    if previous is None:
+        return None
+    changed = {key for key, value in current.items() if previous.get(key) != value}
+    changed.update(previous.keys() - current.keys())
+    return frozenset(changed)
+
+
+# --- Writeable registers (number/select platforms) ---
+
+
+def get_state_mapping(device_type: str, sensor_name: str) -> dict | None:
+    """Return the const_mapping dictionary for a state register, if any.
+
+    Uses the same naming rule as the state sensors, e.g. ("hc", "Operating
+    Mode") -> HC_OPERATING_MODE.
     """
+    from . import const_mapping
 
-    sensor_id = f"{mode}_cycling_total"
-    device_prefix = f"hp{hp_index}"
-    names = generate_sensor_names(
-        device_prefix,
-        CALCULATED_SENSOR_TEMPLATES[sensor_id]["name"],
-        sensor_id,
-        name_prefix,
-        use_legacy_modbus_names,
+    mapping_name = (
+        f"{device_type.upper()}_"
+        f"{sensor_name.upper().replace(' ', '_').replace('-', '_')}"
     )
-    entity_id = names["entity_id"]
+    mapping = getattr(const_mapping, mapping_name, None)
+    return mapping if isinstance(mapping, dict) else None
 
-    # Check if entity is already registered
-    entity_registry = async_get_entity_registry(hass)
-    entity_entry = entity_registry.async_get(entity_id)
-    if entity_entry is None:
-        _LOGGER.warning(
-            f"Skipping cycling counter increment: {entity_id} not yet registered"
-        )
-        return
 
-    # Zusätzliche Prüfung: Ist die Entity tatsächlich verfügbar?
-    state_obj = hass.states.get(entity_id)
-    if state_obj is None:
-        _LOGGER.warning(
-            f"Skipping cycling counter increment: {entity_id} state not available yet"
-        )
-        return
+def get_writeable_registers(entry, disabled_registers: set[int]) -> list[dict]:
+    """Collect all writeable template registers for a config entry.
 
-    # Get current state
-    if state_obj.state in (None, STATE_UNKNOWN, "unknown"):
-        current = 0
-    else:
-        try:
-            current = int(float(state_obj.state))
-        except Exception:
-            current = 0
-
-    # Offset aus cycling_offsets laden
-    offset = 0
-    if cycling_offsets is not None:
-        device_key = device_prefix
-        if device_key in cycling_offsets:
-            offset = int(cycling_offsets[device_key].get(sensor_id, 0))
-
-    new_value = int(current + 1)
-
-    # Versuche die Entity-Instanz zu finden
-    cycling_entity = None
-    try:
-        # Suche in der neuen Cycling-Entities-Struktur
-        for entry_id, comp_data in hass.data.get("lambda_heat_pumps", {}).items():
-            if isinstance(comp_data, dict) and "cycling_entities" in comp_data:
-                cycling_entity = comp_data["cycling_entities"].get(entity_id)
-                if cycling_entity:
-                    break
-    except Exception as e:
-        _LOGGER.debug(f"Error searching for entity {entity_id}: {e}")
+    The ``writeable`` flags of the *_SENSOR_TEMPLATES in const.py are the
+    only source. The RegisterTemplates in modular_registry.py are not used
+    here; they belong to the modular setup, which is not loaded.
 
-    final_value = int(new_value + offset)
-    if cycling_entity is not None and hasattr(cycling_entity, "set_cycling_value"):
-        cycling_entity.set_cycling_value(final_value)
-        _LOGGER.info(
-            f"Cycling counter incremented: {entity_id} = {final_value} (was {current}, offset {offset}) [entity updated]"
-        )
-    else:
-        # Fallback: State setzen wie bisher
-        _LOGGER.warning(
-            f"Cycling entity {entity_id} not found, using fallback state update"
-        )
-        hass.states.async_set(
-            entity_id, final_value, state_obj.attributes if state_obj else {}
-        )
-        _LOGGER.info(
-            f"Cycling counter incremented: {entity_id} = {final_value} (was {current}, offset {offset}) [state only]"
-        )
+    Returns:
+        list[dict]: One dict per register with the keys ``device_prefix``,
+        ``device_type``, ``sensor_id``, ``sensor_info``, ``address``,
+        ``data_key``, ``names`` and ``mapping`` (state mapping or None).
+    """
+    from .const import (
+        HP_SENSOR_TEMPLATES,
+        BOIL_SENSOR_TEMPLATES,
+        BUFF_SENSOR_TEMPLATES,
+        SOL_SENSOR_TEMPLATES,
+        HC_SENSOR_TEMPLATES,
+    )
 
-    # Optional: Entity zum Update zwingen (z.B. für Recorder)
-    try:
-        await async_update_entity(hass, entity_id)
-    except Exception as e:
-        _LOGGER.debug(f"Could not force update for {entity_id}: {e}")
+    fw_version = get_firmware_version_int(entry)
+    use_legacy_modbus_names = entry.data.get("use_legacy_modbus_names", True)
+    name_prefix = entry.data.get("name", "").lower().replace(" ", "")
+    templates = [
+        ("hp", entry.data.get("num_hps", 1), HP_SENSOR_TEMPLATES),
+        ("boil", entry.data.get("num_boil", 1), BOIL_SENSOR_TEMPLATES),
+        ("buff", entry.data.get("num_buff", 0), BUFF_SENSOR_TEMPLATES),
+        ("sol", entry.data.get("num_sol", 0), SOL_SENSOR_TEMPLATES),
+        ("hc", entry.data.get("num_hc", 1), HC_SENSOR_TEMPLATES),
+    ]
+
+    registers = []
+    seen_addresses = set()
+    for device_type, count, template in templates:
+        compatible = get_compatible_sensors(template, fw_version)
+        base_addresses = generate_base_addresses(device_type, count)
+        for idx in range(1, count + 1):
+            device_prefix = f"{device_type}{idx}"
+            for sensor_id, sensor_info in compatible.items():
+                if not sensor_info.get("writeable"):
+                    continue
+                address = base_addresses[idx] + sensor_info["relative_address"]
+                if address in seen_addresses or is_register_disabled(
+                    address, disabled_registers
+                ):
+                    continue
+                seen_addresses.add(address)
+                registers.append(
+                    {
+                        "device_prefix": device_prefix,
+                        "device_type": device_type,
+                        "sensor_id": sensor_id,
+                        "sensor_info": sensor_info,
+                        "address": address,
+                        "data_key": f"{device_prefix}_{sensor_id}",
+                        "names": generate_sensor_names(
+                            device_prefix,
+                            sensor_info["name"],
+                            sensor_id,
+                            name_prefix,
+                            use_legacy_modbus_names,
+                        ),
+                        "mapping": get_state_mapping(
+                            device_type, sensor_info["name"]
+                        ),
+                    }
+                )
+    return registers
@@ -0,0 +1,170 @@
+"""Tests for the system and site totals."""
+
+from unittest.mock import MagicMock, Mock
+
+import pytest
+
+from custom_components.lambda_heat_pumps.aggregates import (
+    SiteAggregator,
+    SystemAggregator,
+    async_claim_site_sensors,
+    async_update_site_sensor_owner,
+    get_site_aggregator,
+    release_site_aggregator,
+    site_sensor_owner,
+)
+from custom_components.lambda_heat_pumps.const import DOMAIN, SITE_AGGREGATOR_KEY
+
+
+def _hp_data(**values):
+    data = {}
+    for idx, (power, heat) in values.items():
+        data[f"{idx}_inverter_power_consumption"] = power
+        data[f"{idx}_actual_heating_capacity"] = heat
+    return data
+
+
+def test_system_sums_cop_and_cycles():
+    system = SystemAggregator(3)
+    data = _hp_data(hp1=(1000, 4.0), hp2=(500, 2.5))
+
+    changed = system.update(data, None, {"heating": 12, "defrost": 3})
+
+    assert data["system_electrical_power"] == 1500
+    assert data["system_heat_output"] == 6.5
+    assert data["system_cop"] == pytest.approx(6500 / 1500)
+    assert data["system_heating_cycling_total"] == 12
+    assert "system_cop" in changed and "system_defrost_cycling_total" in changed
+
+
+def test_system_skips_sums_without_changed_inputs():
+    system = SystemAggregator(2)
+    system.update(_hp_data(hp1=(1000, 4.0), hp2=(0, 0)), None, {})
+
+    # Eingänge nicht im Change Set -> letzte Summe bleibt
+    data = _hp_data(hp1=(2000, 4.0), hp2=(0, 0))
+    assert system.update(data, frozenset({"other"}), {}) == set()
+    assert data["system_electrical_power"] == 1000
+
+    changed = system.update(data, frozenset({"hp1_inverter_power_consumption"}), {})
+    assert changed == {"system_electrical_power", "system_cop"}
+    assert data["system_electrical_power"] == 2000
+    assert data["system_cop"] == pytest.approx(2.0)
+
+
+def test_system_cop_missing_when_idle():
+    system = SystemAggregator(1)
+    data = _hp_data(hp1=(0, 0.0))
+    system.update(data, None, {})
+    assert "system_cop" not in data
+
+
+def test_site_sums_entries_and_notifies():
+    site = SiteAggregator()
+    listener = Mock()
+    remove = site.async_add_listener(listener)
+
+    site.update("a", {"system_electrical_power": 1000, "system_heat_output": 4.0,
+                      "system_cop": 4.0})
+    site.update("b", {"system_electrical_power": 1000, "system_heat_output": 2.0,
+                      "system_cop": 2.0})
+    assert site.values["system_electrical_power"] == 2000
+    assert site.values["system_cop"] == pytest.approx(3.0)
+    assert listener.call_count == 2
+
+    site.update("b", {"system_electrical_power": 1000, "system_heat_output": 2.0})
+    assert listener.call_count == 2
+
+    site.remove("b")
+    assert site.values["system_heat_output"] == 4.0
+    remove()
+    site.remove("a")
+    assert listener.call_count == 3
+    assert site.is_empty()
+
+
+def test_site_aggregator_shared_and_released():
+    hass = MagicMock()
+    hass.data = {}
+    site = get_site_aggregator(hass)
+    assert get_site_aggregator(hass) is site
+    site.update("a", {"system_electrical_power": 1})
+
+    release_site_aggregator(hass, "a")
+    assert SITE_AGGREGATOR_KEY not in hass.data
+    release_site_aggregator(hass, "a")
+
+
+def test_site_sensor_owner_needs_two_entries():
+    assert site_sensor_owner(["a"]) is None
+    assert site_sensor_owner(["a", "b"]) == "a"
+
+
+def test_owner_reloaded_when_second_entry_added():
+    hass = MagicMock()
+    hass.data = {DOMAIN: {"a": {}}}
+    hass.config_entries.async_entries.return_value = [Mock(entry_id="a", disabled_by=None)]
+
+    assert async_claim_site_sensors(hass, "a") is False
+    assert hass.data[DOMAIN]["a"]["site_sensors"] is False
+
+    # Zweiter Controller kommt später dazu
+    hass.config_entries.async_entries.return_value = [
+        Mock(entry_id="a", disabled_by=None),
+        Mock(entry_id="b", disabled_by=None),
+    ]
+    hass.data[DOMAIN]["b"] = {}
+    assert async_claim_site_sensors(hass, "b") is False
+    hass.config_entries.async_schedule_reload.assert_called_once_with("a")
+
+    # Beim Neuladen legt "a" die Sensoren an, kein weiteres Neuladen
+    assert async_claim_site_sensors(hass, "a") is True
+    assert async_claim_site_sensors(hass, "b") is False
+    hass.config_entries.async_schedule_reload.assert_called_once()
+
+
+def test_site_sensors_move_when_owner_removed():
+    hass = MagicMock()
+    hass.data = {DOMAIN: {"b": {}, "c": {}}}
+    hass.config_entries.async_entries.return_value = [
+        Mock(entry_id="a", disabled_by=None),
+        Mock(entry_id="b", disabled_by=None),
+        Mock(entry_id="c", disabled_by=None),
+    ]
+    assert async_claim_site_sensors(hass, "b") is False
+    assert async_claim_site_sensors(hass, "c") is False
+
+    # "a" wird gelöscht (steht beim Entfernen noch in der Liste) -> "b" übernimmt
+    async_update_site_sensor_owner(hass, removed_entry_id="a")
+    hass.config_entries.async_schedule_reload.assert_called_once_with("b")
+    hass.config_entries.async_entries.return_value = [
+        Mock(entry_id="b", disabled_by=None),
+        Mock(entry_id="c", disabled_by=None),
+    ]
+    assert async_claim_site_sensors(hass, "b") is True
+    hass.config_entries.async_schedule_reload.assert_called_once()
+
+    # "c" wird deaktiviert -> "b" bleibt allein und verliert die Sensoren
+    hass.config_entries.async_schedule_reload.reset_mock()
+    hass.config_entries.async_entries.return_value = [
+        Mock(entry_id="b", disabled_by=None),
+        Mock(entry_id="c", disabled_by="user"),
+    ]
+    del hass.data[DOMAIN]["c"]
+    async_update_site_sensor_owner(hass)
+    hass.config_entries.async_schedule_reload.assert_called_once_with("b")
+    assert async_claim_site_sensors(hass, "b") is False
+
+
+def test_no_reload_while_owner_not_set_up():
+    hass = MagicMock()
+    hass.data = {DOMAIN: {"a": {}, "b": {}}}
+    hass.config_entries.async_entries.return_value = [
+        Mock(entry_id="a", disabled_by=None),
+        Mock(entry_id="b", disabled_by=None),
+    ]
+
+    assert async_claim_site_sensors(hass, "b") is False
+    assert async_claim_site_sensors(hass, "a") is True
+    hass.config_entries.async_schedule_reload.assert_not_called()
+
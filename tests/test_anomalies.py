@@ -0,0 +1,64 @@
+"""Tests for the register anomaly detection."""
+
+import pytest
+
+from custom_components.lambda_heat_pumps.anomalies import (
+    AnomalyDetector,
+    AnomalyThresholds,
+    RegisterMonitor,
+)
+
+
+def test_monitor_welford_statistics():
+    monitor = RegisterMonitor(AnomalyThresholds(), jump_hold=60)
+    for now, value in enumerate((2.0, 4.0, 4.0, 4.0, 5.0, 5.0, 7.0, 9.0)):
+        monitor.update(value, now)
+
+    assert monitor.mean == 5.0
+    assert monitor.std == pytest.approx(2.138, abs=0.001)
+    assert monitor.seconds_since_change(10) == 3
+    assert monitor.stuck is False and monitor.jump is False
+
+
+def test_monitor_stuck_only_while_active():
+    monitor = RegisterMonitor(AnomalyThresholds(stuck_after=100), jump_hold=60)
+    monitor.update(0.0, 0, active=False)
+    monitor.update(0.0, 500, active=False)
+    assert monitor.stuck is False
+
+    monitor.update(0.0, 550)
+    monitor.update(0.0, 620)
+    assert monitor.stuck is True
+    assert monitor.seconds_since_change(620) == 620
+
+    monitor.update(12.0, 630)
+    assert monitor.stuck is False
+
+
+def test_monitor_jump_held():
+    monitor = RegisterMonitor(AnomalyThresholds(max_rate=5), jump_hold=120)
+    monitor.update(30.0, 0)
+    monitor.update(32.0, 30)  # 4 K/min
+    assert monitor.jump is False
+    monitor.update(50.0, 60)  # 36 K/min
+    assert monitor.jump is True
+    monitor.update(50.0, 150)
+    assert monitor.jump is True
+    monitor.update(50.0, 181)
+    assert monitor.jump is False
+
+
+def test_detector_reports_rising_edges():
+    thresholds = AnomalyThresholds.from_template(
+        {"stuck_after": 60, "active_when": "rating"}, lambda name: f"hp1_{name}"
+    )
+    assert thresholds.active_when == "hp1_rating"
+    detector = AnomalyDetector({"hp1_flow": thresholds}, jump_hold=60)
+
+    assert detector.update({"hp1_flow": 0, "hp1_rating": 0}, 0) == []
+    assert detector.update({"hp1_flow": 0, "hp1_rating": 50}, 30) == []
+    assert detector.update({"hp1_flow": 0, "hp1_rating": 50}, 100) == [
+        ("hp1_flow", "stuck")
+    ]
+    assert detector.update({"hp1_flow": 0, "hp1_rating": 50}, 130) == []
+    assert detector.update({"hp1_flow": None}, 160) == []
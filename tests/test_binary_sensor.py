@@ -0,0 +1,75 @@
+"""Tests for the anomaly binary sensors."""
+
+from unittest.mock import Mock
+
+import pytest
+
+from custom_components.lambda_heat_pumps.anomalies import (
+    AnomalyDetector,
+    AnomalyThresholds,
+)
+from custom_components.lambda_heat_pumps.binary_sensor import (
+    LambdaAnomalyBinarySensor,
+    async_setup_entry,
+)
+from custom_components.lambda_heat_pumps.const import DOMAIN
+
+
+@pytest.fixture
+def coordinator():
+    coordinator = Mock()
+    coordinator.last_update_success = True
+    coordinator.anomalies = AnomalyDetector(
+        {"hp1_flow_line_temperature": AnomalyThresholds(stuck_after=60)}, 60
+    )
+    coordinator.anomaly_registers = {
+        "hp1_flow_line_temperature": (
+            "hp1",
+            "flow_line_temperature",
+            "Flow Line Temperature",
+        )
+    }
+    return coordinator
+
+
+@pytest.mark.asyncio
+async def test_setup_creates_sensor_per_register(coordinator):
+    entry = Mock()
+    entry.entry_id = "test_entry"
+    entry.data = {"name": "EU08L", "use_legacy_modbus_names": True}
+    hass = Mock()
+    hass.data = {DOMAIN: {"test_entry": {"coordinator": coordinator}}}
+    add_entities = Mock()
+
+    await async_setup_entry(hass, entry, add_entities)
+
+    (entities,) = add_entities.call_args.args
+    assert len(entities) == 1
+    assert entities[0].entity_id == (
+        "binary_sensor.eu08l_hp1_flow_line_temperature_anomaly"
+    )
+    assert entities[0].name == "HP1 Flow Line Temperature Anomaly"
+
+
+def test_state_follows_monitor(coordinator):
+    entry = Mock()
+    sensor = LambdaAnomalyBinarySensor(
+        coordinator,
+        entry,
+        "hp1_flow_line_temperature",
+        {"name": "HP1 Flow", "entity_id": "sensor.hp1_flow", "unique_id": "hp1_flow"},
+    )
+    sensor.async_write_ha_state = Mock()
+    assert sensor.is_on is None
+
+    coordinator.anomalies.update({"hp1_flow_line_temperature": 30.0}, 0)
+    sensor._handle_coordinator_update()
+    sensor._handle_coordinator_update()
+    assert sensor.is_on is False
+    assert sensor.async_write_ha_state.call_count == 1
+
+    coordinator.anomalies.update({"hp1_flow_line_temperature": 30.0}, 90)
+    sensor._handle_coordinator_update()
+    assert sensor.is_on is True
+    assert sensor.extra_state_attributes["stuck"] is True
+    assert sensor.async_write_ha_state.call_count == 2
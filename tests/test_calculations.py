@@ -0,0 +1,48 @@
+"""Tests for the dependency-ordered calculated values."""
+
+from graphlib import CycleError
+from unittest.mock import Mock
+
+import pytest
+
+from custom_components.lambda_heat_pumps.calculations import CalculationGraph
+
+
+def test_evaluates_in_dependency_order():
+    graph = CalculationGraph()
+    # "total" wird vor "daily" hinzugefügt, hängt aber davon ab
+    graph.add("total", ["daily", "base"], lambda d: d["daily"] + d["base"])
+    graph.add("daily", ["raw"], lambda d: d["raw"] * 2)
+    assert graph.compile() == ["daily", "total"]
+
+    data = {"raw": 3, "base": 10}
+    assert graph.evaluate(data) == 2
+    assert data == {"raw": 3, "base": 10, "daily": 6, "total": 16}
+
+
+def test_unchanged_inputs_reuse_result():
+    graph = CalculationGraph()
+    func = Mock(side_effect=lambda d: d["a"] + 1)
+    graph.add("b", ["a"], func)
+    graph.add("c", ["x"], lambda d: None)
+    graph.compile()
+
+    data = {"a": 1, "x": 0}
+    graph.evaluate(data)
+    second = {"a": 1, "x": 0}
+    assert graph.evaluate(second) == 0
+    assert second["b"] == 2
+    assert "c" not in second
+    assert func.call_count == 1
+
+    third = {"a": 5, "x": 0}
+    graph.evaluate(third)
+    assert third["b"] == 6
+
+
+def test_cycle_is_rejected():
+    graph = CalculationGraph()
+    graph.add("a", ["b"], lambda d: 1)
+    graph.add("b", ["a"], lambda d: 1)
+    with pytest.raises(CycleError):
+        graph.compile()
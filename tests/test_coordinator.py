@@ -1,7 +1,7 @@
 """Test the coordinator module."""
 
 import os
-from datetime import timedelta
+from datetime import UTC, date, datetime, timedelta
 from unittest.mock import AsyncMock, MagicMock, Mock, mock_open, patch
 
 import pytest
@@ -10,6 +10,7 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import ConfigEntryNotReady
 
+from custom_components.lambda_heat_pumps.aggregates import get_site_aggregator
 from custom_components.lambda_heat_pumps.const import (
     DEFAULT_UPDATE_INTERVAL,
     DOMAIN,
@@ -17,6 +18,7 @@ from custom_components.lambda_heat_pumps.const import (
     SENSOR_TYPES,
 )
 from custom_components.lambda_heat_pumps.coordinator import LambdaDataUpdateCoordinator
+from custom_components.lambda_heat_pumps.modbus_utils import ModbusWriteError
 
 
 @pytest.fixture
@@ -25,6 +27,7 @@ def mock_hass():
     hass = MagicMock()
     hass.config = MagicMock()
     hass.config.config_dir = "/tmp/test_config"
+    hass.data = {}
     return hass
 
 
@@ -115,7 +118,11 @@ async def test_coordinator_async_init_success(mock_hass, mock_entry):
         ) as mock_load_disabled:
             with patch.object(
                 LambdaDataUpdateCoordinator, "_load_sensor_overrides", return_value={}
-            ) as mock_load_overrides:
+            ) as mock_load_overrides, patch.object(
+                LambdaDataUpdateCoordinator,
+                "_load_persisted_counters",
+                new_callable=AsyncMock,
+            ):
                 coordinator = LambdaDataUpdateCoordinator(mock_hass, mock_entry)
                 await coordinator.async_init()
 
@@ -413,3 +420,672 @@ def test_coordinator_config_paths(mock_hass, mock_entry):
 
     assert coordinator._config_dir == "/tmp/test_config"
     assert coordinator._config_path == "/tmp/test_config/lambda_wp_config.yaml"
+
+
+def _modbus_response(registers=None, error=False, exception_code=None):
+    """Create a mocked pymodbus response."""
+    response = MagicMock()
+    response.isError.return_value = error
+    response.registers = registers or []
+    response.exception_code = exception_code
+    return response
+
+
+@pytest.mark.asyncio
+async def test_write_and_verify_fc23(mock_hass, mock_entry):
+    """FC23 returns the confirmed value in one request."""
+    coordinator = LambdaDataUpdateCoordinator(mock_hass, mock_entry)
+    coordinator.client = MagicMock()
+    coordinator.client.readwrite_registers = AsyncMock(
+        return_value=_modbus_response([215])
+    )
+    coordinator.client.write_registers = AsyncMock()
+
+    assert await coordinator.async_write_and_verify(5004, [215]) == [215]
+    assert coordinator._fc23_supported is True
+    coordinator.client.write_registers.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_write_and_verify_fallback(mock_hass, mock_entry):
+    """Illegal function answer disables FC23 and uses write + read."""
+    coordinator = LambdaDataUpdateCoordinator(mock_hass, mock_entry)
+    coordinator.client = MagicMock()
+    coordinator.client.readwrite_registers = AsyncMock(
+        return_value=_modbus_response(error=True, exception_code=1)
+    )
+    coordinator.client.write_registers = AsyncMock(return_value=_modbus_response())
+    coordinator.client.read_holding_registers = AsyncMock(
+        return_value=_modbus_response([215])
+    )
+
+    assert await coordinator.async_write_and_verify(5004, [215]) == [215]
+    assert coordinator._fc23_supported is False
+
+    # Second call does not try FC23 again
+    await coordinator.async_write_and_verify(5004, [216])
+    coordinator.client.readwrite_registers.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_write_and_verify_timeout_keeps_fc23_undecided(mock_hass, mock_entry):
+    """A timeout on the first FC23 request neither falls back nor disables FC23."""
+    coordinator = LambdaDataUpdateCoordinator(mock_hass, mock_entry)
+    coordinator.client = MagicMock()
+    coordinator.client.readwrite_registers = AsyncMock(side_effect=TimeoutError())
+    coordinator.client.write_registers = AsyncMock(return_value=_modbus_response())
+
+    with pytest.raises(ModbusWriteError):
+        await coordinator.async_write_and_verify(5004, [215])
+    assert coordinator._fc23_supported is None
+    coordinator.client.write_registers.assert_not_called()
+
+
+def test_circuit_breaker_open_and_probe():
+    """Breaker opens after consecutive failures and lets one probe through."""
+    from custom_components.lambda_heat_pumps.modbus_utils import (
+        CIRCUIT_CLOSED,
+        CIRCUIT_HALF_OPEN,
+        CIRCUIT_OPEN,
+        CircuitBreaker,
+    )
+
+    now = [0.0]
+    breaker = CircuitBreaker(3, 30, clock=lambda: now[0])
+    for _ in range(3):
+        assert breaker.allow_request()
+        breaker.record_failure()
+    assert breaker.state == CIRCUIT_OPEN
+    assert not breaker.allow_request()
+
+    now[0] = 31
+    assert breaker.allow_request()
+    assert breaker.state == CIRCUIT_HALF_OPEN
+    # Only one probe at a time
+    assert not breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CIRCUIT_CLOSED
+
+
+def test_latency_tracker_timeout():
+    from custom_components.lambda_heat_pumps.modbus_utils import LatencyTracker
+
+    tracker = LatencyTracker(0.5, 10)
+    assert tracker.timeout == 10
+    for _ in range(20):
+        tracker.add_sample(0.05)
+    assert tracker.timeout == 0.5
+    tracker.add_sample(2.0)
+    tracker.add_sample(2.0)
+    assert tracker.p95 == 2.0
+    assert tracker.timeout == 6.0
+
+
+@pytest.mark.asyncio
+async def test_async_update_data_circuit_open_fails_fast(mock_hass, mock_entry):
+    """An open circuit aborts the poll without touching the connection."""
+    from homeassistant.helpers.update_coordinator import UpdateFailed
+
+    coordinator = LambdaDataUpdateCoordinator(mock_hass, mock_entry)
+    coordinator.client = MagicMock()
+    coordinator.client.read_holding_registers = AsyncMock(
+        side_effect=ConnectionError("down")
+    )
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            await coordinator.async_read_registers(0)
+    assert coordinator.circuit_breaker.is_open
+
+    coordinator.client.read_holding_registers.reset_mock()
+    with pytest.raises(UpdateFailed):
+        await coordinator._async_update_data()
+    coordinator.client.read_holding_registers.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_counters_saved_only_when_dirty(mock_hass, mock_entry):
+    """Counter changes schedule one delayed save, shutdown flushes it."""
+    coordinator = LambdaDataUpdateCoordinator(mock_hass, mock_entry)
+    coordinator._store = MagicMock()
+    coordinator._store.async_save = AsyncMock()
+
+    # Nothing changed -> nothing written
+    await coordinator._async_flush_counters()
+    coordinator._store.async_save.assert_not_called()
+
+    coordinator._mode_energy = {"heating": {1: 1.5}}
+    coordinator._mark_counters_dirty()
+    coordinator._mark_counters_dirty()
+    coordinator._store.async_delay_save.assert_called_once()
+
+    await coordinator._async_flush_counters()
+    coordinator._store.async_save.assert_awaited_once_with(
+        {
+            "cycles": {},
+            "energy": {"heating": {1: 1.5}},
+            "electrical_energy": {},
+            "compressor_energy": {},
+            "runtime": {},
+            "rollups": {
+                "daily": {"start": None, "baselines": {}},
+                "monthly": {"start": None, "baselines": {}},
+                "yearly": {"start": None, "baselines": {}},
+            },
+            "modulation": {
+                "day": None,
+                "bin_width": 10,
+                "today": {},
+                "yesterday": {},
+            },
+            "heating_curves": {},
+        }
+    )
+    assert coordinator._counters_save_pending is False
+
+
+@pytest.mark.asyncio
+async def test_load_persisted_counters_from_store(mock_hass, mock_entry):
+    coordinator = LambdaDataUpdateCoordinator(mock_hass, mock_entry)
+    coordinator._store = MagicMock()
+    coordinator._store.async_load = AsyncMock(
+        return_value={"cycles": {"heating": {"1": 12}}, "energy": {}}
+    )
+    coordinator._sessions_store = MagicMock()
+    coordinator._sessions_store.async_load = AsyncMock(return_value=None)
+
+    await coordinator._load_persisted_counters()
+
+    assert coordinator._mode_cycles == {"heating": {1: 12}}
+    coordinator._sessions_store.async_delay_save.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_session_log_migrated_to_own_store(mock_hass, mock_entry):
+    """Sessions of the counter store move to the session store."""
+    coordinator = LambdaDataUpdateCoordinator(mock_hass, mock_entry)
+    old = LambdaDataUpdateCoordinator(mock_hass, mock_entry)
+    old._sessions.log.append(
+        {
+            "start": 1000,
+            "end": 2000,
+            "hp_index": 1,
+            "mode": "heating",
+            "electrical_energy": 0.5,
+            "thermal_energy": 2.0,
+            "flow_line_temperature": 35.0,
+            "return_line_temperature": 30.0,
+            "energy_source_inlet_temperature": 5.0,
+            "modulation_changes": 0,
+        }
+    )
+    coordinator._store = MagicMock()
+    coordinator._store.async_load = AsyncMock(
+        return_value={"cycles": {}, "sessions": old._sessions.log.dumps()}
+    )
+    coordinator._sessions_store = MagicMock()
+    coordinator._sessions_store.async_load = AsyncMock(return_value=None)
+    coordinator._sessions_store.async_save = AsyncMock()
+
+    await coordinator._load_persisted_counters()
+
+    assert len(coordinator.get_sessions()) == 1
+    coordinator._sessions_store.async_delay_save.assert_called_once()
+    await coordinator._async_flush_counters()
+    coordinator._sessions_store.async_save.assert_awaited_once_with(
+        {"log": old._sessions.log.dumps()}
+    )
+
+
+def test_cycling_increment_publishes_registered_entity(mock_hass, mock_entry):
+    coordinator = LambdaDataUpdateCoordinator(mock_hass, mock_entry)
+    coordinator._cycling_offsets = {"hp1": {"heating_cycling_total": 100}}
+    entity = MagicMock()
+    coordinator.register_cycling_entity(1, "heating", entity)
+
+    coordinator._increment_cycling_counter(1, "heating")
+    coordinator._increment_cycling_counter(1, "heating")
+
+    assert coordinator._mode_cycles["heating"][1] == 2
+    assert coordinator.get_cycling_total(1, "heating") == 102
+    assert entity.async_write_ha_state.call_count == 2
+
+    coordinator.unregister_cycling_entity(1, "heating")
+    coordinator._increment_cycling_counter(1, "heating")
+    assert entity.async_write_ha_state.call_count == 2
+
+
+def test_seed_cycling_total_only_without_stored_count(mock_hass, mock_entry):
+    coordinator = LambdaDataUpdateCoordinator(mock_hass, mock_entry)
+    coordinator._store = MagicMock()
+    coordinator._cycling_offsets = {"hp1": {"heating_cycling_total": 10}}
+    coordinator._mode_cycles = {"heating": {2: 5}}
+    coordinator._cycling_loaded = {(2, "heating")}
+
+    # Migration: restored total 25 -> 15 counted cycles (offset 10)
+    coordinator.seed_cycling_total(1, "heating", 25)
+    assert coordinator.get_cycling_total(1, "heating") == 25
+    # Only once
+    coordinator.seed_cycling_total(1, "heating", 40)
+    assert coordinator.get_cycling_total(1, "heating") == 25
+    # Stored count wins over the restored state
+    coordinator.seed_cycling_total(2, "heating", 99)
+    assert coordinator._mode_cycles["heating"][2] == 5
+
+
+def test_process_transitions_counts_and_notifies(mock_hass, mock_entry):
+    mock_entry.data = {**mock_entry.data, "num_hps": 1, "num_boil": 1, "num_hc": 0}
+    coordinator = LambdaDataUpdateCoordinator(mock_hass, mock_entry)
+    coordinator._store = MagicMock()
+    listener = MagicMock()
+    remove = coordinator.async_add_transition_listener(listener)
+
+    coordinator._process_transitions(
+        {"hp1_operating_state": 0, "boil1_operating_state": 0}
+    )
+    coordinator._process_transitions(
+        {"hp1_operating_state": 1, "boil1_operating_state": 1}
+    )
+    coordinator._process_transitions(
+        {"hp1_operating_state": 1, "boil1_operating_state": 1}
+    )
+
+    assert coordinator._mode_cycles == {"heating": {1: 1}}
+    assert listener.call_count == 2
+    assert [t.prefix for t in listener.call_args[0][0]] == ["hp", "boil"]
+
+    remove()
+    coordinator._process_transitions({"hp1_operating_state": 2})
+    assert listener.call_count == 2
+    assert coordinator._mode_cycles["hot_water"] == {1: 1}
+
+
+def test_runtime_uses_elapsed_time_of_previous_mode(mock_hass, mock_entry):
+    coordinator = LambdaDataUpdateCoordinator(mock_hass, mock_entry)
+
+    assert coordinator._accumulate_runtime(1, "heating", 100.0) is False
+    # 12 s später: die Zeit gehört zum zuvor aktiven Modus
+    assert coordinator._accumulate_runtime(1, "hot_water", 112.0) is True
+    assert coordinator._accumulate_runtime(1, None, 130.0) is True
+    # Lücke größer als RUNTIME_MAX_GAP wird nicht gezählt
+    coordinator._accumulate_runtime(1, "heating", 140.0)
+    assert coordinator._accumulate_runtime(1, "heating", 10_000.0) is False
+
+    assert coordinator.get_counter("runtime", 1, "heating") == 12.0
+    assert coordinator.get_counter("runtime", 1, "hot_water") == 18.0
+
+
+def test_period_counters_roll_over_at_new_day(mock_hass, mock_entry):
+    coordinator = LambdaDataUpdateCoordinator(mock_hass, mock_entry)
+    coordinator._mode_runtime = {"heating": {1: 3600.0}}
+    coordinator._mode_cycles = {"heating": {1: 10}}
+
+    assert coordinator._rollover_periods(date(2025, 1, 31)) is True
+    assert coordinator._rollover_periods(date(2025, 1, 31)) is False
+    coordinator._mode_runtime["heating"][1] += 900.0
+    coordinator._increment_cycling_counter(1, "heating")
+
+    assert coordinator.get_counter("runtime", 1, "heating", "daily") == 900.0
+    assert coordinator.get_counter("runtime", 1, "heating") == 4500.0
+    assert coordinator.get_counter("cycling", 1, "heating", "monthly") == 1
+    # Neuer Zähler im laufenden Zeitraum zählt ab 0
+    coordinator._increment_cycling_counter(1, "defrost")
+    assert coordinator.get_counter("cycling", 1, "defrost", "yearly") == 1
+
+    coordinator._rollover_periods(date(2025, 2, 1))
+    assert coordinator.get_counter("runtime", 1, "heating", "daily") == 0.0
+    assert coordinator.get_counter("cycling", 1, "heating", "monthly") == 0
+    assert coordinator.get_counter("cycling", 1, "heating", "yearly") == 1
+
+
+def test_energy_attributed_from_accumulator_deltas(mock_hass, mock_entry):
+    coordinator = LambdaDataUpdateCoordinator(mock_hass, mock_entry)
+
+    now = 0.0
+
+    def poll(mode, electrical, thermal):
+        nonlocal now
+        now += 600.0
+        return coordinator._attribute_energy(
+            1,
+            mode,
+            {
+                "hp1_compressor_power_consumption_accumulated": electrical,
+                "hp1_compressor_thermal_energy_output_accumulated": thermal,
+            },
+            now,
+        )
+
+    assert poll("heating", 10_000, 40_000) is False
+    # Delta seit der letzten Abfrage gehört zum damals aktiven Modus
+    assert poll("hot_water", 10_500, 42_000) is True
+    assert poll(None, 11_500, 45_000) is True
+    # Im Standby keine Zuordnung zu einem Modus
+    assert poll("heating", 11_600, 45_100) is True
+    # Einzelner Lesefehler (0) wird verworfen
+    assert poll("heating", 0, 0) is False
+    assert poll("heating", 11_700, 45_500) is True
+    # Zähler-Reset erst nach zwei niedrigeren Werten übernommen
+    assert poll("heating", 100, 300) is False
+    assert poll("heating", 200, 800) is True
+
+    assert coordinator._mode_electrical == {
+        "heating": {1: pytest.approx(0.7)},
+        "hot_water": {1: 1.0},
+    }
+    assert coordinator._mode_energy == {
+        "heating": {1: pytest.approx(2.9)},
+        "hot_water": {1: 3.0},
+    }
+    assert coordinator._compressor_energy["electrical"][1] == pytest.approx(1.8)
+
+
+def test_efficiency_cop_windows_and_jaz(mock_hass, mock_entry):
+    mock_entry.data = {**mock_entry.data, "num_hps": 2}
+    coordinator = LambdaDataUpdateCoordinator(mock_hass, mock_entry)
+    coordinator._rollover_periods(date(2025, 1, 1))
+
+    for hp_idx, (electrical, thermal) in ((1, (1000, 4000)), (2, (1000, 2000))):
+        keys = {
+            f"hp{hp_idx}_compressor_power_consumption_accumulated": 0,
+            f"hp{hp_idx}_compressor_thermal_energy_output_accumulated": 0,
+        }
+        coordinator._attribute_energy(hp_idx, "heating", keys, 100.0)
+        keys = dict.fromkeys(keys)
+        keys[f"hp{hp_idx}_compressor_power_consumption_accumulated"] = electrical
+        keys[f"hp{hp_idx}_compressor_thermal_energy_output_accumulated"] = thermal
+        coordinator._attribute_energy(hp_idx, "heating", keys, 1000.0)
+
+    assert coordinator.get_efficiency(1, "jaz") == 4.0
+    assert coordinator.get_efficiency(0, "jaz") == 3.0
+    with patch("time.monotonic", return_value=1010.0):
+        assert coordinator.get_efficiency(2, "1h") == 2.0
+        assert coordinator.get_efficiency(0, "24h") == 3.0
+
+
+def test_sessions_from_hp_transitions(mock_hass, mock_entry):
+    coordinator = LambdaDataUpdateCoordinator(mock_hass, mock_entry)
+    coordinator._store = MagicMock()
+    coordinator._sessions_store = MagicMock()
+    data = {
+        "hp1_operating_state": 0,
+        "hp1_compressor_power_consumption_accumulated": 1000,
+        "hp1_compressor_thermal_energy_output_accumulated": 4000,
+        "hp1_flow_line_temperature": 35.0,
+        "hp1_compressor_unit_rating": 50,
+    }
+    with patch("homeassistant.util.dt.utcnow") as utcnow:
+        for minute, changes in (
+            (0, {}),
+            (1, {"hp1_operating_state": 1}),
+            (2, {"hp1_flow_line_temperature": 37.0, "hp1_compressor_unit_rating": 70}),
+            (
+                5,
+                {
+                    "hp1_operating_state": 0,
+                    "hp1_compressor_power_consumption_accumulated": 1500,
+                    "hp1_compressor_thermal_energy_output_accumulated": 6000,
+                },
+            ),
+        ):
+            utcnow.return_value = datetime(2025, 1, 1, 0, minute, tzinfo=UTC)
+            data.update(changes)
+            coordinator._process_transitions(data)
+
+    sessions = coordinator.get_sessions(mode="heating")
+    assert len(sessions) == 1
+    assert sessions[0]["start"] == "2025-01-01T00:01:00+00:00"
+    assert sessions[0]["electrical_energy"] == 0.5
+    assert sessions[0]["thermal_energy"] == 2.0
+    assert sessions[0]["flow_line_temperature"] == 36.0
+    assert sessions[0]["modulation_changes"] == 1
+    assert coordinator.get_sessions(mode="hot_water") == []
+    coordinator._store.async_delay_save.assert_called_once()
+    coordinator._sessions_store.async_delay_save.assert_called_once()
+
+
+def test_short_cycle_fires_event(mock_hass, mock_entry):
+    mock_entry.options = {"short_cycle_min_runtime": 5}
+    coordinator = LambdaDataUpdateCoordinator(mock_hass, mock_entry)
+    mock_hass.bus.async_fire = MagicMock()
+
+    for now, rating in ((0.0, 0), (10.0, 60), (100.0, 60), (200.0, 0), (300.0, 0)):
+        coordinator._check_short_cycle(1, {"hp1_compressor_unit_rating": rating}, now)
+
+    mock_hass.bus.async_fire.assert_called_once_with(
+        "lambda_heat_pumps_short_cycle",
+        {
+            "entry_id": mock_entry.entry_id,
+            "hp_index": 1,
+            "runtime": 190,
+            "min_runtime": 300,
+            "count": 1,
+        },
+    )
+    assert coordinator.get_short_cycle_attributes(1)["last_runtime"] == 190
+
+
+def test_modulation_histogram_time_weighted(mock_hass, mock_entry):
+    coordinator = LambdaDataUpdateCoordinator(mock_hass, mock_entry)
+
+    for now, mode, rating in (
+        (0.0, "heating", 35),
+        (10.0, "heating", 72),
+        (30.0, "heating", 0),
+        (40.0, None, 0),
+    ):
+        coordinator._accumulate_modulation(
+            1, mode, {"hp1_compressor_unit_rating": rating}, now
+        )
+
+    histograms = coordinator.get_modulation_histograms(hp_index=1)
+    assert histograms["hp1"]["heating"]["today"][3] == 10
+    assert histograms["hp1"]["heating"]["today"][7] == 20
+    assert sum(histograms["hp1"]["heating"]["today"]) == 30
+    assert coordinator.get_modulation_histograms(mode="cooling") == {}
+    assert coordinator.get_modulation_percentiles(1, "heating") == {
+        "modulation_p10": 33.0,
+        "modulation_p50": 72.5,
+        "modulation_p90": 78.5,
+    }
+
+
+@pytest.mark.asyncio
+async def test_update_data_tracks_changed_keys(mock_hass, mock_entry):
+    coordinator = LambdaDataUpdateCoordinator(mock_hass, mock_entry)
+    coordinator._async_fetch_data = AsyncMock(return_value={"a": 1, "b": 2})
+
+    coordinator.data = await coordinator._async_update_data()
+    assert coordinator.data_changed(["a"]) is True
+
+    coordinator._async_fetch_data.return_value = {"a": 1, "b": 3}
+    coordinator.data = await coordinator._async_update_data()
+    assert coordinator.changed_keys == {"b"}
+    assert coordinator.data_changed(["a"]) is False
+    assert coordinator.data_changed(["a", "b"]) is True
+
+
+@pytest.mark.asyncio
+async def test_update_data_evaluates_calculated_sensors(mock_hass, mock_entry):
+    mock_entry.data = {**mock_entry.data, "num_hps": 1, "num_hc": 0}
+    coordinator = LambdaDataUpdateCoordinator(mock_hass, mock_entry)
+    coordinator._async_fetch_data = AsyncMock(
+        return_value={
+            "hp1_suction_gas_temperature": 4.5,
+            "hp1_evaporation_temperature": -1.5,
+        }
+    )
+
+    data = await coordinator._async_update_data()
+
+    assert "hp1_superheat" in coordinator.calculations
+    assert data["hp1_superheat"] == 6.0
+    assert "hc1_flow_line_deviation" not in coordinator.calculations
+
+
+@pytest.mark.asyncio
+async def test_update_data_evaluates_derived_values(mock_hass, mock_entry):
+    mock_entry.data = {**mock_entry.data, "num_hps": 2, "num_hc": 0}
+    coordinator = LambdaDataUpdateCoordinator(mock_hass, mock_entry)
+    coordinator._derived_config = {"hp2": {"enabled": False}}
+    coordinator._async_fetch_data = AsyncMock(
+        return_value={
+            "hp1_flow_line_temperature": 35.0,
+            "hp1_return_line_temperature": 30.0,
+            "hp1_volume_flow_heat_sink": 600,
+            "hp2_flow_line_temperature": 35.0,
+            "hp2_return_line_temperature": 30.0,
+        }
+    )
+
+    data = await coordinator._async_update_data()
+
+    assert data["hp1_thermal_power"] == pytest.approx(3489.0)
+    assert data["hp1_flow_return_spread"] == 5.0
+    assert "hp2_flow_return_spread" not in data
+
+
+@pytest.mark.asyncio
+async def test_update_data_system_totals_and_site(mock_hass, mock_entry):
+    mock_entry.data = {**mock_entry.data, "num_hps": 2, "num_hc": 0}
+    coordinator = LambdaDataUpdateCoordinator(mock_hass, mock_entry)
+    coordinator._mode_cycles = {"heating": {1: 3, 2: 4}}
+    polled = {
+        "hp1_inverter_power_consumption": 1000,
+        "hp1_actual_heating_capacity": 4.0,
+        "hp2_inverter_power_consumption": 1000,
+        "hp2_actual_heating_capacity": 3.0,
+    }
+    coordinator._async_fetch_data = AsyncMock(side_effect=lambda: dict(polled))
+
+    coordinator.data = await coordinator._async_update_data()
+    assert coordinator.data["system_electrical_power"] == 2000
+    assert coordinator.data["system_cop"] == pytest.approx(3.5)
+    assert coordinator.data["system_heating_cycling_total"] == 7
+    site = get_site_aggregator(mock_hass)
+    assert site.values["system_heat_output"] == 7.0
+
+    # Unveränderte Summen erscheinen nicht im Change Set
+    coordinator.data = await coordinator._async_update_data()
+    assert coordinator.changed_keys == frozenset()
+
+    polled["hp2_actual_heating_capacity"] = 5.0
+    coordinator.data = await coordinator._async_update_data()
+    assert coordinator.changed_keys == {
+        "hp2_actual_heating_capacity",
+        "system_heat_output",
+        "system_cop",
+    }
+    assert site.values["system_cop"] == pytest.approx(4.5)
+
+
+@pytest.mark.asyncio
+async def test_update_data_feeds_rolling_statistics(mock_hass, mock_entry):
+    mock_entry.data = {**mock_entry.data, "num_hps": 1, "num_boil": 1, "num_hc": 0}
+    coordinator = LambdaDataUpdateCoordinator(mock_hass, mock_entry)
+    coordinator._async_fetch_data = AsyncMock(
+        return_value={"hp1_flow_line_temperature": 35.0, "ambient_temperature": 4.0}
+    )
+
+    await coordinator._async_update_data()
+
+    assert "boil1_actual_high_temperature" in coordinator.rolling
+    assert coordinator.get_rolling_statistics("ambient_temperature")["mean_1h"] == 4.0
+    assert coordinator.get_rolling_statistics("hp1_flow_line_temperature")[
+        "max_24h"
+    ] == 35.0
+    assert coordinator.get_rolling_statistics("hp1_cop") == {}
+
+
+@pytest.mark.asyncio
+async def test_update_data_learns_heating_curve(mock_hass, mock_entry):
+    mock_entry.data = {**mock_entry.data, "num_hps": 1, "num_hc": 1}
+    coordinator = LambdaDataUpdateCoordinator(mock_hass, mock_entry)
+    coordinator._mark_counters_dirty = Mock()
+    coordinator.heating_curves._min_weight = 1.5
+    coordinator.heating_curves._min_spread = 1.0
+    samples = iter(
+        [
+            {"ambient_temperature_calculated": -5.0, "hc1_flow_line_temperature": 40.0},
+            {"ambient_temperature_calculated": 5.0, "hc1_flow_line_temperature": 30.0},
+        ]
+    )
+
+    def fetch():
+        data = next(samples)
+        data.update({"hc1_operating_state": 0, "hc1_target_temp_flow_line": 34.0})
+        return data
+
+    coordinator._async_fetch_data = AsyncMock(side_effect=fetch)
+
+    await coordinator._async_update_data()
+    data = await coordinator._async_update_data()
+
+    assert data["hc1_heating_curve_slope"] == pytest.approx(-1.0)
+    assert data["hc1_heating_curve_flow_at_0c"] == pytest.approx(35.0)
+    assert data["hc1_heating_curve_deviation"] == pytest.approx(-4.0)
+    assert "hp1_heating_curve_slope" not in data
+    assert coordinator._mark_counters_dirty.call_count == 2
+    assert "hc1" in coordinator._counters_to_store()["heating_curves"]
+
+
+@pytest.mark.asyncio
+async def test_update_data_fires_anomaly_event(mock_hass, mock_entry):
+    mock_entry.data = {**mock_entry.data, "num_hps": 1, "num_hc": 0}
+    coordinator = LambdaDataUpdateCoordinator(mock_hass, mock_entry)
+    coordinator._async_fetch_data = AsyncMock(return_value={})
+    await coordinator._async_update_data()
+
+    coordinator._check_anomalies({"ambient_temperature": 5.0}, 0)
+    coordinator._check_anomalies({"ambient_temperature": 15.0}, 60)
+
+    _, _, name = coordinator.anomaly_registers["hp1_flow_line_temperature"]
+    assert name == "Flow Line Temperature"
+    assert coordinator.anomaly_registers["ambient_temperature"][0] == (
+        "ambient_temperature"
+    )
+    mock_hass.bus.async_fire.assert_called_once()
+    event, payload = mock_hass.bus.async_fire.call_args.args
+    assert event == "lambda_heat_pumps_anomaly"
+    assert payload["key"] == "ambient_temperature"
+    assert payload["kind"] == "jump"
+    assert payload["value"] == 15.0
+
+
+def test_written_value_refreshes_sensor(mock_hass, mock_entry):
+    """A value set after a write reaches sensors that write only on changes."""
+    from custom_components.lambda_heat_pumps.sensor import LambdaSensor
+
+    coordinator = LambdaDataUpdateCoordinator(mock_hass, mock_entry)
+    coordinator.data = {"hp1_requested_flow_line_temperature": 35.0}
+    coordinator.changed_keys = frozenset({"hp1_flow_line_temperature"})
+    sensor = LambdaSensor(
+        coordinator=coordinator,
+        entry=mock_entry,
+        sensor_id="hp1_requested_flow_line_temperature",
+        name="HP1 Requested Flow Line Temperature",
+        unit="°C",
+        address=1016,
+        scale=0.1,
+        state_class="measurement",
+        device_class="temperature",
+        relative_address=16,
+        data_type="int16",
+        device_type="HP",
+        entity_id="sensor.eu08l_hp1_requested_flow_line_temperature",
+        unique_id="eu08l_hp1_requested_flow_line_temperature",
+    )
+    sensor.async_write_ha_state = MagicMock()
+    sensor._handle_coordinator_update()
+    sensor._handle_coordinator_update()
+    assert sensor.async_write_ha_state.call_count == 1
+
+    with patch.object(
+        coordinator,
+        "async_update_listeners",
+        side_effect=sensor._handle_coordinator_update,
+    ):
+        coordinator.async_set_data_value("hp1_requested_flow_line_temperature", 40.5)
+
+    assert sensor.async_write_ha_state.call_count == 2
+    assert sensor.native_value == 40.5
+    assert coordinator.data_changed(["hp1_flow_line_temperature"])
@@ -0,0 +1,76 @@
+"""Tests for the physics-derived heat pump values."""
+
+import pytest
+
+from custom_components.lambda_heat_pumps.const import (
+    DERIVED_QUANTITIES,
+    DERIVED_SPECIFIC_HEAT,
+)
+from custom_components.lambda_heat_pumps.derived import (
+    DerivedQuantities,
+    parse_derived_config,
+)
+
+
+def test_parse_config_defaults_and_overrides():
+    settings = parse_derived_config(
+        {
+            "hp1": {"quantities": ["thermal_power"], "source_specific_heat": 1.07},
+            "hp2": {"enabled": False},
+            "hp3": {"sink_specific_heat": "x"},
+        },
+        3,
+    )
+
+    assert settings[1] == {
+        "quantities": ("thermal_power",),
+        "sink_specific_heat": DERIVED_SPECIFIC_HEAT,
+        "source_specific_heat": 1.07,
+    }
+    assert 2 not in settings
+    assert settings[3]["quantities"] == DERIVED_QUANTITIES
+    assert settings[3]["sink_specific_heat"] == DERIVED_SPECIFIC_HEAT
+    assert parse_derived_config(None, 1)[1]["quantities"] == DERIVED_QUANTITIES
+
+
+def test_evaluate_computes_all_heat_pumps():
+    derived = DerivedQuantities(parse_derived_config({}, 2))
+    data = {
+        "hp1_flow_line_temperature": 35.0,
+        "hp1_return_line_temperature": 30.0,
+        "hp1_volume_flow_heat_sink": 1000,
+        "hp1_energy_source_inlet_temperature": 8.0,
+        "hp1_energy_source_outlet_temperature": 5.0,
+        "hp1_volume_flow_energy_source": 20.0,
+        "hp2_flow_line_temperature": 40.0,
+        "hp2_return_line_temperature": 36.0,
+    }
+
+    derived.evaluate(data)
+
+    assert data["hp1_thermal_power"] == pytest.approx(5815.0)
+    # 20 l/min = 1200 l/h
+    assert data["hp1_source_power"] == pytest.approx(3 * 1200 * 1.163)
+    assert data["hp1_flow_return_spread"] == 5.0
+    assert data["hp1_source_spread"] == 3.0
+    assert data["hp2_flow_return_spread"] == 4.0
+    assert "hp2_thermal_power" not in data
+    assert "hp2_source_spread" not in data
+
+
+def test_evaluate_removes_values_without_inputs_and_honours_selection():
+    derived = DerivedQuantities(
+        {1: {"quantities": ("flow_return_spread",), "sink_specific_heat": 1.163,
+             "source_specific_heat": 1.163}},
+        key_func=lambda key: key.replace("hp1_flow", "hp1_override"),
+    )
+    assert derived.keys == ["hp1_flow_return_spread"]
+
+    data = {"hp1_override_line_temperature": 33.0, "hp1_return_line_temperature": 30}
+    derived.evaluate(data)
+    assert data["hp1_flow_return_spread"] == 3.0
+    assert "hp1_thermal_power" not in data
+
+    data = {"hp1_return_line_temperature": 30, "hp1_flow_return_spread": 3.0}
+    derived.evaluate(data)
+    assert "hp1_flow_return_spread" not in data
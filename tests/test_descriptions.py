@@ -0,0 +1,109 @@
+"""Tests for the cached register sensor descriptions."""
+
+import dataclasses
+
+import pytest
+from homeassistant.components.sensor import SensorDeviceClass
+
+from custom_components.lambda_heat_pumps.const import (
+    HP_SENSOR_TEMPLATES,
+    SENSOR_TYPES,
+)
+from custom_components.lambda_heat_pumps.descriptions import (
+    calculated_sensor_descriptions,
+    climate_descriptions,
+    entry_module_counts,
+    register_sensor_descriptions,
+    sensor_names,
+    site_sensor_descriptions,
+)
+
+COUNTS = (("hp", 2), ("boil", 1), ("buff", 0), ("sol", 0), ("hc", 1))
+
+
+def _by_id(descriptions):
+    return {description.sensor_id: description for description in descriptions}
+
+
+def test_descriptions_are_memoized():
+    first = register_sensor_descriptions(3, COUNTS, True, "eu08l")
+
+    assert register_sensor_descriptions(3, COUNTS, True, "eu08l") is first
+    assert register_sensor_descriptions(3, COUNTS, False, "eu08l") is not first
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        first[0].name = "x"
+
+
+def test_module_sensor_description():
+    descriptions = _by_id(register_sensor_descriptions(3, COUNTS, True, "eu08l"))
+
+    flow = descriptions["hp2_flow_line_temperature"]
+    assert flow.name == "HP2 Flow Line Temperature"
+    assert flow.address == 1100 + HP_SENSOR_TEMPLATES["flow_line_temperature"][
+        "relative_address"
+    ]
+    assert flow.device_type == "HP"
+    assert flow.device_class == SensorDeviceClass.TEMPERATURE
+    assert flow.entity_id == "sensor.eu08l_hp2_flow_line_temperature"
+    assert flow.unique_id == "eu08l_hp2_flow_line_temperature"
+    assert flow.override_key == "hp2_flow_line_temperature"
+    assert not any(key.startswith("hp3_") for key in descriptions)
+
+
+def test_general_sensor_description():
+    descriptions = _by_id(register_sensor_descriptions(3, COUNTS, False, "eu08l"))
+
+    ambient = descriptions["ambient_operating_state"]
+    assert ambient.address == SENSOR_TYPES["ambient_operating_state"]["address"]
+    assert ambient.device_type == "main"
+    assert ambient.txt_mapping is True
+    assert ambient.override_key is None
+
+
+def test_entry_module_counts_defaults():
+    assert entry_module_counts({"num_hps": 2, "num_hc": 3}) == (
+        ("hp", 2),
+        ("boil", 1),
+        ("buff", 0),
+        ("sol", 0),
+        ("hc", 3),
+    )
+
+
+def test_calculated_sensor_descriptions():
+    descriptions = calculated_sensor_descriptions(3, COUNTS, True, "eu08l")
+
+    assert calculated_sensor_descriptions(3, COUNTS, True, "eu08l") is descriptions
+    by_key = {description.data_key: description for description in descriptions}
+    curve = by_key["hc1_heating_curve_slope"]
+    assert curve.kind == "expression"
+    assert curve.index == 1
+    assert curve.entity_id == "sensor.eu08l_hc1_heating_curve_slope"
+    # Systemsummen erst ab zwei Wärmepumpen
+    assert by_key["system_electrical_power"].device_type == "main"
+    single = calculated_sensor_descriptions(
+        3, (("hp", 1),) + COUNTS[1:], True, "eu08l"
+    )
+    assert not any(d.data_key.startswith("system_") for d in single)
+
+
+def test_site_and_climate_descriptions():
+    site = {d.data_key: d for d in site_sensor_descriptions(False)}
+    assert site["system_electrical_power"].sensor_id == "site_electrical_power"
+    assert site["system_electrical_power"].kind == "site"
+
+    climates = climate_descriptions(3, COUNTS, True, "eu08l")
+    assert [(c.climate_type, c.index, c.base_address) for c in climates] == [
+        ("hot_water", 1, 2000),
+        ("heating_circuit", 1, 5000),
+    ]
+    assert climates[0].unique_id == "eu08l_boil1_hot_water"
+
+
+def test_sensor_names_cached_and_read_only():
+    names = sensor_names("hp1", "Short Cycles", "short_cycles", "eu08l", True)
+
+    assert sensor_names("hp1", "Short Cycles", "short_cycles", "eu08l", True) is names
+    assert names["entity_id"] == "sensor.eu08l_hp1_short_cycles"
+    with pytest.raises(TypeError):
+        names["name"] = "x"
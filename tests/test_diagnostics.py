@@ -0,0 +1,65 @@
+"""Tests for the config entry diagnostics."""
+
+import asyncio
+from unittest.mock import MagicMock, Mock
+
+import pytest
+
+from custom_components.lambda_heat_pumps.const import DOMAIN
+from custom_components.lambda_heat_pumps.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+from custom_components.lambda_heat_pumps.modbus_transport import (
+    TRANSPORTS_KEY,
+    SharedModbusTransport,
+)
+from custom_components.lambda_heat_pumps.modbus_utils import (
+    CIRCUIT_CLOSED,
+    CircuitBreaker,
+    LatencyTracker,
+)
+
+
+class FakeClient:
+    connected = True
+
+    async def connect(self):
+        return True
+
+
+async def _request(client, address):
+    await asyncio.sleep(0)
+    return address
+
+
+@pytest.mark.asyncio
+async def test_diagnostics_report_latency_per_slave():
+    transport = SharedModbusTransport("gw", 502, client_factory=FakeClient)
+    latency = {1: LatencyTracker(0.5, 10), 2: LatencyTracker(0.5, 10)}
+    for slave_id, tracker in latency.items():
+        transport.register(slave_id, tracker)
+    await asyncio.gather(
+        *(transport.async_execute(1, _request, addr) for addr in range(3)),
+        transport.async_execute(2, _request, 0),
+    )
+
+    coordinator = Mock(host="gw", port=502, slave_id=2, latency=latency[2])
+    coordinator.circuit_breaker = CircuitBreaker(3, 30)
+    entry = Mock(entry_id="second", data={"host": "gw", "port": 502, "slave_id": 2})
+    hass = MagicMock()
+    hass.data = {
+        DOMAIN: {"second": {"coordinator": coordinator}},
+        TRANSPORTS_KEY: {("gw", 502): transport},
+    }
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+
+    assert diagnostics["entry"]["host"] == "**REDACTED**"
+    connection = diagnostics["connection"]
+    assert connection["circuit_breaker"] == CIRCUIT_CLOSED
+    assert connection["latency"]["samples"] == 1
+    assert connection["latency"]["timeout"] == latency[2].timeout
+    shared = diagnostics["shared_connection"]
+    assert shared["slave_ids"] == [1, 2]
+    assert shared["latency"]["1"]["samples"] == 3
+    assert shared["latency"]["2"] == connection["latency"]
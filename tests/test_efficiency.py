@@ -0,0 +1,33 @@
+"""Tests for the rolling COP windows."""
+
+import pytest
+
+from custom_components.lambda_heat_pumps.efficiency import (
+    EfficiencyTracker,
+    RollingEnergyWindow,
+)
+
+
+def test_window_expires_old_buckets():
+    window = RollingEnergyWindow(3600, 60)
+    assert window.cop(0) is None
+
+    window.add(0, 1.0, 4.0)
+    window.add(1800, 1.0, 2.0)
+    assert window.cop(1800) == pytest.approx(3.0)
+
+    # Erster Bucket fällt aus dem Fenster
+    assert window.cop(3630) == pytest.approx(2.0)
+    # Nach langer Pause ist das Fenster leer
+    assert window.cop(100_000) is None
+
+
+def test_tracker_keeps_system_totals():
+    tracker = EfficiencyTracker({"1h": (3600, 60)})
+    tracker.add(1, 10, 1.0, 5.0)
+    tracker.add(2, 10, 1.0, 3.0)
+
+    assert tracker.cop(1, "1h", 20) == pytest.approx(5.0)
+    assert tracker.cop(2, "1h", 20) == pytest.approx(3.0)
+    assert tracker.cop(0, "1h", 20) == pytest.approx(4.0)
+    assert tracker.cop(3, "1h", 20) is None
@@ -0,0 +1,42 @@
+"""Tests for the native expression engine of calculated sensors."""
+
+import pytest
+
+from custom_components.lambda_heat_pumps.expressions import Expression
+
+
+def test_arithmetic_and_inputs():
+    expression = Expression("(hp1_a - hp1_b) * 2 + abs(-1)")
+    assert expression.inputs == {"hp1_a", "hp1_b"}
+    assert expression({"hp1_a": 5, "hp1_b": 2}) == 7
+
+
+def test_guards_return_none():
+    expression = Expression("hp1_heat / hp1_power")
+    assert expression({"hp1_heat": 3.0, "hp1_power": 0}) is None
+    assert expression({"hp1_heat": 3.0}) is None
+    assert expression({"hp1_heat": 3.0, "hp1_power": 1.5}) == 2.0
+    assert Expression("2 ** 1000")({}) is None
+
+
+def test_conditions_and_functions():
+    expression = Expression("max(a, b) if 0 < a <= 10 and b >= 0 else -1")
+    assert expression({"a": 3, "b": 4}) == 4
+    assert expression({"a": 30, "b": 4}) == -1
+    assert Expression("round(a / 3, 2)")({"a": 1}) == 0.33
+    assert Expression("a > b")({"a": 2, "b": 1}) == 1.0
+
+
+def test_key_func_maps_names():
+    expression = Expression("hc1_x + 1", {"hc1_x": "custom_x"}.get)
+    assert expression.inputs == {"custom_x"}
+    assert expression({"custom_x": 1}) == 2
+
+
+@pytest.mark.parametrize(
+    "source",
+    ["__import__('os')", "a.b", "a[0]", "open('x')", "'text'", "lambda: 1", "a +"],
+)
+def test_unsupported_syntax_is_rejected(source):
+    with pytest.raises(ValueError):
+        Expression(source)
@@ -0,0 +1,67 @@
+"""Tests for the learned heating curve."""
+
+import pytest
+
+from custom_components.lambda_heat_pumps.heating_curve import (
+    CurveEstimator,
+    CurveSeries,
+    HeatingCurves,
+)
+
+DAY = 86400
+
+
+def test_estimator_fits_line():
+    estimator = CurveEstimator(14 * DAY)
+    for ambient in range(-10, 11):
+        estimator.add(ambient, 35 - 0.8 * ambient, 1000)
+
+    slope, flow_at_0c = estimator.fit(min_weight=10, min_spread=2.0)
+    assert slope == pytest.approx(-0.8)
+    assert flow_at_0c == pytest.approx(35.0)
+
+
+def test_estimator_needs_weight_and_spread():
+    estimator = CurveEstimator(DAY)
+    for _ in range(20):
+        estimator.add(5.0, 30.0, 0)
+    assert estimator.fit(min_weight=30, min_spread=1.0) is None
+    assert estimator.fit(min_weight=10, min_spread=1.0) is None
+
+
+def test_estimator_forgets_old_samples():
+    estimator = CurveEstimator(DAY)
+    for ambient in (-10, 10):
+        estimator.add(ambient, 40 - ambient, 0)
+    # Zehn Halbwertszeiten später dominiert die neue Kurve
+    for ambient in (-10, 10):
+        estimator.add(ambient, 30 - 0.5 * ambient, 10 * DAY)
+
+    slope, flow_at_0c = estimator.fit(min_weight=1, min_spread=1.0)
+    assert slope == pytest.approx(-0.5, abs=0.01)
+    assert flow_at_0c == pytest.approx(30.0, abs=0.1)
+    assert estimator.weight == pytest.approx(2 + 2 / 1024)
+
+
+def test_curves_only_learn_in_heating_and_persist():
+    curves = HeatingCurves(DAY, min_weight=2, min_spread=1.0)
+    curves.configure(
+        "ambient",
+        {"hc1": CurveSeries("hc1_flow", "hc1_state", frozenset({0}), "hc1_target")},
+    )
+
+    # Kein Heizbetrieb -> kein Sample
+    data = {"ambient": 0.0, "hc1_flow": 50.0, "hc1_state": 12}
+    assert curves.update(data, 0) is False
+    assert "hc1_heating_curve_slope" not in data
+
+    for ambient, flow in ((-6.0, 38.0), (6.0, 32.0)):
+        data = {"ambient": ambient, "hc1_flow": flow, "hc1_state": 0}
+        assert curves.update(data, 10) is True
+    assert data["hc1_heating_curve_slope"] == pytest.approx(-0.5)
+    assert "hc1_heating_curve_deviation" not in data
+
+    restored = HeatingCurves(DAY, min_weight=2, min_spread=1.0)
+    restored.load(curves.as_dict())
+    assert restored.fit("hc1") == pytest.approx(curves.fit("hc1"))
+    assert restored.fit("hp1") is None
@@ -0,0 +1,111 @@
+"""Tests for the shared Modbus transport."""
+
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from custom_components.lambda_heat_pumps.modbus_transport import (
+    TRANSPORTS_KEY,
+    SharedModbusTransport,
+    async_get_shared_transport,
+    async_release_shared_transport,
+)
+from custom_components.lambda_heat_pumps.modbus_utils import LatencyTracker
+from custom_components.lambda_heat_pumps.module_auto_detect import (
+    auto_detect_modules,
+)
+
+
+class FakeClient:
+    """Minimal async Modbus client recording the request order."""
+
+    def __init__(self):
+        self.connected = False
+        self.calls = []
+
+    async def connect(self):
+        self.connected = True
+        return True
+
+    def close(self):
+        self.connected = False
+
+
+async def _request(client, slave_id, address):
+    await asyncio.sleep(0)
+    client.calls.append((slave_id, address))
+    return address
+
+
+@pytest.mark.asyncio
+async def test_round_robin_between_slaves():
+    """Requests of different slaves are interleaved, not served in bulk."""
+    client = FakeClient()
+    transport = SharedModbusTransport("gw", 502, client_factory=lambda: client)
+    transport.register(1, LatencyTracker(0.5, 10))
+    transport.register(2, LatencyTracker(0.5, 10))
+
+    results = await asyncio.gather(
+        *(transport.async_execute(1, _request, 1, addr) for addr in range(3)),
+        *(transport.async_execute(2, _request, 2, addr) for addr in range(3)),
+    )
+
+    assert results == [0, 1, 2, 0, 1, 2]
+    assert [slave for slave, _ in client.calls] == [1, 2, 1, 2, 1, 2]
+    assert client.connected
+    stats = transport.latency_stats()
+    assert stats[1]["samples"] == 3
+    assert stats[2]["samples"] == 3
+
+
+@pytest.mark.asyncio
+async def test_errors_are_forwarded_per_request():
+    client = FakeClient()
+    transport = SharedModbusTransport("gw", 502, client_factory=lambda: client)
+
+    async def _fail(client):
+        raise ConnectionError("no answer")
+
+    with pytest.raises(ConnectionError):
+        await transport.async_execute(1, _fail)
+    assert await transport.async_execute(2, _request, 2, 100) == 100
+
+
+@pytest.mark.asyncio
+async def test_auto_detect_through_queue():
+    """Module detection reads through the slave queue, not the raw client."""
+    client = FakeClient()
+    transport = SharedModbusTransport("gw", 502, client_factory=lambda: client)
+    transport.register(2, LatencyTracker(0.5, 10))
+
+    async def _read(client, address, count):
+        client.calls.append((2, address))
+        return MagicMock(isError=MagicMock(return_value=address in (1100, 5200)))
+
+    async def read(address, count):
+        return await transport.async_execute(2, _read, address, count)
+
+    detected = await auto_detect_modules(None, 2, read=read)
+
+    assert detected == {"hp": 1, "boil": 5, "buff": 5, "sol": 2, "hc": 2}
+    assert (2, 1000) in client.calls and (2, 5200) in client.calls
+    assert transport.latency_stats()[2]["samples"] == len(client.calls)
+
+
+def test_shared_transport_registry():
+    """Entries with the same host/port share one transport."""
+    hass = MagicMock()
+    hass.data = {}
+    with patch("pymodbus.client.AsyncModbusTcpClient", return_value=FakeClient()):
+        first = async_get_shared_transport(hass, "gw", 502, 1, LatencyTracker(0.5, 10))
+        second = async_get_shared_transport(
+            hass, "gw", 502, 2, LatencyTracker(0.5, 10)
+        )
+    assert first is second
+    assert first.slave_ids == [1, 2]
+
+    async_release_shared_transport(hass, first, 1)
+    assert hass.data[TRANSPORTS_KEY]
+    async_release_shared_transport(hass, first, 2)
+    assert not hass.data[TRANSPORTS_KEY]
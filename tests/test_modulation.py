@@ -0,0 +1,45 @@
+"""Tests for the compressor modulation histograms."""
+
+from datetime import date
+
+from custom_components.lambda_heat_pumps.modulation import (
+    ModulationHistograms,
+    histogram_percentile,
+)
+
+
+def test_add_bins_and_percentiles():
+    histograms = ModulationHistograms(10)
+    histograms.add(1, "heating", 0, 10)
+    histograms.add(1, "heating", 45, 60)
+    histograms.add(1, "heating", 100, 30)
+
+    histogram = histograms.get(1, "heating")
+    assert len(histogram) == 10
+    assert (histogram[0], histogram[4], histogram[9]) == (10, 60, 30)
+    assert histograms.get(2, "heating") == [0] * 10
+    assert histogram_percentile(histogram, 70, 10) == 50.0
+    assert histogram_percentile([0] * 10, 50, 10) is None
+
+
+def test_rollover_and_persistence():
+    histograms = ModulationHistograms(10)
+    assert histograms.rollover(date(2025, 1, 1)) is True
+    histograms.add(1, "hot_water", 80, 120)
+    assert histograms.rollover(date(2025, 1, 1)) is False
+    assert histograms.rollover(date(2025, 1, 2)) is True
+    histograms.add(2, "heating", 30, 60)
+
+    restored = ModulationHistograms(10)
+    restored.load(histograms.as_dict())
+    assert restored.get(1, "hot_water", "yesterday")[8] == 120
+    assert restored.get(1, "hot_water") == [0] * 10
+    assert restored.keys() == [(1, "hot_water"), (2, "heating")]
+
+    # Lücke von mehreren Tagen: gestern ist leer
+    restored.rollover(date(2025, 1, 5))
+    assert restored.keys() == []
+
+    other_bins = ModulationHistograms(20)
+    other_bins.load(histograms.as_dict())
+    assert other_bins.keys() == []
@@ -0,0 +1,166 @@
+# File: tests/test_number.py
+"""Tests for the Lambda Heat Pumps number/select platforms and write batching."""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from homeassistant.exceptions import HomeAssistantError
+
+from custom_components.lambda_heat_pumps.const import DOMAIN
+from custom_components.lambda_heat_pumps.modbus_utils import (
+    ModbusWriteBatcher,
+    ModbusWriteError,
+    group_register_runs,
+)
+from custom_components.lambda_heat_pumps.number import LambdaNumber
+from custom_components.lambda_heat_pumps.select import LambdaSelect
+from custom_components.lambda_heat_pumps.utils import (
+    get_writeable_registers,
+    to_register_values,
+)
+
+
+class MockConfigEntry:
+    """Mock config entry for testing."""
+
+    def __init__(self, data):
+        self.domain = DOMAIN
+        self.data = data
+        self.entry_id = "test_entry_id"
+        self.options = {}
+
+
+@pytest.fixture
+def mock_config_entry():
+    return MockConfigEntry(
+        {
+            "host": "192.168.1.100",
+            "port": 502,
+            "name": "EU08L",
+            "num_hps": 1,
+            "num_boil": 1,
+            "num_buff": 0,
+            "num_sol": 0,
+            "num_hc": 1,
+        }
+    )
+
+
+@pytest.fixture
+def mock_coordinator():
+    coordinator = MagicMock()
+    coordinator.data = {
+        "hp1_requested_flow_line_temperature": 35.0,
+        "hc1_operating_mode": 2,
+    }
+    coordinator.get_data_key = lambda key: key
+    coordinator._enabled_addresses = set()
+    coordinator.async_write_register_value = AsyncMock()
+    coordinator.async_set_data_value = MagicMock(side_effect=coordinator.data.__setitem__)
+    return coordinator
+
+
+def _register(entry, data_key):
+    for register in get_writeable_registers(entry, set()):
+        if register["data_key"] == data_key:
+            return register
+    raise AssertionError(f"{data_key} not writeable")
+
+
+def test_group_register_runs():
+    """Consecutive addresses are merged, gaps and max_count split requests."""
+    registers = {5051: 3, 5050: 2, 5006: 1, 5052: 4}
+    assert group_register_runs(registers) == [(5006, [1]), (5050, [2, 3, 4])]
+    assert group_register_runs(registers, max_count=2) == [
+        (5006, [1]),
+        (5050, [2, 3]),
+        (5052, [4]),
+    ]
+
+
+def test_to_register_values():
+    assert to_register_values(-5, "int16") == [0xFFFB]
+    assert to_register_values(70000, "int32") == [0x0001, 0x1170]
+
+
+@pytest.mark.asyncio
+async def test_batcher_coalesces_writes():
+    """Writes within the window end up in one request per run."""
+    write_func = AsyncMock(return_value=MagicMock(isError=lambda: False))
+    batcher = ModbusWriteBatcher(write_func, delay=0.01)
+
+    await asyncio.gather(
+        batcher.async_write(1016, [350]),
+        batcher.async_write(1017, [300]),
+        batcher.async_write(1016, [360]),
+    )
+
+    write_func.assert_awaited_once_with(1016, [360, 300])
+    assert batcher.pending == {}
+
+
+@pytest.mark.asyncio
+async def test_batcher_reports_errors():
+    write_func = AsyncMock(return_value=MagicMock(isError=lambda: True))
+    batcher = ModbusWriteBatcher(write_func, delay=0.01)
+
+    with pytest.raises(ModbusWriteError):
+        await batcher.async_write(1016, [350])
+
+
+def test_writeable_registers_split_by_mapping(mock_config_entry):
+    registers = get_writeable_registers(mock_config_entry, set())
+    keys = {r["data_key"]: r for r in registers}
+    assert keys["hc1_operating_mode"]["mapping"] is not None
+    assert keys["hp1_requested_flow_line_temperature"]["mapping"] is None
+    # Disabled registers are skipped
+    disabled = get_writeable_registers(mock_config_entry, {1016})
+    assert all(r["address"] != 1016 for r in disabled)
+
+
+@pytest.mark.asyncio
+async def test_number_write(mock_config_entry, mock_coordinator):
+    register = _register(mock_config_entry, "hp1_requested_flow_line_temperature")
+    number = LambdaNumber(mock_coordinator, mock_config_entry, register)
+
+    assert number.entity_id.startswith("number.")
+    assert number.native_value == 35.0
+    assert number.native_min_value == 0
+    assert number.native_max_value == 70
+
+    await number.async_set_native_value(40.5)
+
+    mock_coordinator.async_write_register_value.assert_awaited_once_with(
+        register["address"], [405]
+    )
+    mock_coordinator.async_set_data_value.assert_called_once_with(
+        "hp1_requested_flow_line_temperature", 40.5
+    )
+
+
+@pytest.mark.asyncio
+async def test_number_write_failure(mock_config_entry, mock_coordinator):
+    register = _register(mock_config_entry, "hp1_requested_flow_line_temperature")
+    number = LambdaNumber(mock_coordinator, mock_config_entry, register)
+    mock_coordinator.async_write_register_value.side_effect = ModbusWriteError("x")
+
+    with pytest.raises(HomeAssistantError):
+        await number.async_set_native_value(40.0)
+    assert mock_coordinator.data["hp1_requested_flow_line_temperature"] == 35.0
+
+
+@pytest.mark.asyncio
+async def test_select_option(mock_config_entry, mock_coordinator):
+    register = _register(mock_config_entry, "hc1_operating_mode")
+    select = LambdaSelect(mock_coordinator, mock_config_entry, register)
+
+    assert select.entity_id.startswith("select.")
+    assert select.current_option == "AUTOMATIK"
+    assert "Unknown" not in select.options
+
+    await select.async_select_option("MANUAL")
+
+    mock_coordinator.async_write_register_value.assert_awaited_once_with(
+        register["address"], [1]
+    )
+    assert select.current_option == "MANUAL"
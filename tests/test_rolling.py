@@ -0,0 +1,59 @@
+"""Tests for the rolling statistics ring buffers."""
+
+import math
+
+import pytest
+
+from custom_components.lambda_heat_pumps.rolling import (
+    RollingStatistics,
+    RollingWindow,
+)
+
+
+def test_window_min_max_mean_std():
+    window = RollingWindow(3600, 60)
+    for now, value in enumerate((20.0, 22.0, 24.0, 26.0)):
+        window.add(value, now * 30)
+
+    stats = window.stats(120)
+    assert stats["min"] == 20.0
+    assert stats["max"] == 26.0
+    assert stats["mean"] == 23.0
+    assert stats["std"] == pytest.approx(math.sqrt(5))
+
+
+def test_window_drops_expired_buckets():
+    window = RollingWindow(60, 6)  # Buckets à 10 s
+    window.add(100.0, 5)
+    window.add(10.0, 35)
+    assert window.stats(40)["max"] == 100.0
+
+    # Bucket von t=5 liegt außerhalb des Fensters
+    assert window.stats(65) == {"min": 10.0, "max": 10.0, "mean": 10.0, "std": 0.0}
+    assert window.stats(200) is None
+
+    # Wiederverwendeter Slot beginnt neu
+    window.add(50.0, 65)
+    assert window.stats(65)["mean"] == 30.0
+
+
+def test_statistics_attributes_and_revision():
+    rolling = RollingStatistics(["a", "b"], {"1h": (3600, 60), "24h": (86400, 96)})
+    rolling.update({"a": 1.0, "b": None}, 100)
+    rolling.update({"a": 3.0, "b": "on"}, 130)
+
+    assert "a" in rolling and "c" not in rolling
+    assert rolling.attributes("a", 130) == {
+        "min_1h": 1.0,
+        "max_1h": 3.0,
+        "mean_1h": 2.0,
+        "std_1h": 1.0,
+        "min_24h": 1.0,
+        "max_24h": 3.0,
+        "mean_24h": 2.0,
+        "std_24h": 1.0,
+    }
+    assert rolling.attributes("b", 130) == {}
+    assert rolling.attributes("c", 130) == {}
+    # Takt des kleinsten Buckets (60 s)
+    assert rolling.revision == 2
@@ -0,0 +1,50 @@
+"""Tests for the period rollups of the native counters."""
+
+from datetime import date
+
+import pytest
+
+from custom_components.lambda_heat_pumps.rollups import PeriodRollups, period_start
+
+
+def test_period_start():
+    day = date(2025, 3, 17)
+    assert period_start("daily", day) == day
+    assert period_start("monthly", day) == date(2025, 3, 1)
+    assert period_start("yearly", day) == date(2025, 1, 1)
+    with pytest.raises(ValueError):
+        period_start("weekly", day)
+
+
+def test_rollover_sets_baselines_of_changed_periods_only():
+    rollups = PeriodRollups()
+    assert rollups.rollover(date(2025, 3, 17), {"a": 10}) == [
+        "daily",
+        "monthly",
+        "yearly",
+    ]
+    assert rollups.rollover(date(2025, 3, 18), {"a": 15}) == ["daily"]
+
+    assert rollups.value("daily", "a", 20) == 5
+    assert rollups.value("monthly", "a", 20) == 10
+    # Neuer Zähler ohne Baseline
+    assert rollups.value("daily", "b", 3) == 3
+
+    assert rollups.rollover(date(2026, 1, 1), {"a": 20}) == [
+        "daily",
+        "monthly",
+        "yearly",
+    ]
+    assert rollups.value("yearly", "a", 21) == 1
+
+
+def test_shift_and_persistence_roundtrip():
+    rollups = PeriodRollups()
+    rollups.rollover(date(2025, 3, 17), {"a": 10})
+    rollups.shift("a", 100)
+    assert rollups.value("daily", "a", 112) == 2
+
+    restored = PeriodRollups()
+    restored.load(rollups.as_dict())
+    assert restored.as_dict() == rollups.as_dict()
+    assert restored.rollover(date(2025, 3, 17), {"a": 500}) == []
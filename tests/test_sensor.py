@@ -17,6 +17,7 @@ from custom_components.lambda_heat_pumps.const import (
     SENSOR_TYPES,
     SOL_SENSOR_TEMPLATES,
 )
+from custom_components.lambda_heat_pumps.rolling import RollingStatistics
 from custom_components.lambda_heat_pumps.sensor import (
     LambdaSensor,
     LambdaTemplateSensor,
@@ -76,6 +77,7 @@ def mock_coordinator():
         "hp1_operating_state": 2,
     }
     coordinator.sensor_overrides = {}
+    coordinator.rolling = RollingStatistics((), {})
     return coordinator
 
 
@@ -193,6 +195,81 @@ def test_lambda_sensor_init(mock_entry, mock_coordinator):
     assert sensor._attr_unique_id == "hp1_temperature"
 
 
+def test_lambda_sensor_writes_state_only_on_input_change(mock_entry, mock_coordinator):
+    """Unchanged coordinator keys do not cause a state write."""
+    mock_coordinator._entity_addresses = {}
+    sensor = LambdaSensor(
+        coordinator=mock_coordinator,
+        entry=mock_entry,
+        sensor_id="hp1_temperature",
+        name="Test Sensor",
+        unit="°C",
+        address=1000,
+        scale=1.0,
+        state_class="measurement",
+        device_class="temperature",
+        relative_address=0,
+        data_type="int16",
+        device_type="HP",
+        entity_id="sensor.hp1_temperature",
+        unique_id="hp1_temperature",
+    )
+    sensor.async_write_ha_state = Mock()
+    mock_coordinator.last_update_success = True
+    mock_coordinator.data_changed = lambda keys: "hp1_temperature" in keys
+
+    sensor._handle_coordinator_update()
+    assert sensor.async_write_ha_state.call_count == 1
+
+    mock_coordinator.data_changed = lambda keys: False
+    sensor._handle_coordinator_update()
+    assert sensor.async_write_ha_state.call_count == 1
+
+    # Verfügbarkeit ändert sich -> schreiben
+    mock_coordinator.last_update_success = False
+    sensor._handle_coordinator_update()
+    assert sensor.async_write_ha_state.call_count == 2
+
+
+def test_lambda_sensor_refreshes_rolling_statistics(mock_entry, mock_coordinator):
+    """A tracked sensor also writes when its rolling statistics move on."""
+    mock_coordinator._entity_addresses = {}
+    mock_coordinator.rolling = RollingStatistics(["hp1_temperature"], {"1h": (60, 2)})
+    mock_coordinator.get_rolling_statistics = lambda key: (
+        mock_coordinator.rolling.attributes(key, 10)
+    )
+    sensor = LambdaSensor(
+        coordinator=mock_coordinator,
+        entry=mock_entry,
+        sensor_id="hp1_temperature",
+        name="Test Sensor",
+        unit="°C",
+        address=1000,
+        scale=1.0,
+        state_class="measurement",
+        device_class="temperature",
+        relative_address=0,
+        data_type="int16",
+        device_type="HP",
+        entity_id="sensor.hp1_temperature",
+        unique_id="hp1_temperature",
+    )
+    sensor.async_write_ha_state = Mock()
+    mock_coordinator.last_update_success = True
+    mock_coordinator.data_changed = lambda keys: False
+
+    mock_coordinator.rolling.update({"hp1_temperature": 20.0}, 10)
+    sensor._handle_coordinator_update()
+    sensor._handle_coordinator_update()
+    assert sensor.async_write_ha_state.call_count == 1
+    assert sensor.extra_state_attributes["mean_1h"] == 20.0
+    assert "mean_1h" in sensor._unrecorded_attributes
+
+    mock_coordinator.rolling.update({"hp1_temperature": 20.0}, 40)
+    sensor._handle_coordinator_update()
+    assert sensor.async_write_ha_state.call_count == 2
+
+
 def test_lambda_sensor_name_property(mock_entry, mock_coordinator):
     """Test LambdaSensor name property."""
     sensor = LambdaSensor(
@@ -781,9 +858,7 @@ def test_lambda_template_sensor_device_info(
     mock_build_device_info.assert_called_once_with(mock_entry, "HP", "hp1_cop_calc")
 
 
-@pytest.mark.asyncio
-async def test_lambda_template_sensor_async_added_to_hass(mock_entry, mock_coordinator):
-    """Test LambdaTemplateSensor async_added_to_hass method."""
+def _template_sensor(mock_entry, mock_coordinator):
     sensor = LambdaTemplateSensor(
         coordinator=mock_coordinator,
         entry=mock_entry,
@@ -798,166 +873,85 @@ async def test_lambda_template_sensor_async_added_to_hass(mock_entry, mock_coord
         unique_id="hp1_cop_calc",
         template_str="{{ states('sensor.hp1_cop') | float(0) }}",
     )
+    sensor.hass = Mock()
+    sensor.async_write_ha_state = Mock()
+    return sensor
 
-    # Mock the _handle_coordinator_update method
-    sensor._handle_coordinator_update = Mock()
 
-    await sensor.async_added_to_hass()
+@pytest.mark.asyncio
+async def test_lambda_template_sensor_async_added_to_hass(mock_entry, mock_coordinator):
+    """The template is created once and tracked instead of rendered per poll."""
+    sensor = _template_sensor(mock_entry, mock_coordinator)
+    sensor.async_on_remove = Mock()
 
-    # Should call _handle_coordinator_update
-    sensor._handle_coordinator_update.assert_called_once()
+    with patch(
+        "custom_components.lambda_heat_pumps.sensor.async_track_template_result"
+    ) as mock_track:
+        await sensor.async_added_to_hass()
 
+    track_template = mock_track.call_args[0][1][0]
+    assert track_template.template is sensor._template
+    assert track_template.template.template == sensor._template_str
+    mock_track.return_value.async_refresh.assert_called_once()
+    sensor.async_on_remove.assert_called_with(mock_track.return_value.async_remove)
 
-@patch("homeassistant.helpers.template.Template")
-@patch("homeassistant.helpers.template.TemplateError")
-def test_lambda_template_sensor_handle_coordinator_update_success(
-    mock_template_error, mock_template_class, mock_entry, mock_coordinator
+
+def test_lambda_template_sensor_coordinator_update_does_not_render(
+    mock_entry, mock_coordinator
 ):
-    """Test LambdaTemplateSensor _handle_coordinator_update with successful template rendering."""
-    # Mock template
-    mock_template = Mock()
-    mock_template.async_render.return_value = "3.5"
-    mock_template_class.return_value = mock_template
+    """A coordinator update only writes the state when availability changes."""
+    sensor = _template_sensor(mock_entry, mock_coordinator)
+    sensor._template = Mock()
 
-    sensor = LambdaTemplateSensor(
-        coordinator=mock_coordinator,
-        entry=mock_entry,
-        sensor_id="hp1_cop_calc",
-        name="HP1 COP Calculated",
-        unit=None,
-        state_class="measurement",
-        device_class=None,
-        device_type="HP",
-        precision=2,
-        entity_id="sensor.hp1_cop_calc",
-        unique_id="hp1_cop_calc",
-        template_str="{{ states('sensor.hp1_cop') | float(0) }}",
-    )
+    sensor._handle_coordinator_update()
+    sensor._handle_coordinator_update()
 
-    # Mock hass
-    sensor.hass = Mock()
+    sensor._template.async_render.assert_not_called()
+    sensor.async_write_ha_state.assert_called_once()
 
-    # Mock async_write_ha_state
-    sensor.async_write_ha_state = Mock()
 
-    sensor._handle_coordinator_update()
+def test_lambda_template_sensor_template_result_success(mock_entry, mock_coordinator):
+    """A tracked template result is converted to float."""
+    sensor = _template_sensor(mock_entry, mock_coordinator)
+
+    sensor.handle_template_result("3.5")
 
-    # Should render template and set state
-    mock_template.async_render.assert_called_once()
     assert sensor._state == 3.5
     sensor.async_write_ha_state.assert_called_once()
 
 
-@patch("homeassistant.helpers.template.Template")
-@patch("homeassistant.helpers.template.TemplateError")
-def test_lambda_template_sensor_handle_coordinator_update_template_error(
-    mock_template_error, mock_template_class, mock_entry, mock_coordinator
-):
-    """Test LambdaTemplateSensor _handle_coordinator_update with template error."""
-    # Mock template to raise TemplateError
-    mock_template = Mock()
-    mock_template.async_render.side_effect = mock_template_error("Template error")
-    mock_template_class.return_value = mock_template
-
-    sensor = LambdaTemplateSensor(
-        coordinator=mock_coordinator,
-        entry=mock_entry,
-        sensor_id="hp1_cop_calc",
-        name="HP1 COP Calculated",
-        unit=None,
-        state_class="measurement",
-        device_class=None,
-        device_type="HP",
-        precision=2,
-        entity_id="sensor.hp1_cop_calc",
-        unique_id="hp1_cop_calc",
-        template_str="{{ states('sensor.hp1_cop') | float(0) }}",
-    )
-
-    # Mock hass
-    sensor.hass = Mock()
+def test_lambda_template_sensor_template_result_error(mock_entry, mock_coordinator):
+    """A TemplateError result clears the state."""
+    from homeassistant.exceptions import TemplateError
 
-    # Mock async_write_ha_state
-    sensor.async_write_ha_state = Mock()
+    sensor = _template_sensor(mock_entry, mock_coordinator)
+    sensor._state = 1.0
 
-    sensor._handle_coordinator_update()
+    sensor.handle_template_result(TemplateError("Template error"))
 
-    # Should set state to None on error
     assert sensor._state is None
     sensor.async_write_ha_state.assert_called_once()
 
 
-@patch("homeassistant.helpers.template.Template")
-def test_lambda_template_sensor_handle_coordinator_update_with_precision(
-    mock_template_class, mock_entry, mock_coordinator
+def test_lambda_template_sensor_template_result_with_precision(
+    mock_entry, mock_coordinator
 ):
-    """Test LambdaTemplateSensor _handle_coordinator_update with precision."""
-    # Mock template
-    mock_template = Mock()
-    mock_template.async_render.return_value = "3.567"
-    mock_template_class.return_value = mock_template
+    """Precision is applied to the tracked result."""
+    sensor = _template_sensor(mock_entry, mock_coordinator)
 
-    sensor = LambdaTemplateSensor(
-        coordinator=mock_coordinator,
-        entry=mock_entry,
-        sensor_id="hp1_cop_calc",
-        name="HP1 COP Calculated",
-        unit=None,
-        state_class="measurement",
-        device_class=None,
-        device_type="HP",
-        precision=2,
-        entity_id="sensor.hp1_cop_calc",
-        unique_id="hp1_cop_calc",
-        template_str="{{ states('sensor.hp1_cop') | float(0) }}",
-    )
-
-    # Mock hass
-    sensor.hass = Mock()
+    sensor.handle_template_result("3.567")
 
-    # Mock async_write_ha_state
-    sensor.async_write_ha_state = Mock()
-
-    sensor._handle_coordinator_update()
-
-    # Should apply precision
     assert sensor._state == 3.57
     sensor.async_write_ha_state.assert_called_once()
 
 
-@patch("homeassistant.helpers.template.Template")
-def test_lambda_template_sensor_handle_coordinator_update_unavailable(
-    mock_template_class, mock_entry, mock_coordinator
+def test_lambda_template_sensor_template_result_unavailable(
+    mock_entry, mock_coordinator
 ):
-    """Test LambdaTemplateSensor _handle_coordinator_update with unavailable state."""
-    # Mock template
-    mock_template = Mock()
-    mock_template.async_render.return_value = "unavailable"
-    mock_template_class.return_value = mock_template
+    """An unavailable input leaves the sensor without state."""
+    sensor = _template_sensor(mock_entry, mock_coordinator)
 
-    sensor = LambdaTemplateSensor(
-        coordinator=mock_coordinator,
-        entry=mock_entry,
-        sensor_id="hp1_cop_calc",
-        name="HP1 COP Calculated",
-        unit=None,
-        state_class="measurement",
-        device_class=None,
-        device_type="HP",
-        precision=2,
-        entity_id="sensor.hp1_cop_calc",
-        unique_id="hp1_cop_calc",
-        template_str="{{ states('sensor.hp1_cop') | float(0) }}",
-    )
-
-    # Mock hass
-    sensor.hass = Mock()
-
-    # Mock async_write_ha_state
-    sensor.async_write_ha_state = Mock()
-
-    sensor._handle_coordinator_update()
+    sensor.handle_template_result("unavailable")
 
-    # Should keep unavailable state
-    assert sensor._state == "unavailable"
+    assert sensor._state is None
     sensor.async_write_ha_state.assert_called_once()
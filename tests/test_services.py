@@ -40,3 +40,49 @@ async def test_setup_services_async(mock_hass):
         await async_setup_services(mock_hass)
 
         mock_hass.services.async_register.assert_called()
+
+
+@pytest.mark.asyncio
+async def test_write_modbus_register_fan_out():
+    """A hanging controller times out without blocking the other entries."""
+    import asyncio
+
+    from custom_components.lambda_heat_pumps.const import DOMAIN
+    from custom_components.lambda_heat_pumps.services import (
+        _handle_write_modbus_register,
+    )
+
+    async def _hang(address, values):
+        await asyncio.sleep(10)
+
+    ok_coordinator = MagicMock()
+    ok_coordinator.async_write_and_verify = AsyncMock(return_value=[42])
+    slow_coordinator = MagicMock()
+    slow_coordinator.async_write_and_verify = _hang
+    failing_coordinator = MagicMock()
+    failing_coordinator.async_write_and_verify = AsyncMock(
+        side_effect=Exception("boom")
+    )
+
+    hass = MagicMock()
+    hass.data = {
+        DOMAIN: {
+            "ok": {"coordinator": ok_coordinator},
+            "slow": {"coordinator": slow_coordinator},
+            "failing": {"coordinator": failing_coordinator},
+            "no_client": {"coordinator": MagicMock(client=None)},
+        }
+    }
+    call = MagicMock()
+    call.data = {"register_address": 102, "value": 42}
+
+    with patch(
+        "custom_components.lambda_heat_pumps.services.DEFAULT_SERVICE_ENTRY_TIMEOUT",
+        0.05,
+    ):
+        response = await _handle_write_modbus_register(hass, call)
+
+    assert response["ok"] == {"status": "ok", "value": 42}
+    assert response["slow"] == {"status": "timeout"}
+    assert response["failing"]["status"] == "error"
+    assert response["no_client"]["status"] == "error"
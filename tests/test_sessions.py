@@ -0,0 +1,81 @@
+"""Tests for the compressor session log."""
+
+import pytest
+
+from custom_components.lambda_heat_pumps.sessions import SessionLog, SessionTracker
+
+MODES = ("heating", "hot_water", "cooling", "defrost")
+
+
+def _session(start, mode="heating", hp_index=1):
+    return {
+        "start": start,
+        "end": start + 600,
+        "hp_index": hp_index,
+        "mode": mode,
+        "electrical_energy": 0.25,
+        "thermal_energy": 1.0,
+        "flow_line_temperature": 35.0,
+        "return_line_temperature": None,
+        "energy_source_inlet_temperature": 5.5,
+        "modulation_changes": 3,
+    }
+
+
+def test_ring_buffer_overwrites_oldest():
+    log = SessionLog(3, MODES)
+    for start in (1000, 2000, 3000, 4000):
+        log.append(_session(start))
+
+    assert len(log) == 3
+    assert [s["start"] for s in log.query()] == [2000, 3000, 4000]
+    assert log.query()[0] == {**_session(2000), "return_line_temperature": None}
+
+
+def test_query_filters():
+    log = SessionLog(10, MODES)
+    log.append(_session(1000))
+    log.append(_session(2000, "hot_water"))
+    log.append(_session(3000, "defrost", hp_index=2))
+
+    assert [s["start"] for s in log.query(start=2500)] == [2000, 3000]
+    assert [s["start"] for s in log.query(end=1999)] == [1000]
+    assert [s["mode"] for s in log.query(mode="hot_water")] == ["hot_water"]
+    assert [s["hp_index"] for s in log.query(hp_index=2)] == [2]
+
+
+def test_dumps_and_loads_keep_newest():
+    log = SessionLog(5, MODES)
+    for start in range(1000, 8000, 1000):
+        log.append(_session(start))
+
+    restored = SessionLog(3, MODES)
+    restored.loads(log.dumps())
+    assert [s["start"] for s in restored.query()] == [5000, 6000, 7000]
+    restored.append(_session(9000))
+    assert [s["start"] for s in restored.query()] == [6000, 7000, 9000]
+
+
+def test_tracker_builds_session():
+    tracker = SessionTracker(SessionLog(5, MODES))
+    data = {
+        "hp1_compressor_power_consumption_accumulated": 2**31 - 100,
+        "hp1_compressor_thermal_energy_output_accumulated": 0,
+        "hp1_return_line_temperature": 30.0,
+        "hp1_compressor_unit_rating": 40,
+    }
+    tracker.start(1, "hot_water", 100.0, data)
+    tracker.sample(data)
+    tracker.sample({**data, "hp1_return_line_temperature": 32.0})
+    tracker.sample({**data, "hp1_compressor_unit_rating": 60})
+    data["hp1_compressor_power_consumption_accumulated"] = -(2**31) + 400
+    data["hp1_compressor_thermal_energy_output_accumulated"] = 1500
+
+    session = tracker.finish(1, 700.0, data)
+    assert session["electrical_energy"] == 0.5
+    assert session["thermal_energy"] == 1.5
+    assert session["flow_line_temperature"] is None
+    assert session["return_line_temperature"] == pytest.approx(92 / 3)
+    assert session["modulation_changes"] == 1
+    assert tracker.finish(1, 800.0, data) is None
+    assert len(tracker.log) == 1
@@ -0,0 +1,30 @@
+"""Tests for the short-cycling detector."""
+
+from custom_components.lambda_heat_pumps.short_cycles import ShortCycleDetector
+
+
+def test_counts_short_runs_only():
+    detector = ShortCycleDetector(600, 3600)
+
+    # Lauf beim Start: Beginn unbekannt, wird nicht bewertet
+    assert detector.update(True, 0) is None
+    assert detector.update(False, 100) is None
+    assert detector.update(True, 200) is None
+    assert detector.update(True, 300) is None
+    assert detector.update(False, 500) == 300
+    assert detector.update(True, 600) is None
+    assert detector.update(False, 1500) is None
+    assert detector.last_runtime == 900
+    assert detector.count(1500) == 1
+
+
+def test_sliding_window_expires_runs():
+    detector = ShortCycleDetector(600, 3600)
+    detector.update(False, 0)
+    for start in (0, 1000, 2000):
+        detector.update(True, start)
+        detector.update(False, start + 60)
+
+    assert detector.count(2060) == 3
+    assert detector.count(4500) == 2
+    assert detector.count(10_000) == 0
@@ -0,0 +1,75 @@
+"""Tests for the operating state transition engine."""
+
+from datetime import datetime, timezone
+
+from custom_components.lambda_heat_pumps.const import OPERATING_STATE_TRANSITIONS
+from custom_components.lambda_heat_pumps.transitions import TransitionEngine
+
+NOW = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _engine(**counts):
+    engine = TransitionEngine(OPERATING_STATE_TRANSITIONS)
+    engine.compile(counts)
+    return engine
+
+
+def test_first_value_and_changes_are_reported_once():
+    engine = _engine(num_hps=2, num_boil=1, num_hc=0)
+
+    first = engine.process(
+        {"hp1_operating_state": 0, "hp2_operating_state": 1, "boil1_operating_state": 0},
+        NOW,
+    )
+    assert [(t.prefix, t.index, t.previous, t.state, t.mode) for t in first] == [
+        ("hp", 1, None, 0, None),
+        ("hp", 2, None, 1, "heating"),
+        ("boil", 1, None, 0, None),
+    ]
+
+    # Unchanged states produce nothing
+    assert engine.process({"hp1_operating_state": 0}, NOW) == []
+
+    changes = engine.process(
+        {"hp1_operating_state": 2, "hp2_operating_state": 1, "boil1_operating_state": 1},
+        NOW,
+    )
+    assert [(t.prefix, t.previous, t.state, t.mode) for t in changes] == [
+        ("hp", 0, 2, "hot_water"),
+        ("boil", 0, 1, None),
+    ]
+    assert all(t.timestamp == NOW for t in changes)
+
+
+def test_missing_values_keep_previous_state():
+    engine = _engine(num_hps=1, num_boil=0, num_hc=0)
+    engine.process({"hp1_operating_state": 1}, NOW)
+
+    assert engine.process({}, NOW) == []
+    assert engine.process({"hp1_operating_state": 1}, NOW) == []
+
+
+def test_compile_uses_key_func_for_overrides():
+    engine = TransitionEngine(OPERATING_STATE_TRANSITIONS)
+    engine.compile(
+        {"num_hps": 0, "num_boil": 1, "num_hc": 0},
+        lambda key: {"boil1_operating_state": "main_boiler_state"}.get(key, key),
+    )
+
+    transitions = engine.process({"main_boiler_state": 3}, NOW)
+    assert [(t.prefix, t.index, t.state) for t in transitions] == [("boil", 1, 3)]
+
+
+def test_new_counted_mode_is_a_table_entry():
+    table = {
+        "boil": {
+            "sensor": "operating_state",
+            "count": ("num_boil", 1),
+            "modes": {"legionella": 2},
+        }
+    }
+    engine = TransitionEngine(table)
+    engine.compile({})
+
+    assert engine.mode_for_state("boil", 2) == "legionella"
+    assert engine.process({"boil1_operating_state": 2}, NOW)[0].mode == "legionella"
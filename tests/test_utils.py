@@ -7,6 +7,9 @@ import pytest
 import yaml
 
 from custom_components.lambda_heat_pumps.utils import (
+    AccumulatorTracker,
+    accumulator_delta,
+    changed_keys,
     build_device_info,
     clamp_to_int16,
     generate_base_addresses,
@@ -311,6 +314,51 @@ def test_clamp_to_int16_float_input():
         mock_logger.warning.assert_not_called()
 
 
+def test_accumulator_delta():
+    """Increase, int32 wrap near 2**31, decrease and implausible increase."""
+    assert accumulator_delta(100, 150, 1000) == 50
+    assert accumulator_delta(2**31 - 10, -(2**31) + 5, 1000) == 15
+    assert accumulator_delta(5000, 20, 1000) is None
+    assert accumulator_delta(5000, -3, 1000) is None
+    assert accumulator_delta(100, 5000, 1000) is None
+
+
+def test_accumulator_tracker_zero_glitch():
+    """A single 0 read is dropped, the lifetime value is not added."""
+    tracker = AccumulatorTracker(max_power=36_000)  # 10 Wh/s
+    assert tracker.update(5_000_000, 0.0) == 0.0
+    assert tracker.update(5_000_100, 30.0) == 100
+    assert tracker.update(0, 60.0) == 0.0
+    assert tracker.update(5_000_300, 90.0) == 200
+
+
+def test_accumulator_tracker_negative_glitch():
+    """A negative read is not unwrapped into ~4.29 GWh."""
+    tracker = AccumulatorTracker(max_power=36_000)
+    tracker.update(5_000_000, 0.0)
+    assert tracker.update(-1, 30.0) == 0.0
+    assert tracker.update(5_000_100, 60.0) == 100
+
+
+def test_accumulator_tracker_confirmed_reset():
+    """Two consecutive lower reads are a reset; counting continues from there."""
+    tracker = AccumulatorTracker(max_power=36_000)
+    tracker.update(5_000_000, 0.0)
+    assert tracker.update(50, 30.0) == 0.0
+    assert tracker.update(120, 60.0) == 70
+    assert tracker.update(200, 90.0) == 80
+
+
+def test_changed_keys():
+    """Added, removed and changed keys; None without previous data."""
+    assert changed_keys(None, {"a": 1}) is None
+    assert changed_keys({"a": 1, "b": 2, "c": 3}, {"a": 1, "b": 5, "d": 4}) == {
+        "b",
+        "c",
+        "d",
+    }
+
+
 class TestGenerateSensorNames:
     """Test generate_sensor_names function."""
 